@@ -62,6 +62,9 @@ hooksconfig: dict[str, Any] = {}
 binaries: list[tuple[Path, str]] = []
 hiddenimports: list[str] = [
     "PIL._tkinter_finder",
+    # optional JSON backends, imported dynamically by codec.py and schemas.py
+    "orjson",
+    "msgspec",
     "setuptools._distutils.log",
     "setuptools._distutils.dir_util",
     "setuptools._distutils.file_util",
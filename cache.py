@@ -2,19 +2,31 @@ from __future__ import annotations
 
 import asyncio
 from datetime import datetime, timedelta, timezone
+from time import time
 
 import io
+import os
 import json
-from typing import Dict, TypedDict, NewType, TYPE_CHECKING
+from functools import partial
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any, Awaitable, Callable, Dict, Generic, TypedDict, TypeVar, NewType, TYPE_CHECKING
+)
 
+import metrics
+import constants
+import persistence
 from utils import json_load, json_save
-from constants import URLType, CACHE_PATH, CACHE_DB
+from constants import URLType
 
 from PIL import Image as Image_module
 from PIL.ImageTk import PhotoImage
 
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     from gui import GUIManager
     from PIL.Image import Image
     from typing_extensions import TypeAlias
@@ -31,28 +43,142 @@ class ExpiringHash(TypedDict):
 
 Hashes = Dict[URLType, ExpiringHash]
 default_database: Hashes = {}
+# images downloaded at once
+MAX_DOWNLOADS = 8
+# threads decoding, hashing and resizing the images
+WORKERS = min(4, os.cpu_count() or 1)
+# memory budgets of the decoded images and the Tk photos, and the disk budget of the saved images
+MAX_IMAGE_BYTES = 64 * 1024 * 1024
+MAX_PHOTO_BYTES = 32 * 1024 * 1024
+MAX_DISK_BYTES = 128 * 1024 * 1024
+# how often the expired URLs and their files are pruned, in seconds
+PRUNE_INTERVAL = 60 * 60
+
+_K = TypeVar("_K")
+_V = TypeVar("_V")
+
+
+class _LRUTier(Generic[_K, _V]):
+    """
+    Least recently used items, with the total of their sizes bound by a budget.
+    """
+    def __init__(self, name: str, max_bytes: int) -> None:
+        self.name: str = name
+        self.max_bytes: int = max_bytes
+        self.bytes: int = 0
+        self.evictions: int = 0
+        self._items: OrderedDict[_K, tuple[_V, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: _K) -> bool:
+        return key in self._items
+
+    def values(self) -> list[_V]:
+        return [value for value, _ in self._items.values()]
+
+    def get(self, key: _K) -> _V | None:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self, key: _K, value: _V, size: int) -> None:
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._items[key] = (value, size)
+        self.bytes += size
+        self._report()
+
+    def trim(self, *, keep: Callable[[_V], bool] | None = None) -> None:
+        """
+        Evicts the least recently used items, until the budget is met.
+        Items for which `keep` returns True are skipped.
+        """
+        if self.bytes <= self.max_bytes:
+            return
+        for key, (value, size) in list(self._items.items()):
+            if self.bytes <= self.max_bytes:
+                break
+            if keep is not None and keep(value):
+                continue
+            del self._items[key]
+            self.bytes -= size
+            self.evictions += 1
+            metrics.IMAGE_CACHE_EVICTIONS.labels(self.name).inc()
+        self._report()
+
+    def _report(self) -> None:
+        metrics.IMAGE_CACHE_BYTES.labels(self.name).set(self.bytes)
+        metrics.IMAGE_CACHE_ENTRIES.labels(self.name).set(len(self._items))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._items),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
 
 
 class ImageCache:
     LIFETIME = timedelta(days=7)
 
-    def __init__(self, manager: GUIManager) -> None:
+    def __init__(
+        self, manager: GUIManager, *, downloads: int = MAX_DOWNLOADS, workers: int = WORKERS
+    ) -> None:
         self._root = manager._root
         self._twitch = manager._twitch
-        cleanup: bool = False
-        CACHE_PATH.mkdir(parents=True, exist_ok=True)
+        # NOTE: Read the paths here, as they can change after import, see constants.set_paths
+        self._path: Path = constants.CACHE_PATH
+        self._db_path: Path = constants.CACHE_DB
+        self._path.mkdir(parents=True, exist_ok=True)
         try:
-            self._hashes: Hashes = json_load(CACHE_DB, default_database, merge=False)
+            self._hashes: Hashes = json_load(self._db_path, default_database, merge=False)
         except json.JSONDecodeError:
-            # if we can't load the mapping file, delete all existing files,
-            # then reinitialize the image cache anew
-            cleanup = True
+            # if we can't load the mapping file, all existing files end up deleted,
+            # as unused, reinitializing the image cache anew
             self._hashes = default_database.copy()
-        self._images: dict[ImageHash, Image] = {}
-        self._photos: dict[tuple[ImageHash, ImageSize], PhotoImage] = {}
-        self._lock = asyncio.Lock()
+        self._images: _LRUTier[ImageHash, Image] = _LRUTier("images", MAX_IMAGE_BYTES)
+        self._photos: _LRUTier[tuple[ImageHash, ImageSize], PhotoImage] = _LRUTier(
+            "photos", MAX_PHOTO_BYTES
+        )
+        # sizes of the saved images
+        self._disk: dict[ImageHash, int] = {}
+        self._disk_bytes: int = 0
+        self._disk_evictions: int = 0
+        # URLs and photos being loaded, shared by everyone requesting them in the meantime
+        self._in_flight: dict[Any, asyncio.Future[Any]] = {}
+        self._downloads = asyncio.Semaphore(downloads)
+        # PIL work is kept off of the event loop, except for creating the photos,
+        # which has to happen on the Tk thread
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ImageCache")
         self._altered: bool = False
-        # cleanup the URLs
+        self._next_prune: float = 0.0
+        referenced = self._prune()
+        # This cleanups the cache folder from unused PNG files, and sizes up the rest
+        for file in self._path.glob("*.png"):
+            img_hash = ImageHash(file.name)
+            if img_hash not in referenced:
+                file.unlink(missing_ok=True)
+                continue
+            try:
+                self._disk[img_hash] = file.stat().st_size
+            except OSError:
+                continue
+        self._disk_bytes = sum(self._disk.values())
+        self._trim_disk()
+        self._report_disk()
+
+    def _prune(self) -> set[ImageHash]:
+        """
+        Removes the expired URLs, and the saved images no longer referenced by any URL.
+        Returns the image hashes that are still referenced.
+        """
+        self._next_prune = time() + PRUNE_INTERVAL
         hash_counts: dict[ImageHash, int] = {}
         now = datetime.now(timezone.utc)
         for url, hash_dict in list(self._hashes.items()):
@@ -67,24 +193,71 @@ class ImageCache:
         for img_hash, count in hash_counts.items():
             if count == 0:
                 # hashes come with an extension already
-                CACHE_PATH.joinpath(img_hash).unlink(missing_ok=True)
+                self._remove_file(img_hash)
                 # NOTE: The hashes are deleted from self._hashes above
-        if cleanup:
-            # This cleanups the cache folder from unused PNG files
-            orphans = [
-                file.name for file in CACHE_PATH.glob("*.png") if file.name not in hash_counts
-            ]
-            for filename in orphans:
-                CACHE_PATH.joinpath(filename).unlink(missing_ok=True)
+        return {img_hash for img_hash, count in hash_counts.items() if count > 0}
+
+    def _remove_file(self, img_hash: ImageHash) -> None:
+        self._disk_bytes -= self._disk.pop(img_hash, 0)
+        persistence.remove(self._path / img_hash, label="images")
+
+    def _trim_disk(self) -> None:
+        # evict the saved images that were used the longest time ago, along with their URLs
+        if self._disk_bytes <= MAX_DISK_BYTES:
+            return
+        last_used: dict[ImageHash, datetime] = {}
+        urls: dict[ImageHash, list[URLType]] = {}
+        for url, hash_dict in self._hashes.items():
+            img_hash = hash_dict["hash"]
+            urls.setdefault(img_hash, []).append(url)
+            if img_hash not in last_used or hash_dict["expires"] > last_used[img_hash]:
+                last_used[img_hash] = hash_dict["expires"]
+        oldest = datetime.min.replace(tzinfo=timezone.utc)
+        for img_hash in sorted(self._disk, key=lambda h: last_used.get(h, oldest)):
+            if self._disk_bytes <= MAX_DISK_BYTES:
+                break
+            for url in urls.get(img_hash, ()):
+                del self._hashes[url]
+            self._remove_file(img_hash)
+            self._disk_evictions += 1
+            self._altered = True
+            metrics.IMAGE_CACHE_EVICTIONS.labels("disk").inc()
+
+    def _report_disk(self) -> None:
+        metrics.IMAGE_CACHE_BYTES.labels("disk").set(self._disk_bytes)
+        metrics.IMAGE_CACHE_ENTRIES.labels("disk").set(len(self._disk))
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Returns the occupancy of each tier: the decoded images, the Tk photos,
+        and the images saved on disk.
+        """
+        photos = self._photos.stats()
+        photos["in_use"] = sum(1 for photo in self._photos.values() if self._in_use(photo))
+        return {
+            "images": self._images.stats(),
+            "photos": photos,
+            "disk": {
+                "entries": len(self._disk),
+                "bytes": self._disk_bytes,
+                "max_bytes": MAX_DISK_BYTES,
+                "evictions": self._disk_evictions,
+                "urls": len(self._hashes),
+            },
+        }
 
     def save(self, *, force: bool = False) -> None:
+        if time() >= self._next_prune:
+            self._prune()
+            self._report_disk()
         if self._altered or force:
-            json_save(CACHE_DB, self._hashes, sort=True)
+            json_save(self._db_path, self._hashes, sort=True)
 
     def _new_expires(self) -> datetime:
         return datetime.now(timezone.utc) + self.LIFETIME
 
-    def _hash(self, image: Image) -> ImageHash:
+    @staticmethod
+    def _hash(image: Image) -> ImageHash:
         pixel_data = list(
             image.resize((10, 10), Image_module.Resampling.LANCZOS).convert('L').getdata()
         )
@@ -92,45 +265,144 @@ class ImageCache:
         bits = ''.join('1' if px >= avg_pixel else '0' for px in pixel_data)
         return ImageHash(f"{int(bits, 2):x}.png")
 
-    async def get(self, url: URLType, size: ImageSize | None = None) -> PhotoImage:
-        async with self._lock:
-            image: Image | None = None
-            if url in self._hashes:
-                img_hash = self._hashes[url]["hash"]
-                self._hashes[url]["expires"] = self._new_expires()
-                if img_hash in self._images:
-                    image = self._images[img_hash]
-                else:
-                    try:
-                        self._images[img_hash] = image = Image_module.open(CACHE_PATH / img_hash)
-                    except (FileNotFoundError, Image_module.UnidentifiedImageError):
-                        pass
+    @staticmethod
+    def _open(path: Path) -> Image | None:
+        # NOTE: runs in the executor
+        try:
+            image = Image_module.open(path)
+            image.load()
+        except OSError:
+            # missing, unidentified or truncated
+            return None
+        return image
+
+    @classmethod
+    def _decode(cls, data: bytes | None) -> tuple[ImageHash, Image]:
+        # NOTE: runs in the executor
+        image: Image | None = None
+        if data is not None:
+            try:
+                image = Image_module.open(io.BytesIO(data))
+                # decode the image here, so that encoding it on the writer thread
+                # doesn't race with the resizing
+                image.load()
+            except Exception:
+                image = None
+        if image is None:
+            # use a blank white image as a fallback
+            image = Image_module.new("RGB", (10, 10), (255, 255, 255))
+        return cls._hash(image), image
+
+    @staticmethod
+    def _image_bytes(image: Image) -> int:
+        return image.width * image.height * len(image.getbands())
+
+    @staticmethod
+    def _resize(image: Image, size: ImageSize) -> Image:
+        # NOTE: runs in the executor
+        return image.resize(size, Image_module.Palette.ADAPTIVE)
+
+    async def _single_flight(self, key: Any, factory: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._in_flight.get(key)
+        if future is None:
+            future = self._in_flight[key] = asyncio.ensure_future(factory())
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # a cancelled caller doesn't cancel the load for everyone else
+        return await asyncio.shield(future)
+
+    async def _run(self, function: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def _load(self, url: URLType) -> tuple[ImageHash, Image]:
+        if url in self._hashes:
+            img_hash = self._hashes[url]["hash"]
+            self._hashes[url]["expires"] = self._new_expires()
+            image = self._images.get(img_hash)
             if image is None:
-                try:
-                    async with self._twitch.request("GET", url) as response:
-                        if response.status != 404:
-                            image = Image_module.open(io.BytesIO(await response.read()))
-                except Exception:
-                    pass
-                if image is None:
-                    # use a blank white image as a fallback
-                    image = Image_module.new("RGB", (10, 10), (255, 255, 255))
-                img_hash = self._hash(image)
-                self._images[img_hash] = image
-                image.save(CACHE_PATH / img_hash)
-                self._hashes[url] = {
-                    "hash": img_hash,
-                    "expires": self._new_expires()
-                }
-        # NOTE: If self._hashes ever stops being updated in both above if cases,
+                image = await self._run(self._open, self._path / img_hash)
+                if image is not None:
+                    self._images.put(img_hash, image, self._image_bytes(image))
+                    self._images.trim()
+            if image is not None:
+                return img_hash, image
+        data: bytes | None = None
+        async with self._downloads:
+            try:
+                async with self._twitch.request("GET", url) as response:
+                    if response.status != 404:
+                        data = await response.read()
+            except Exception:
+                pass
+        img_hash, image = await self._run(self._decode, data)
+        self._images.put(img_hash, image, self._image_bytes(image))
+        self._images.trim()
+        # the size is filled in once the file has been written
+        self._disk.setdefault(img_hash, 0)
+        persistence.write(self._path / img_hash, self._writer(img_hash, image), label="images")
+        self._hashes[url] = {
+            "hash": img_hash,
+            "expires": self._new_expires()
+        }
+        return img_hash, image
+
+    def _writer(self, img_hash: ImageHash, image: Image) -> Callable[[Path], None]:
+        loop = asyncio.get_running_loop()
+
+        def write(temp_path: Path) -> None:
+            # NOTE: runs on the writer thread
+            image.save(temp_path, format="PNG")
+            size = temp_path.stat().st_size
+            try:
+                loop.call_soon_threadsafe(self._saved, img_hash, size)
+            except RuntimeError:
+                # the loop has been closed already
+                pass
+        return write
+
+    def _saved(self, img_hash: ImageHash, size: int) -> None:
+        if img_hash not in self._disk:
+            # evicted in the meantime
+            return
+        self._disk_bytes += size - self._disk[img_hash]
+        self._disk[img_hash] = size
+        self._trim_disk()
+        self._report_disk()
+
+    async def get_image(self, url: URLType, size: ImageSize | None = None) -> Image:
+        """
+        Returns the image behind the URL, resized to `size` if specified.
+        Unlike `get`, doesn't need Tk.
+        """
+        _, image = await self._single_flight(url, partial(self._load, url))
+        self._altered = True
+        if size is not None and image.size != size:
+            image = await self._run(self._resize, image, size)
+        return image
+
+    async def get(self, url: URLType, size: ImageSize | None = None) -> PhotoImage:
+        img_hash, image = await self._single_flight(url, partial(self._load, url))
+        # NOTE: If self._hashes ever stops being updated in both cases of _load,
         # this will need to be moved
         self._altered = True
         if size is None:
             size = image.size
         photo_key = (img_hash, size)
-        if photo_key in self._photos:
-            return self._photos[photo_key]
+        photo = self._photos.get(photo_key)
+        if photo is not None:
+            return photo
+        return await self._single_flight(photo_key, partial(self._photo, photo_key, image))
+
+    async def _photo(self, photo_key: tuple[ImageHash, ImageSize], image: Image) -> PhotoImage:
+        _, size = photo_key
         if image.size != size:
-            image = image.resize(size, Image_module.Palette.ADAPTIVE)
-        self._photos[photo_key] = photo = PhotoImage(master=self._root, image=image)
+            image = await self._run(self._resize, image, size)
+        photo = PhotoImage(master=self._root, image=image)
+        # Tk keeps the photos as 32-bit RGBA
+        self._photos.put(photo_key, photo, size[0] * size[1] * 4)
+        # NOTE: Widgets don't keep a reference to the photos they display,
+        # so the ones still in use are kept around, regardless of the budget.
+        self._photos.trim(keep=self._in_use)
         return photo
+
+    def _in_use(self, photo: PhotoImage) -> bool:
+        return self._root.tk.getboolean(self._root.tk.call("image", "inuse", str(photo)))
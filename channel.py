@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import re
-import json
 import asyncio
 import logging
+from time import perf_counter
 from base64 import b64encode
 from functools import cached_property
 from typing import Any, SupportsInt, cast, TYPE_CHECKING
@@ -11,6 +11,9 @@ from typing import Any, SupportsInt, cast, TYPE_CHECKING
 import aiohttp
 from yarl import URL
 
+import codec
+import metrics
+import schemas
 from utils import Game, json_minify
 from exceptions import MinerException, RequestException
 from constants import CALL, GQL_OPERATIONS, ONLINE_DELAY, URLType
@@ -31,7 +34,7 @@ class Stream:
         channel: Channel,
         *,
         id: SupportsInt,
-        game: JsonType | None,
+        game: JsonType | schemas.GameInfo | None,
         viewers: int,
         title: str,
     ):
@@ -65,15 +68,16 @@ class Stream:
         return {"data": (b64encode(json_minify(payload).encode("utf8"))).decode("utf8")}
 
     @classmethod
-    def from_get_stream(cls, channel: Channel, channel_data: JsonType) -> Stream:
-        stream = channel_data["stream"]
-        settings = channel_data["broadcastSettings"]
+    def from_get_stream(cls, channel: Channel, channel_data: schemas.ChannelInfo) -> Stream:
+        stream = channel_data.stream
+        assert stream is not None
+        settings = channel_data.broadcast_settings
         return cls(
             channel,
-            id=stream["id"],
-            game=settings["game"],
-            viewers=stream["viewersCount"],
-            title=settings["title"],
+            id=stream.id,
+            game=settings.game,
+            viewers=stream.viewers_count,
+            title=settings.title,
         )
 
     @classmethod
@@ -90,6 +94,27 @@ class Stream:
         self.drops_enabled = drops_enabled
         return self
 
+    @classmethod
+    def from_checkpoint(cls, channel: Channel, data: JsonType) -> Stream:
+        self = cls(
+            channel,
+            id=data["id"],
+            game=data["game"],
+            viewers=data["viewers"],
+            title=data["title"],
+        )
+        self.drops_enabled = data["drops_enabled"]
+        return self
+
+    def to_checkpoint(self) -> JsonType:
+        return {
+            "id": self.broadcast_id,
+            "game": self.game.as_json() if self.game is not None else None,
+            "viewers": self.viewers,
+            "title": self.title,
+            "drops_enabled": self.drops_enabled,
+        }
+
     def __eq__(self, other: object) -> bool:
         if isinstance(other, self.__class__):
             return self.broadcast_id == other.broadcast_id
@@ -118,8 +143,8 @@ class Stream:
                 available_qualities = await qualities_response.text()
             # try to decode the suspected JSON
             try:
-                available_json: JsonType = json.loads(available_qualities)
-            except json.JSONDecodeError:
+                available_json: JsonType = codec.loads(available_qualities)
+            except ValueError:
                 # No JSON: this is the expected path. Do nothing and continue with the below.
                 pass
             else:
@@ -188,6 +213,35 @@ class Channel:
         self._stream = Stream.from_directory(self, data, drops_enabled=drops_enabled)
         return self
 
+    @classmethod
+    def from_checkpoint(cls, twitch: Twitch, data: JsonType) -> Channel:
+        """
+        Restores the channel with its last known stream state, see checkpoint.py.
+        """
+        self = cls(
+            twitch,
+            id=data["id"],
+            login=data["login"],
+            display_name=data["display_name"],
+            acl_based=data["acl_based"],
+        )
+        if data["spade_url"] is not None:
+            self._spade_url = URLType(data["spade_url"])
+            twitch.spade_urls.setdefault(self.id, self._spade_url)
+        if data["stream"] is not None:
+            self._stream = Stream.from_checkpoint(self, data["stream"])
+        return self
+
+    def to_checkpoint(self) -> JsonType:
+        return {
+            "id": self.id,
+            "login": self._login,
+            "display_name": self._display_name,
+            "acl_based": self.acl_based,
+            "spade_url": self._spade_url or self._twitch.spade_urls.get(self.id),
+            "stream": self._stream.to_checkpoint() if self._stream is not None else None,
+        }
+
     def __repr__(self) -> str:
         if self._display_name is not None:
             name = f"{self._display_name}({self._login})"
@@ -308,22 +362,24 @@ class Channel:
                 raise MinerException("Error while spade_url extraction: step #2")
         return URLType(match.group(1))
 
-    def _check_drops_enabled(self, available_drops: list[JsonType]) -> bool:
+    def _check_drops_enabled(self, available_drops: list[schemas.CampaignRef]) -> bool:
         return any(
             (
-                (campaign := self._twitch._campaigns.get(campaign_data["id"])) is not None
+                (campaign := self._twitch._campaigns.get(campaign_data.id)) is not None
                 and campaign.can_earn(self, ignore_channel_status=True)
             )
             for campaign_data in available_drops
         )
 
-    def external_update(self, channel_data: JsonType, available_drops: list[JsonType]):
+    def external_update(
+        self, channel_data: schemas.ChannelInfo, available_drops: list[schemas.CampaignRef]
+    ):
         """
         Update stream information based on data provided externally.
 
         Used for bulk-updates of channel statuses during reload.
         """
-        if not channel_data["stream"]:
+        if channel_data.stream is None:
             self._stream = None
             return
         stream = Stream.from_get_stream(self, channel_data)
@@ -333,28 +389,30 @@ class Channel:
 
     async def get_stream(self) -> Stream | None:
         try:
-            response: JsonType = await self._twitch.gql_request(self.stream_gql)
+            response = await self._twitch.get_stream_info(self)
         except MinerException as exc:
             raise MinerException(f"Channel: {self._login}") from exc
-        channel_data: JsonType | None = response["data"]["user"]
-        if not channel_data:
+        channel_data = response.data.user
+        if channel_data is None:
             return None
         # fill in display name
         if self._display_name is None:
-            self._display_name = channel_data["displayName"]
-        if not channel_data["stream"]:
+            self._display_name = channel_data.display_name
+        if channel_data.stream is None:
             return None
         stream = Stream.from_get_stream(self, channel_data)
         if not stream.drops_enabled:
             try:
-                available_drops_campaigns: JsonType = await self._twitch.gql_request(
-                    GQL_OPERATIONS["AvailableDrops"].with_variables({"channelID": str(self.id)})
+                available_drops = await self._twitch.gql_request(
+                    GQL_OPERATIONS["AvailableDrops"].with_variables({"channelID": str(self.id)}),
+                    schema=schemas.AvailableDropsResponse,
                 )
             except MinerException:
                 logger.log(CALL, f"AvailableDrops GQL call failed for channel: {self._login}")
             else:
+                available_channel = available_drops.data.channel
                 stream.drops_enabled = self._check_drops_enabled(
-                    available_drops_campaigns["data"]["channel"]["viewerDropCampaigns"] or []
+                    (available_channel and available_channel.viewer_drop_campaigns) or []
                 )
         return stream
 
@@ -442,8 +500,8 @@ class Channel:
         available_chunks = re.sub(r'"url": ?".+}",', '', available_chunks)
         # try to decode the suspected JSON
         try:
-            available_json: JsonType = json.loads(available_chunks)
-        except json.JSONDecodeError:
+            available_json: JsonType = codec.loads(available_chunks)
+        except ValueError:
             # No JSON: this is the expected path. Do nothing and continue with the below.
             pass
         else:
@@ -470,11 +528,23 @@ class Channel:
         if self._stream is None:
             return False
         if self._spade_url is None:
-            self._spade_url = await self.get_spade_url()
+            # NOTE: Channel objects get recreated on every channels refresh,
+            # the spade URL outlives them, to avoid extracting it again each time
+            spade_urls = self._twitch.spade_urls
+            if (spade_url := spade_urls.get(self.id)) is None:
+                # shared with the other accounts, and the other processes too
+                spade_url = spade_urls[self.id] = await self._twitch.shared_cache.get_spade_url(
+                    self.id, self.get_spade_url
+                )
+            self._spade_url = spade_url
+        start = perf_counter()
         try:
             async with self._twitch.request(
                 "POST", self._spade_url, data=self._stream._spade_payload
             ) as response:
-                return response.status == 204
+                success = response.status == 204
         except RequestException:
-            return False
+            success = False
+        metrics.WATCH_LATENCY.observe(perf_counter() - start)
+        metrics.WATCH_HEARTBEATS.labels("success" if success else "failure").inc()
+        return success
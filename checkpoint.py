@@ -0,0 +1,101 @@
+"""
+Runtime checkpoints, letting a restarted miner resume watching right away.
+
+A checkpoint holds what the miner needs to pick up where the previous run has left off,
+without waiting for the inventory, the game directories and the online checks: the wanted games,
+the tracked channels with their last known stream state and spade URLs, the watched channel,
+and the pubsub topics. It's written periodically and at shutdown, and it's only resumed from
+for the same user and settings, while it's recent enough. Whatever it holds is then reconciled
+with the live data, the same way every inventory refresh is.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, TYPE_CHECKING
+
+import codec
+import persistence
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from settings import Settings
+    from constants import JsonType
+
+
+logger = logging.getLogger("TwitchDrops")
+# bumped whenever the contents change in a way older checkpoints can't be read with
+VERSION = 1
+# how often the checkpoint gets refreshed while watching, in seconds
+SAVE_INTERVAL = 300.0
+# older checkpoints aren't resumed from, the streams they've seen are likely gone by now
+MAX_AGE = timedelta(minutes=30)
+
+
+def _settings_key(settings: Settings) -> JsonType:
+    # the settings the wanted games and the channels depend on
+    return {
+        "priority": list(settings.priority),
+        "exclude": sorted(settings.exclude),
+        "priority_mode": settings.priority_mode.name,
+    }
+
+
+def save(
+    path: Path,
+    *,
+    user_id: int,
+    settings: Settings,
+    wanted_games: list[JsonType],
+    channels: list[JsonType],
+    watching: int | None,
+    topics: list[str],
+) -> None:
+    """
+    Encodes the checkpoint right away, and queues writing it out.
+    """
+    data: JsonType = {
+        "version": VERSION,
+        "saved_at": datetime.now(timezone.utc).isoformat(),
+        "user_id": user_id,
+        "settings": _settings_key(settings),
+        "wanted_games": wanted_games,
+        "channels": channels,
+        "watching": watching,
+        "topics": topics,
+    }
+    persistence.write(path, codec.dumps(data))
+
+
+def load(path: Path, *, user_id: int, settings: Settings) -> JsonType | None:
+    """
+    Returns the checkpoint, or None if there isn't one that can be resumed from.
+    """
+    try:
+        with open(path, "rb") as file:
+            data: Any = codec.loads(file.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.warning(f"Failed to read the checkpoint: {exc}")
+        return None
+    if not isinstance(data, dict) or data.get("version") != VERSION:
+        return None
+    if data.get("user_id") != user_id:
+        logger.info("Not resuming from the checkpoint, it was saved for another user")
+        return None
+    if data.get("settings") != _settings_key(settings):
+        logger.info("Not resuming from the checkpoint, the settings have changed since")
+        return None
+    try:
+        saved_at = datetime.fromisoformat(data["saved_at"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    age = datetime.now(timezone.utc) - saved_at
+    if age > MAX_AGE:
+        logger.info(
+            f"Not resuming from the checkpoint, it's {age.total_seconds() / 60:.0f} minutes old"
+        )
+        return None
+    return data
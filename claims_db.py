@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import re
+import atexit
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+
+
+logger = logging.getLogger("TwitchDrops")
+
+SCHEMA_VERSION = 1
+# the columns entries are stored under, on top of the autoincremented id
+COLUMNS = (
+    "time", "drop_id", "drop_name", "campaign_id", "campaign_name", "game", "msg", "icon"
+)
+GROUP_COLUMNS = {"game": "game", "campaign": "campaign_id"}
+# format of the claim messages, for entries that predate the dedicated columns
+_MSG_PATTERN = re.compile(r"^Drop claimed: (.*) \((.*)\)$")
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS claims (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    time TEXT NOT NULL,
+    drop_id TEXT,
+    drop_name TEXT,
+    campaign_id TEXT,
+    campaign_name TEXT,
+    game TEXT,
+    msg TEXT NOT NULL,
+    icon TEXT
+);
+CREATE INDEX IF NOT EXISTS claims_time ON claims (time);
+CREATE INDEX IF NOT EXISTS claims_game ON claims (game, id);
+CREATE INDEX IF NOT EXISTS claims_campaign ON claims (campaign_id, id);
+CREATE UNIQUE INDEX IF NOT EXISTS claims_drop ON claims (drop_id) WHERE drop_id IS NOT NULL;
+"""
+
+
+class ClaimsStore:
+    """
+    Claims history, kept in an embedded SQLite database.
+
+    Entries are addressed by their row id, which only ever increases,
+    and is used as the paging cursor. Each drop can only be recorded once.
+
+    New claims are queued by `append`, and written in batches by a background thread,
+    as a commit can wait on the disk. Queries wait for the queued claims to be written first,
+    so they should be run off of the event loop too.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        # guards the attributes below, the connection itself is guarded by _lock
+        self._cond = threading.Condition()
+        # claims waiting to be written, and whether the writer has taken a batch of them
+        self._pending: list[dict[str, Any]] = []
+        self._writing: bool = False
+        self._closing: bool = False
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            version: int = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            # True until the database has been populated, see mark_populated
+            self.created: bool = version == 0
+            if version > SCHEMA_VERSION:
+                logger.warning(
+                    f"{path.name} has been created by a newer version (schema {version})"
+                )
+            self._conn.executescript(_SCHEMA)
+            if not self.created:
+                self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._thread = threading.Thread(
+            target=self._writer, name=f"ClaimsStore({path.name})", daemon=True
+        )
+        self._thread.start()
+        # in case close() is never called
+        atexit.register(self.close)
+
+    def mark_populated(self) -> None:
+        """
+        Stamps the schema version, once the new database has been populated.
+        Until then, it's reported as created on every start, so that populating can be retried.
+        """
+        with self._lock:
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self.created = False
+
+    @staticmethod
+    def _row(entry: dict[str, Any]) -> tuple[Any, ...]:
+        drop_name = entry.get("drop_name")
+        game = entry.get("game")
+        msg = entry.get("msg") or ""
+        if (drop_name is None or game is None) and (match := _MSG_PATTERN.match(msg)):
+            drop_name = drop_name or match.group(1)
+            game = game or match.group(2)
+        return (
+            entry.get("time"),
+            entry.get("drop_id") or None,
+            drop_name,
+            entry.get("campaign_id"),
+            entry.get("campaign_name"),
+            game,
+            msg,
+            entry.get("icon"),
+        )
+
+    @staticmethod
+    def _entry(row: sqlite3.Row) -> dict[str, Any]:
+        # the same shape the journal entries have
+        entry: dict[str, Any] = {"id": row["id"], "type": "claim"}
+        entry.update((key, row[key]) for key in COLUMNS)
+        return entry
+
+    def append(self, entry: dict[str, Any]) -> None:
+        """
+        Queues recording a claim. Claims of drops that have already been recorded are ignored.
+        """
+        with self._cond:
+            if self._closing:
+                # the writer is gone, so write it right away
+                self.extend((entry,))
+                return
+            self._pending.append(entry)
+            self._cond.notify()
+
+    def _writer(self) -> None:
+        with self._cond:
+            while True:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, []
+                self._writing = True
+                self._cond.release()
+                try:
+                    self.extend(batch)
+                finally:
+                    self._cond.acquire()
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def flush(self) -> None:
+        """
+        Blocks until all of the claims queued so far have been written.
+        """
+        with self._cond:
+            while (self._pending or self._writing) and self._thread.is_alive():
+                self._cond.notify_all()
+                self._cond.wait(0.1)
+
+    def extend(self, entries: Iterable[dict[str, Any]]) -> int:
+        """
+        Records multiple claims, oldest first, in a single transaction.
+        Returns the number of claims actually recorded.
+        """
+        rows = [self._row(entry) for entry in entries]
+        placeholders = ", ".join("?" * len(COLUMNS))
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute("BEGIN")
+                    before = self._conn.total_changes
+                    self._conn.executemany(
+                        f"INSERT OR IGNORE INTO claims ({', '.join(COLUMNS)}) "
+                        f"VALUES ({placeholders})",
+                        rows,
+                    )
+                    return self._conn.total_changes - before
+            except sqlite3.Error:
+                logger.warning(f"Failed to write {self._path.name}", exc_info=True)
+                return 0
+
+    def query(
+        self,
+        *,
+        before: int | None = None,
+        limit: int = 50,
+        game: str | None = None,
+        campaign_id: str | None = None,
+        drop_id: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+    ) -> tuple[list[dict[str, Any]], int | None]:
+        """
+        Returns up to `limit` claims older than the `before` cursor, newest first,
+        together with the cursor to pass as `before` for the next page.
+        The cursor is None once there are no more claims to return.
+
+        `since` and `until` are ISO timestamps, bounding the claim time (inclusive, exclusive).
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+        for clause, value in (
+            ("id < ?", before),
+            ("game = ?", game),
+            ("campaign_id = ?", campaign_id),
+            ("drop_id = ?", drop_id),
+            ("time >= ?", since),
+            ("time < ?", until),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        limit = max(limit, 0)
+        # fetch one extra row, to know if there's a next page
+        params.append(limit + 1)
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM claims {where} ORDER BY id DESC LIMIT ?", params
+            ).fetchall()
+        entries = [self._entry(row) for row in rows[:limit]]
+        next_cursor = entries[-1]["id"] if len(rows) > limit and entries else None
+        return entries, next_cursor
+
+    def recent(self, limit: int) -> list[dict[str, Any]]:
+        """
+        Returns the newest `limit` claims, newest first.
+        """
+        return self.query(limit=limit)[0]
+
+    def aggregate(self, group: str = "game") -> list[dict[str, Any]]:
+        """
+        Returns the claim count and the first and last claim time, per game or per campaign,
+        most claimed first.
+        """
+        column = GROUP_COLUMNS[group]
+        extra = ""
+        if group == "campaign":
+            extra = ", MAX(campaign_name) AS campaign_name, MAX(game) AS game"
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {column}, COUNT(*) AS count, MIN(time) AS first, MAX(time) AS last"
+                f"{extra} FROM claims GROUP BY {column} ORDER BY count DESC, last DESC"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def drop_ids(self) -> set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT drop_id FROM claims WHERE drop_id IS NOT NULL"
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM claims").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Writes out the queued claims, stops the writer thread and closes the database.
+        """
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+        atexit.unregister(self.close)
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,221 @@
+"""
+JSON encoding and decoding, using the fastest library available.
+
+`orjson` is preferred, then `msgspec`, with the standard library `json` module as the fallback.
+The `TDM_JSON_BACKEND` environment variable can be used to force a specific backend.
+All encoding functions return UTF-8 bytes, and all decoding functions accept either str or bytes.
+Invalid input always raises a `ValueError` subclass, regardless of the backend used.
+"""
+from __future__ import annotations
+
+import os
+import json
+import logging
+from enum import Enum
+from typing import Any, Callable
+
+
+logger = logging.getLogger("TwitchDrops")
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+def _apply_default(obj: Any, default: Callable[[Any], Any]) -> Any:
+    # Mirrors the standard library's handling of the `default` callable:
+    # anything that isn't a plain JSON type gets passed through it, recursively.
+    # This is needed because msgspec natively handles types like datetime or Enum,
+    # which would bypass our own serialization and break loading them back.
+    if isinstance(obj, _PLAIN_TYPES) and not isinstance(obj, Enum):
+        return obj
+    if isinstance(obj, dict):
+        return {k: _apply_default(v, default) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_apply_default(v, default) for v in obj]
+    return _apply_default(default(obj), default)
+
+
+def _apply_hook(obj: Any, object_hook: Callable[[dict[str, Any]], Any]) -> Any:
+    # bottom-up, the same order the standard library calls `object_hook` in
+    if isinstance(obj, dict):
+        return object_hook({k: _apply_hook(v, object_hook) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return [_apply_hook(v, object_hook) for v in obj]
+    return obj
+
+
+class JSONBackend:
+    """
+    Standard library backend, and the base class for the others.
+    """
+    name: str = "json"
+
+    def loads(self, data: str | bytes) -> Any:
+        return json.loads(data)
+
+    def loads_hook(self, data: str | bytes, object_hook: Callable[[dict[str, Any]], Any]) -> Any:
+        return _apply_hook(self.loads(data), object_hook)
+
+    def dumps(
+        self,
+        obj: Any,
+        *,
+        default: Callable[[Any], Any] | None = None,
+        sort_keys: bool = False,
+        indent: bool = False,
+    ) -> bytes:
+        return json.dumps(
+            obj,
+            default=default,
+            sort_keys=sort_keys,
+            ensure_ascii=False,
+            indent=2 if indent else None,
+            separators=None if indent else (',', ':'),
+        ).encode("utf8")
+
+
+class _StdlibBackend(JSONBackend):
+    def loads_hook(self, data: str | bytes, object_hook: Callable[[dict[str, Any]], Any]) -> Any:
+        return json.loads(data, object_hook=object_hook)
+
+
+class _OrjsonBackend(JSONBackend):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+        self._orjson = orjson
+        self._loads = orjson.loads
+        self._dumps = orjson.dumps
+
+    def loads(self, data: str | bytes) -> Any:
+        # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+        return self._loads(data)
+
+    def dumps(
+        self,
+        obj: Any,
+        *,
+        default: Callable[[Any], Any] | None = None,
+        sort_keys: bool = False,
+        indent: bool = False,
+    ) -> bytes:
+        orjson = self._orjson
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if default is None:
+            return self._dumps(obj, option=option)
+        # NOTE: The passthrough options make orjson hand datetimes, dataclasses
+        # and subclasses of the builtin types to `default`, like the standard library does.
+        # Enum members are the exception, orjson always encodes them as their value.
+        option |= (
+            orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+            | orjson.OPT_PASSTHROUGH_SUBCLASS
+        )
+        return self._dumps(obj, default=default, option=option)
+
+
+class _MsgspecBackend(JSONBackend):
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+        self._msgspec = msgspec
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, data: str | bytes) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except self._msgspec.DecodeError as exc:
+            raise json.JSONDecodeError(str(exc), str(data), 0) from None
+
+    def dumps(
+        self,
+        obj: Any,
+        *,
+        default: Callable[[Any], Any] | None = None,
+        sort_keys: bool = False,
+        indent: bool = False,
+    ) -> bytes:
+        if default is not None:
+            obj = _apply_default(obj, default)
+        if sort_keys:
+            encoded = self._msgspec.json.encode(obj, order="sorted")
+        else:
+            encoded = self._encoder.encode(obj)
+        if indent:
+            encoded = self._msgspec.json.format(encoded, indent=2)
+        return encoded
+
+
+_BACKENDS: dict[str, type[JSONBackend]] = {
+    "orjson": _OrjsonBackend,
+    "msgspec": _MsgspecBackend,
+    "json": _StdlibBackend,
+}
+
+
+def get_backend(name: str) -> JSONBackend:
+    """
+    Instantiates a specific backend. Raises ImportError if it's not installed.
+    """
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    return _BACKENDS[name]()
+
+
+def available_backends() -> list[str]:
+    names: list[str] = []
+    for name in _BACKENDS:
+        try:
+            get_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def _select_backend() -> JSONBackend:
+    forced = os.environ.get("TDM_JSON_BACKEND")
+    if forced:
+        try:
+            return get_backend(forced)
+        except (ImportError, ValueError):
+            logger.warning(f"JSON backend \"{forced}\" is not available, falling back")
+    for name in _BACKENDS:
+        try:
+            return get_backend(name)
+        except ImportError:
+            continue
+    # unreachable, the standard library backend is always available
+    return _StdlibBackend()
+
+
+backend: JSONBackend = _select_backend()
+
+
+def loads(data: str | bytes, *, object_hook: Callable[[dict[str, Any]], Any] | None = None) -> Any:
+    if object_hook is not None:
+        return backend.loads_hook(data, object_hook)
+    return backend.loads(data)
+
+
+def dumps(
+    obj: Any,
+    *,
+    default: Callable[[Any], Any] | None = None,
+    sort_keys: bool = False,
+    indent: bool = False,
+) -> bytes:
+    return backend.dumps(obj, default=default, sort_keys=sort_keys, indent=indent)
+
+
+def dumps_str(obj: Any, **kwargs: Any) -> str:
+    """
+    Like `dumps`, but returns a str, for APIs that can't take bytes.
+    """
+    return dumps(obj, **kwargs).decode("utf8")
+
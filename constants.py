@@ -105,15 +105,16 @@ DUMP_PATH = Path(WORKING_DIR, "dump.dat")
 LOCK_PATH = Path(WORKING_DIR, "lock.file")
 CACHE_PATH = Path(WORKING_DIR, "cache")
 CACHE_DB = Path(CACHE_PATH, "mapping.json")
-RESPONSES_CACHE = Path(CACHE_PATH, "responses.json")
+RESPONSES_CACHE = Path(CACHE_PATH, "responses")
 COOKIES_PATH = Path(WORKING_DIR, "cookies.jar")
 SETTINGS_PATH = Path(WORKING_DIR, "settings.json")
-JOURNAL_PATH = Path(WORKING_DIR, "journal.json")
-CLAIMS_PATH = Path(WORKING_DIR, "claims.json")
+JOURNAL_PATH = Path(WORKING_DIR, "journal.jsonl")
+CLAIMS_PATH = Path(WORKING_DIR, "claims.db")
+CHECKPOINT_PATH = Path(WORKING_DIR, "checkpoint.json")
 # Typing
 JsonType = Dict[str, Any]
 URLType = NewType("URLType", str)
-TopicProcess: TypeAlias = "abc.Callable[[int, JsonType], Any]"
+TopicProcess: TypeAlias = "abc.Callable[[int, Any], Any]"
 # Values
 MAX_INT = sys.maxsize
 MAX_EXTRA_MINUTES = 15
@@ -157,8 +158,8 @@ def set_paths(*, working_dir: Path | None = None, settings_path: Path | None = N
     directory or settings file path.
     """
     global WORKING_DIR, LANG_PATH, LOG_PATH, DUMP_PATH, LOCK_PATH
-    global CACHE_PATH, CACHE_DB, COOKIES_PATH, SETTINGS_PATH
-    global JOURNAL_PATH, CLAIMS_PATH
+    global CACHE_PATH, CACHE_DB, RESPONSES_CACHE, COOKIES_PATH, SETTINGS_PATH
+    global JOURNAL_PATH, CLAIMS_PATH, CHECKPOINT_PATH
 
     if working_dir is not None:
         WORKING_DIR = Path(working_dir).resolve()
@@ -168,13 +169,39 @@ def set_paths(*, working_dir: Path | None = None, settings_path: Path | None = N
     LOCK_PATH = Path(WORKING_DIR, "lock.file")
     CACHE_PATH = Path(WORKING_DIR, "cache")
     CACHE_DB = Path(CACHE_PATH, "mapping.json")
+    RESPONSES_CACHE = Path(CACHE_PATH, "responses")
     COOKIES_PATH = Path(WORKING_DIR, "cookies.jar")
     SETTINGS_PATH = Path(settings_path).resolve() if settings_path else Path(WORKING_DIR, "settings.json")
-    JOURNAL_PATH = Path(WORKING_DIR, "journal.json")
-    CLAIMS_PATH = Path(WORKING_DIR, "claims.json")
+    JOURNAL_PATH = Path(WORKING_DIR, "journal.jsonl")
+    CLAIMS_PATH = Path(WORKING_DIR, "claims.db")
+    CHECKPOINT_PATH = Path(WORKING_DIR, "checkpoint.json")
     LANG_PATH = _resource_path("lang")
 
 
+class AccountPaths:
+    """
+    The files that belong to a single account, kept within its own data directory.
+
+    The main account uses the paths above, while every additional account
+    hosted by the same process gets a directory of its own.
+    """
+
+    def __init__(self, data_dir: Path) -> None:
+        self.DATA_DIR: Path = Path(data_dir).resolve()
+        self.COOKIES: Path = Path(self.DATA_DIR, "cookies.jar")
+        self.DUMP: Path = Path(self.DATA_DIR, "dump.dat")
+        self.LOCK: Path = Path(self.DATA_DIR, "lock.file")
+        self.RESPONSES_CACHE: Path = Path(self.DATA_DIR, "cache", "responses")
+        self.JOURNAL: Path = Path(self.DATA_DIR, "journal.jsonl")
+        self.CLAIMS: Path = Path(self.DATA_DIR, "claims.db")
+        self.CHECKPOINT: Path = Path(self.DATA_DIR, "checkpoint.json")
+
+    @classmethod
+    def default(cls) -> AccountPaths:
+        # NOTE: Read the working dir here, as it can change after import, see set_paths
+        return cls(WORKING_DIR)
+
+
 class ClientInfo:
     def __init__(self, client_url: URL, client_id: str, user_agents: str | list[str]) -> None:
         self.CLIENT_URL: URL = client_url
@@ -477,11 +504,17 @@ class WebsocketTopic:
         topic_name: str,
         target_id: int,
         process: TopicProcess,
+        *,
+        schema: type | None = None,
     ):
         assert isinstance(target_id, int)
         self._id: str = self.as_str(category, topic_name, target_id)
+        # the topic, without the target ID
+        self.name: str = WEBSOCKET_TOPICS[category][topic_name]
         self._target_id = target_id
         self._process: TopicProcess = process
+        # type the message body gets decoded into, see schemas.py
+        self.schema: type | None = schema
 
     @classmethod
     def as_str(
@@ -489,7 +522,7 @@ class WebsocketTopic:
     ) -> str:
         return f"{WEBSOCKET_TOPICS[category][topic_name]}.{target_id}"
 
-    def __call__(self, message: JsonType):
+    def __call__(self, message: Any):
         return self._process(self._target_id, message)
 
     def __str__(self) -> str:
@@ -8,12 +8,15 @@ import ctypes
 import asyncio
 import logging
 import plistlib
+import threading
 import tkinter as tk
 from pathlib import Path
-from collections import abc
+from time import monotonic
+from collections import abc, deque
 from textwrap import dedent
 from math import log10, ceil
 from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
 from tkinter.font import Font, nametofont
 from functools import partial, cached_property
 from datetime import datetime, timedelta, timezone
@@ -33,6 +36,7 @@ if sys.platform == "win32":
 if sys.platform == "darwin":
     import AppKit
 
+import metrics
 from translate import _
 from cache import ImageCache
 from exceptions import MinerException, ExitRequest
@@ -59,11 +63,30 @@ if TYPE_CHECKING:
     from channel import Channel
     from settings import Settings
     from inventory import DropsCampaign, TimedDrop
-    from miner_service import MinerService
+    from miner_service import Account
 
 
 TK_PADDING = Union[int, Tuple[int, int], Tuple[int, int, int], Tuple[int, int, int, int]]
 DIGITS = ceil(log10(WS_TOPICS_LIMIT))
+CAMPAIGN_IMAGE_SIZE = (108, 144)
+BENEFIT_IMAGE_SIZE = (80, 80)
+# the campaign height assumed until one gets measured, and the spacing between campaigns
+CAMPAIGN_ROW_HEIGHT = 190
+CAMPAIGN_ROW_GAP = 6
+# how many view heights worth of campaigns get their widgets, above and below the view
+INVENTORY_OVERSCAN = 1
+INVENTORY_LAYOUT_PASSES = 4
+# text widths kept measured for the channel list columns
+CHANNELS_MEASURE_CACHE = 4096
+# How often Tk gets to process its events, in seconds: while the window is being interacted with,
+# while it's visible but idle, while it's minimized, and while it's hidden in the tray.
+# Pending GUI updates wake the poller right away, unless the window can't be seen anyway.
+POLL_ACTIVE = 0.02
+POLL_IDLE = 0.1
+POLL_ICONIC = 0.25
+POLL_WITHDRAWN = 1.0
+# how long the window counts as being interacted with, after the last input event
+POLL_ACTIVE_PERIOD = 2.0
 
 
 ######################
@@ -436,6 +459,7 @@ class SelectCombobox(ttk.Combobox):
 
 class StatusBar:
     def __init__(self, manager: GUIManager, master: ttk.Widget):
+        self._manager = manager
         frame = ttk.LabelFrame(master, text=_("gui", "status", "name"), padding=(4, 0, 4, 4))
         frame.grid(column=0, row=0, columnspan=3, sticky="nsew", padx=2)
         self._label = ttk.Label(frame)
@@ -443,6 +467,7 @@ class StatusBar:
 
     def update(self, text: str):
         self._label.config(text=text)
+        self._manager.request_update()
 
     def clear(self):
         self._label.config(text='')
@@ -455,6 +480,7 @@ class _WSEntry(TypedDict):
 
 class WebsocketStatus:
     def __init__(self, manager: GUIManager, master: ttk.Widget):
+        self._manager = manager
         frame = ttk.LabelFrame(master, text=_("gui", "websocket", "name"), padding=(4, 0, 4, 4))
         frame.grid(column=0, row=1, sticky="nsew", padx=2)
         self._status_var = StringVar(frame)
@@ -515,6 +541,7 @@ class WebsocketStatus:
                 topic_lines.append(f"{item['topics']:>{DIGITS}}/{WS_TOPICS_LIMIT}")
         self._status_var.set('\n'.join(status_lines))
         self._topics_var.set('\n'.join(topic_lines))
+        self._manager.request_update()
 
 
 @dataclass
@@ -611,6 +638,7 @@ class LoginForm:
         else:
             user_str = "-"
         self._var.set(f"{status}\n{user_str}")
+        self._manager.request_update()
 
 
 class _BaseVars(TypedDict):
@@ -799,7 +827,22 @@ class CampaignProgress:
 
 
 class ConsoleOutput:
+    """
+    The console, keeping the last `console_lines` lines from the settings file.
+    Printed lines are queued, and inserted all at once on the next frame.
+    """
     def __init__(self, manager: GUIManager, master: ttk.Widget):
+        self._manager = manager
+        self._max_lines: int = max(manager.service.settings.console_lines, 1)
+        # lines waiting to be inserted, and lines already in the text widget
+        self._pending: deque[str] = deque(maxlen=self._max_lines)
+        # guards swapping out the pending lines, against prints from other threads
+        self._pending_lock = threading.Lock()
+        self._lines: int = 0
+        self._flush_after: str | None = None
+        # log records can come from other threads, Tk can only be used from this one
+        self._loop = asyncio.get_running_loop()
+        self._thread_id: int = threading.get_ident()
         frame = ttk.LabelFrame(master, text=_("gui", "output"), padding=(4, 0, 4, 4))
         frame.grid(column=0, row=3, columnspan=3, sticky="nsew", padx=2)
         # tell master frame that the containing row can expand
@@ -826,12 +869,36 @@ class ConsoleOutput:
 
     def print(self, message: str):
         stamp = datetime.now().strftime("%X")
-        if '\n' in message:
-            message = message.replace('\n', f"\n{stamp}: ")
-        self._text.config(state="normal")
-        self._text.insert("end", f"{stamp}: {message}\n")
-        self._text.see("end")  # scroll to the newly added line
-        self._text.config(state="disabled")
+        lines = [f"{stamp}: {line}\n" for line in message.split('\n')]
+        with self._pending_lock:
+            self._pending.extend(lines)
+        if threading.get_ident() != self._thread_id:
+            self._loop.call_soon_threadsafe(self._schedule_flush)
+        else:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_after is None:
+            self._flush_after = self._text.after_idle(self._flush)
+            self._manager.request_update()
+
+    def _flush(self):
+        self._flush_after = None
+        # take the pending lines before inserting them, as Tk lets other threads print meanwhile
+        with self._pending_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, deque(maxlen=self._max_lines)
+        text = self._text
+        text.config(state="normal")
+        text.insert("end", ''.join(pending))
+        self._lines += len(pending)
+        if self._lines > self._max_lines:
+            # drop the oldest lines, past the line cap
+            text.delete("1.0", f"{self._lines - self._max_lines + 1}.0")
+            self._lines = self._max_lines
+        text.see("end")  # scroll to the newly added line
+        text.config(state="disabled")
 
     def configure_theme(self, *, bg: str, fg: str, sel_bg: str, sel_fg: str):
         # Apply colors to the Tk Text widget used for console output
@@ -903,7 +970,15 @@ class ChannelList:
             "viewers", _("gui", "channels", "headings", "viewers"), width_template="1234567"
         )
         self._add_column("acl_base", "📋", width_template="✔")
+        self._columns: tuple[str, ...] = table.cget("columns")
         self._channel_map: dict[str, Channel] = {}
+        # Row changes are collected here, and applied to the table all at once, see _flush.
+        # The rows already in the table have their values cached, to skip unchanged ones.
+        self._dirty: dict[str, Channel] = {}
+        self._removed: set[str] = set()
+        self._rows: dict[str, tuple[str, ...]] = {}
+        self._flush_after: str | None = None
+        self._text_widths: dict[str, int] = {}
 
     def _add_column(
         self,
@@ -957,33 +1032,43 @@ class ChannelList:
             self._buttons["switch"].config(state="disabled")
 
     def _measure(self, text: str) -> int:
-        # we need this because columns have 9-10 pixels of padding that cuts text off
-        return self._font.measure(text) + 10
+        width = self._text_widths.get(text)
+        if width is None:
+            if len(self._text_widths) >= CHANNELS_MEASURE_CACHE:
+                self._text_widths.clear()
+            # we need this because columns have 9-10 pixels of padding that cuts text off
+            width = self._text_widths[text] = self._font.measure(text) + 10
+        return width
 
     def _redraw(self):
         # this forces a redraw that recalculates widget width
         self._table.event_generate("<<ThemeChanged>>")
 
-    def _adjust_width(self, column: str, value: str):
-        # causes the column to expand if the value's width is greater than the current width
-        if column in self._const_width:
-            return
-        value_width = self._measure(value)
-        curr_width = self._table.column(column, "width")
-        if value_width > curr_width:
-            self._table.column(column, width=value_width)
+    def _adjust_widths(self, rows: list[tuple[str, ...]]):
+        # causes the columns to expand if any of the values is wider than the current width
+        widths: dict[str, int] = {}
+        for index, column in enumerate(self._columns):
+            if column in self._const_width:
+                continue
+            value_width = max((self._measure(values[index]) for values in rows), default=0)
+            curr_width = self._table.column(column, "width")
+            if value_width > curr_width:
+                widths[column] = value_width
+        for column, width in widths.items():
+            self._table.column(column, width=width)
+        if widths:
             self._redraw()
 
     def shrink(self):
         # causes the columns to shrink back after long values have been removed from it
-        columns = self._table.cget("columns")
-        iids = self._table.get_children()
-        for column in columns:
+        self._flush()
+        rows = self._rows.values()
+        for index, column in enumerate(self._columns):
             if column in self._const_width:
                 continue
-            if iids:
+            if rows:
                 # table has at least one item
-                width = max(self._measure(self._table.set(i, column)) for i in iids)
+                width = max(self._measure(values[index]) for values in rows)
                 self._table.column(column, width=width)
             else:
                 # no items - use minwidth
@@ -991,27 +1076,78 @@ class ChannelList:
                 self._table.column(column, width=minwidth)
         self._redraw()
 
-    def _set(self, iid: str, column: str, value: str):
-        self._table.set(iid, column, value)
-        self._adjust_width(column, value)
+    def _row_values(self, channel: Channel) -> tuple[str, ...]:
+        # ACL-based
+        acl_based = "✔" if channel.acl_based else "❌"
+        # status
+        if channel.online:
+            status = _("gui", "channels", "online")
+        elif channel.pending_online:
+            status = _("gui", "channels", "pending")
+        else:
+            status = _("gui", "channels", "offline")
+        # game
+        game = str(channel.game or '')
+        # drops
+        drops = "✔" if channel.drops_enabled else "❌"
+        # viewers
+        viewers = ''
+        if channel.viewers is not None:
+            viewers = str(channel.viewers)
+        values = {
+            "channel": channel.name,
+            "status": status,
+            "game": game,
+            "drops": drops,
+            "viewers": viewers,
+            "acl_base": acl_based,
+        }
+        return tuple(values[cid] for cid in self._columns)
+
+    def _schedule_flush(self):
+        if self._flush_after is None:
+            self._flush_after = self._table.after_idle(self._flush)
+            self._manager.request_update()
 
-    def _insert(self, iid: str, values: dict[str, str]):
-        to_insert: list[str] = []
-        for cid in self._table.cget("columns"):
-            value = values[cid]
-            to_insert.append(value)
-            self._adjust_width(cid, value)
-        self._table.insert(parent='', index="end", iid=iid, values=to_insert)
+    def _flush(self):
+        """
+        Applies the pending row changes to the table, all at once.
+        """
+        if self._flush_after is not None:
+            self._table.after_cancel(self._flush_after)
+            self._flush_after = None
+        table = self._table
+        if self._removed:
+            table.delete(*self._removed)
+            self._removed.clear()
+        changed: list[tuple[str, ...]] = []
+        for iid, channel in self._dirty.items():
+            values = self._row_values(channel)
+            old_values = self._rows.get(iid)
+            if old_values is None:
+                table.insert(parent='', index="end", iid=iid, values=values)
+            elif values != old_values:
+                table.item(iid, values=values)
+            else:
+                continue
+            self._rows[iid] = values
+            changed.append(values)
+        self._dirty.clear()
+        if changed:
+            self._adjust_widths(changed)
 
     def clear_watching(self):
         for iid in self._table.tag_has("watching"):
             self._table.item(iid, tags='')
 
     def set_watching(self, channel: Channel):
+        # the channel's row has to be in the table already
+        self._flush()
         self.clear_watching()
         iid = channel.iid
         self._table.item(iid, tags="watching")
         self._table.see(iid)
+        self._manager.request_update()
 
     def get_selection(self) -> Channel | None:
         if not self._channel_map:
@@ -1025,57 +1161,31 @@ class ChannelList:
         self._table.selection_set('')
 
     def clear(self):
-        iids = self._table.get_children()
-        self._table.delete(*iids)
+        self._dirty.clear()
+        self._removed.clear()
+        # NOTE: This includes the rows removed since the last flush, that aren't in _rows anymore
+        self._table.delete(*self._table.get_children())
+        self._rows.clear()
         self._channel_map.clear()
         self.shrink()
 
     def display(self, channel: Channel, *, add: bool = False):
         iid = channel.iid
-        if not add and iid not in self._channel_map:
-            # the channel isn't on the list and we're not supposed to add it
-            return
-        # ACL-based
-        acl_based = "✔" if channel.acl_based else "❌"
-        # status
-        if channel.online:
-            status = _("gui", "channels", "online")
-        elif channel.pending_online:
-            status = _("gui", "channels", "pending")
-        else:
-            status = _("gui", "channels", "offline")
-        # game
-        game = str(channel.game or '')
-        # drops
-        drops = "✔" if channel.drops_enabled else "❌"
-        # viewers
-        viewers = ''
-        if channel.viewers is not None:
-            viewers = str(channel.viewers)
-        if iid in self._channel_map:
-            self._set(iid, "game", game)
-            self._set(iid, "drops", drops)
-            self._set(iid, "status", status)
-            self._set(iid, "viewers", viewers)
-            self._set(iid, "acl_base", acl_based)
-        elif add:
+        if iid not in self._channel_map:
+            if not add:
+                # the channel isn't on the list and we're not supposed to add it
+                return
             self._channel_map[iid] = channel
-            self._insert(
-                iid,
-                {
-                    "game": game,
-                    "drops": drops,
-                    "status": status,
-                    "viewers": viewers,
-                    "acl_base": acl_based,
-                    "channel": channel.name,
-                },
-            )
+        self._dirty[iid] = channel
+        self._schedule_flush()
 
     def remove(self, channel: Channel):
         iid = channel.iid
         del self._channel_map[iid]
-        self._table.delete(iid)
+        self._dirty.pop(iid, None)
+        if self._rows.pop(iid, None) is not None:
+            self._removed.add(iid)
+            self._schedule_flush()
 
 
 class TrayIcon:
@@ -1175,6 +1285,7 @@ class TrayIcon:
             # self.stop()
             self.icon.visible = False
         self._manager._root.deiconify()
+        self._manager.request_update(force=True)
 
     def notify(
         self, message: str, title: str | None = None, duration: float = 10
@@ -1227,12 +1338,172 @@ class Notebook:
         self._nb.bind("<<NotebookTabChanged>>", callback, True)
 
 
-class CampaignDisplay(TypedDict):
-    frame: ttk.Frame
-    status: ttk.Label
+class _DropDisplay:
+    def __init__(self, master: ttk.Frame) -> None:
+        self.frame = ttk.Frame(master, relief="ridge", borderwidth=1, padding=5)
+        self.benefits_frame = ttk.Frame(self.frame)
+        self.benefits_frame.grid(column=0, row=0)
+        self.benefits: list[ttk.Label] = []
+        self.progress = ttk.Label(self.frame, justify=tk.CENTER)
+        self.progress.grid(column=0, row=1)
+
+
+class _CampaignCard:
+    """
+    The widgets displaying a single campaign.
+    Cards are recycled, by being assigned another campaign once theirs has scrolled out of view.
+    """
+    def __init__(self, inventory: InventoryOverview, canvas: tk.Canvas) -> None:
+        self._inventory = inventory
+        self._canvas = canvas
+        self.campaign: DropsCampaign | None = None
+        self._images_task: asyncio.Task[None] | None = None
+        self.frame = frame = ttk.Frame(canvas, relief="ridge", borderwidth=1, padding=4)
+        frame.rowconfigure(4, weight=1)
+        frame.columnconfigure(1, weight=1)
+        frame.columnconfigure(3, weight=10000)
+        # Name
+        self.name = ttk.Label(frame, takefocus=False, width=45)
+        self.name.grid(column=0, row=0, columnspan=2, sticky="w")
+        # Status
+        self.status = ttk.Label(frame, takefocus=False)
+        self.status.grid(column=1, row=1, sticky="w", padx=4)
+        # Starts / Ends
+        self.times = MouseOverLabel(frame, takefocus=False)
+        self.times.grid(column=1, row=2, sticky="w", padx=4)
+        # Linking status
+        self.link = ttk.Label(frame, takefocus=False, padding=0)
+        self.link.grid(column=1, row=3, sticky="w", padx=4)
+        self.link.bind("<ButtonRelease-1>", self._open_link)
+        # ACL channels
+        self.acl = ttk.Label(frame, takefocus=False)
+        self.acl.grid(column=1, row=4, sticky="nw", padx=4)
+        # Image
+        self.image = ttk.Label(frame)
+        self.image.grid(column=0, row=1, rowspan=4)
+        # Drops separator
+        ttk.Separator(
+            frame, orient="vertical", takefocus=False
+        ).grid(column=2, row=0, rowspan=5, sticky="ns")
+        # Drops display
+        self.drops_row = ttk.Frame(frame)
+        self.drops_row.grid(column=3, row=0, rowspan=5, sticky="nsew", padx=4)
+        self.drops_row.rowconfigure(0, weight=1)
+        self.drops: list[_DropDisplay] = []
+        self.item: int = canvas.create_window(0, 0, anchor="nw", window=frame, state="hidden")
+
+    def _open_link(self, event: tk.Event[ttk.Label]) -> None:
+        if self.campaign is not None and not self.campaign.eligible:
+            webopen(self.campaign.link_url)
+
+    def update_status(self) -> None:
+        assert self.campaign is not None
+        status_text, status_color = self._inventory.get_status(self.campaign)
+        self.status.config(text=status_text, foreground=status_color)
+
+    def assign(self, campaign: DropsCampaign) -> None:
+        inventory = self._inventory
+        self.campaign = campaign
+        self.name.config(text=campaign.name)
+        self.update_status()
+        self.times.config(
+            text=_("gui", "inventory", "ends").format(
+                time=campaign.ends_at.astimezone().replace(microsecond=0, tzinfo=None)
+            ),
+            alt_text=_("gui", "inventory", "starts").format(
+                time=campaign.starts_at.astimezone().replace(microsecond=0, tzinfo=None)
+            ),
+            reverse=campaign.upcoming,
+        )
+        if campaign.eligible:
+            self.link.config(
+                style='',
+                cursor='',
+                text=_("gui", "inventory", "status", "linked"),
+                foreground="green",
+            )
+        else:
+            self.link.config(
+                style="Link.TLabel",
+                cursor="hand2",
+                text=_("gui", "inventory", "status", "not_linked"),
+                foreground="red",
+            )
+        acl = campaign.allowed_channels
+        if acl:
+            if len(acl) <= 5:
+                allowed_text: str = '\n'.join(ch.name for ch in acl)
+            else:
+                allowed_text = '\n'.join(ch.name for ch in acl[:4])
+                allowed_text += (
+                    f"\n{_('gui', 'inventory', 'and_more').format(amount=len(acl) - 4)}"
+                )
+        else:
+            allowed_text = _("gui", "inventory", "all_channels")
+        self.acl.config(text=f"{_('gui', 'inventory', 'allowed_channels')}\n{allowed_text}")
+        # the placeholders keep the layout in place, until the images are loaded
+        self.image.config(image=inventory.placeholder(CAMPAIGN_IMAGE_SIZE))
+        while len(self.drops) < len(campaign.drops):
+            self.drops.append(_DropDisplay(self.drops_row))
+        for i, drop_display in enumerate(self.drops):
+            if i >= len(campaign.drops):
+                drop_display.frame.grid_remove()
+                continue
+            drop = campaign.drops[i]
+            drop_display.frame.grid(column=i, row=0, padx=4)
+            benefit_labels = drop_display.benefits
+            while len(benefit_labels) < len(drop.benefits):
+                benefit_labels.append(
+                    ttk.Label(drop_display.benefits_frame, compound="bottom")
+                )
+            for j, label in enumerate(benefit_labels):
+                if j >= len(drop.benefits):
+                    label.grid_remove()
+                    continue
+                label.config(
+                    text=drop.benefits[j].name, image=inventory.placeholder(BENEFIT_IMAGE_SIZE)
+                )
+                label.grid(column=j, row=0, padx=5)
+            inventory._drops[drop.id] = drop_display.progress
+            inventory.update_progress(drop, drop_display.progress)
+        self._images_task = asyncio.create_task(self._load_images(campaign))
+
+    async def _load_images(self, campaign: DropsCampaign) -> None:
+        cache = self._inventory._cache
+        images: list[PhotoImage] = await asyncio.gather(
+            cache.get(campaign.image_url, size=CAMPAIGN_IMAGE_SIZE),
+            *(
+                cache.get(benefit.image_url, BENEFIT_IMAGE_SIZE)
+                for drop in campaign.drops
+                for benefit in drop.benefits
+            ),
+        )
+        # NOTE: The task is cancelled when the card is released, so it's still assigned here
+        self.image.config(image=images[0])
+        labels = (
+            label
+            for drop_display, drop in zip(self.drops, campaign.drops)
+            for label in drop_display.benefits[:len(drop.benefits)]
+        )
+        for label, image in zip(labels, images[1:]):
+            label.config(image=image)
+
+    def release(self) -> None:
+        if self._images_task is not None:
+            self._images_task.cancel()
+            self._images_task = None
+        if self.campaign is not None:
+            for drop in self.campaign.drops:
+                self._inventory._drops.pop(drop.id, None)
+            self.campaign = None
+        self._canvas.itemconfigure(self.item, state="hidden")
 
 
 class InventoryOverview:
+    """
+    A virtualised list of the campaigns: only the campaigns within, or near the visible part
+    of the canvas have their widgets created, and those widgets are recycled on scroll.
+    """
     def __init__(self, manager: GUIManager, master: ttk.Widget):
         self._manager = manager
         self._cache: ImageCache = manager._cache
@@ -1307,33 +1578,52 @@ class InventoryOverview:
         master.columnconfigure(0, weight=1)
         xscroll = ttk.Scrollbar(master, orient="horizontal", command=self._canvas.xview)
         xscroll.grid(column=0, row=2, sticky="ew")
-        yscroll = ttk.Scrollbar(master, orient="vertical", command=self._canvas.yview)
-        yscroll.grid(column=1, row=1, sticky="ns")
-        self._canvas.configure(xscrollcommand=xscroll.set, yscrollcommand=yscroll.set)
+        self._yscroll = ttk.Scrollbar(master, orient="vertical", command=self._canvas.yview)
+        self._yscroll.grid(column=1, row=1, sticky="ns")
+        self._canvas.configure(xscrollcommand=xscroll.set, yscrollcommand=self._on_yscroll)
         self._canvas.bind("<Configure>", self._canvas_update)
-        self._main_frame = ttk.Frame(self._canvas)
         self._canvas.bind(
             "<Enter>", lambda e: self._canvas.bind_all("<MouseWheel>", self._on_mousewheel)
         )
         self._canvas.bind("<Leave>", lambda e: self._canvas.unbind_all("<MouseWheel>"))
-        self._canvas.create_window(0, 0, anchor="nw", window=self._main_frame)
-        self._campaigns: dict[DropsCampaign, CampaignDisplay] = {}
+        # all campaigns, in the order they were added, and the ones passing the filters
+        self._campaigns: list[DropsCampaign] = []
+        self._shown: list[DropsCampaign] = []
+        # where each shown campaign starts, and the measured campaign heights
+        self._offsets: list[int] = []
+        self._heights: dict[DropsCampaign, int] = {}
+        self._row_height: int = CAMPAIGN_ROW_HEIGHT
+        self._width: int = 0
+        self._scrollregion: tuple[int, int, int, int] = (0, 0, 0, 0)
+        # the cards currently assigned, and the free ones
+        self._cards: dict[DropsCampaign, _CampaignCard] = {}
+        self._free_cards: list[_CampaignCard] = []
+        self._placeholders: dict[tuple[int, int], tk.PhotoImage] = {}
+        self._layout_after: str | None = None
+        self._in_layout: bool = False
         self._drops: dict[str, ttk.Label] = {}
 
     def configure_theme(self, *, bg: str):
         # Canvas background needs manual control
         self._canvas.configure(bg=bg)
 
-    def _update_visibility(self, campaign: DropsCampaign):
+    def placeholder(self, size: tuple[int, int]) -> tk.PhotoImage:
+        if size not in self._placeholders:
+            width, height = size
+            self._placeholders[size] = tk.PhotoImage(
+                master=self._canvas, width=width, height=height
+            )
+        return self._placeholders[size]
+
+    def _is_shown(self, campaign: DropsCampaign) -> bool:
         # True if the campaign is supposed to show, False makes it hidden.
-        frame = self._campaigns[campaign]["frame"]
         not_linked = bool(self._filters["not_linked"].get())
         expired = bool(self._filters["expired"].get())
         excluded = bool(self._filters["excluded"].get())
         upcoming = bool(self._filters["upcoming"].get())
         finished = bool(self._filters["finished"].get())
         priority_only = self._settings.priority_mode is PriorityMode.PRIORITY_ONLY
-        if (
+        return bool(
             campaign.required_minutes > 0  # don't show sub-only campaigns
             and (not_linked or campaign.eligible)
             and (campaign.active or upcoming and campaign.upcoming or expired and campaign.expired)
@@ -1344,10 +1634,7 @@ class InventoryOverview:
                 )
             )
             and (finished or not campaign.finished)
-        ):
-            frame.grid()
-        else:
-            frame.grid_remove()
+        )
 
     def _on_tab_switched(self, event: tk.Event[ttk.Notebook]) -> None:
         if self._manager.tabs.current_tab() == 1:
@@ -1367,18 +1654,23 @@ class InventoryOverview:
         return (status_text, status_color)
 
     def refresh(self):
-        for campaign in self._campaigns:
-            # status
-            status_label = self._campaigns[campaign]["status"]
-            status_text, status_color = self.get_status(campaign)
-            status_label.config(text=status_text, foreground=status_color)
-            # visibility
-            self._update_visibility(campaign)
-        self._canvas_update()
+        # the filters are applied to the list of campaigns, no widgets are rebuilt
+        self._shown = [campaign for campaign in self._campaigns if self._is_shown(campaign)]
+        for card in self._cards.values():
+            card.update_status()
+        self._layout()
+
+    def _schedule_layout(self) -> None:
+        if self._layout_after is None and not self._in_layout:
+            self._layout_after = self._canvas.after_idle(self._layout)
+            self._manager.request_update()
+
+    def _on_yscroll(self, first: float | str, last: float | str) -> None:
+        self._yscroll.set(first, last)
+        self._schedule_layout()
 
     def _canvas_update(self, event: tk.Event[tk.Canvas] | None = None):
-        self._canvas.update_idletasks()
-        self._canvas.configure(scrollregion=self._canvas.bbox("all"))
+        self._schedule_layout()
 
     def _on_mousewheel(self, event: tk.Event[tk.Misc]):
         delta = -1 if event.delta > 0 else 1
@@ -1389,115 +1681,97 @@ class InventoryOverview:
             scroll = self._canvas.yview_scroll
         scroll(delta, "units")
 
+    def _layout(self) -> None:
+        if self._layout_after is not None:
+            self._canvas.after_cancel(self._layout_after)
+            self._layout_after = None
+        # Placing the cards measures them, which can move the ones below,
+        # and resizes the scroll region, which can move the view - repeat until settled.
+        # NOTE: Measuring processes the idle tasks, which could start another layout midway.
+        self._in_layout = True
+        try:
+            for _ in range(INVENTORY_LAYOUT_PASSES):
+                if not self._place():
+                    break
+        finally:
+            self._in_layout = False
+
+    def _place(self) -> bool:
+        """
+        Positions the shown campaigns, and assigns cards to the ones within or near the view.
+        Returns True if any of the assigned campaigns turned out to be of a different height
+        than expected, or the scroll region has changed, which requires positioning them again.
+        """
+        canvas = self._canvas
+        offsets: list[int] = []
+        total = 0
+        for campaign in self._shown:
+            offsets.append(total)
+            total += self._heights.get(campaign, self._row_height) + CAMPAIGN_ROW_GAP
+        self._offsets = offsets
+        view_height = max(canvas.winfo_height(), 1)
+        view_top = canvas.canvasy(0)
+        top = view_top - view_height * INVENTORY_OVERSCAN
+        bottom = view_top + view_height * (1 + INVENTORY_OVERSCAN)
+        first = max(bisect_right(offsets, top) - 1, 0)
+        last = bisect_left(offsets, bottom)
+        wanted = self._shown[first:last]
+        wanted_set = set(wanted)
+        for campaign in list(self._cards):
+            if campaign not in wanted_set:
+                card = self._cards.pop(campaign)
+                card.release()
+                self._free_cards.append(card)
+        for campaign in wanted:
+            if campaign not in self._cards:
+                card = self._free_cards.pop() if self._free_cards else _CampaignCard(self, canvas)
+                card.assign(campaign)
+                self._cards[campaign] = card
+        if self._cards:
+            # lets the cards compute their requested size
+            canvas.update_idletasks()
+        changed = False
+        for index, campaign in enumerate(wanted, start=first):
+            card = self._cards[campaign]
+            height = card.frame.winfo_reqheight()
+            self._width = max(self._width, card.frame.winfo_reqwidth())
+            if not self._heights and height != self._row_height:
+                # the first campaign measured sets the estimate for the rest
+                self._row_height = height
+                changed = True
+            if self._heights.get(campaign, self._row_height) != height:
+                changed = True
+            self._heights[campaign] = height
+            canvas.coords(card.item, 0, offsets[index])
+        width = max(self._width, canvas.winfo_width())
+        for card in self._cards.values():
+            canvas.itemconfigure(card.item, state="normal", width=width)
+        scrollregion = (0, 0, width, total)
+        if scrollregion != self._scrollregion:
+            # NOTE: Only reconfigure on change, as it triggers the scroll command, laying out again
+            self._scrollregion = scrollregion
+            canvas.configure(scrollregion=scrollregion)
+            changed = True
+        return changed
+
     async def add_campaign(self, campaign: DropsCampaign) -> None:
-        campaign_frame = ttk.Frame(self._main_frame, relief="ridge", borderwidth=1, padding=4)
-        campaign_frame.grid(column=0, row=len(self._campaigns), sticky="nsew", pady=3)
-        campaign_frame.rowconfigure(4, weight=1)
-        campaign_frame.columnconfigure(1, weight=1)
-        campaign_frame.columnconfigure(3, weight=10000)
-        # Name
-        ttk.Label(
-            campaign_frame, text=campaign.name, takefocus=False, width=45
-        ).grid(column=0, row=0, columnspan=2, sticky="w")
-        # Status
-        status_text, status_color = self.get_status(campaign)
-        status_label = ttk.Label(
-            campaign_frame, text=status_text, takefocus=False, foreground=status_color
-        )
-        status_label.grid(column=1, row=1, sticky="w", padx=4)
-        # NOTE: We have to save the campaign's frame and status before any awaits happen,
-        # otherwise the len(self._campaigns) call may overwrite an existing frame,
-        # if the campaigns are added concurrently.
-        self._campaigns[campaign] = {
-            "frame": campaign_frame,
-            "status": status_label,
-        }
-        # Starts / Ends
-        MouseOverLabel(
-            campaign_frame,
-            text=_("gui", "inventory", "ends").format(
-                time=campaign.ends_at.astimezone().replace(microsecond=0, tzinfo=None)
-            ),
-            alt_text=_("gui", "inventory", "starts").format(
-                time=campaign.starts_at.astimezone().replace(microsecond=0, tzinfo=None)
-            ),
-            reverse=campaign.upcoming,
-            takefocus=False,
-        ).grid(column=1, row=2, sticky="w", padx=4)
-        # Linking status
-        if campaign.eligible:
-            link_kwargs = {
-                "style": '',
-                "text": _("gui", "inventory", "status", "linked"),
-                "foreground": "green",
-            }
-        else:
-            link_kwargs = {
-                "text": _("gui", "inventory", "status", "not_linked"),
-                "foreground": "red",
-            }
-        LinkLabel(
-            campaign_frame,
-            link=campaign.link_url,
-            takefocus=False,
-            padding=0,
-            **link_kwargs,
-        ).grid(column=1, row=3, sticky="w", padx=4)
-        # ACL channels
-        acl = campaign.allowed_channels
-        if acl:
-            if len(acl) <= 5:
-                allowed_text: str = '\n'.join(ch.name for ch in acl)
-            else:
-                allowed_text = '\n'.join(ch.name for ch in acl[:4])
-                allowed_text += (
-                    f"\n{_('gui', 'inventory', 'and_more').format(amount=len(acl) - 4)}"
-                )
-        else:
-            allowed_text = _("gui", "inventory", "all_channels")
-        ttk.Label(
-            campaign_frame,
-            text=f"{_('gui', 'inventory', 'allowed_channels')}\n{allowed_text}",
-            takefocus=False,
-        ).grid(column=1, row=4, sticky="nw", padx=4)
-        # Image
-        campaign_image = await self._cache.get(campaign.image_url, size=(108, 144))
-        ttk.Label(campaign_frame, image=campaign_image).grid(column=0, row=1, rowspan=4)
-        # Drops separator
-        ttk.Separator(
-            campaign_frame, orient="vertical", takefocus=False
-        ).grid(column=2, row=0, rowspan=5, sticky="ns")
-        # Drops display
-        drops_row = ttk.Frame(campaign_frame)
-        drops_row.grid(column=3, row=0, rowspan=5, sticky="nsew", padx=4)
-        drops_row.rowconfigure(0, weight=1)
-        for i, drop in enumerate(campaign.drops):
-            drop_frame = ttk.Frame(drops_row, relief="ridge", borderwidth=1, padding=5)
-            drop_frame.grid(column=i, row=0, padx=4)
-            benefits_frame = ttk.Frame(drop_frame)
-            benefits_frame.grid(column=0, row=0)
-            benefit_images: list[PhotoImage] = await asyncio.gather(
-                *(self._cache.get(benefit.image_url, (80, 80)) for benefit in drop.benefits)
-            )
-            for i, benefit, image in zip(range(len(drop.benefits)), drop.benefits, benefit_images):
-                ttk.Label(
-                    benefits_frame,
-                    text=benefit.name,
-                    image=image,
-                    compound="bottom",
-                ).grid(column=i, row=0, padx=5)
-            self._drops[drop.id] = label = ttk.Label(drop_frame, justify=tk.CENTER)
-            self.update_progress(drop, label)
-            label.grid(column=0, row=1)
-        if self._manager.tabs.current_tab() == 1:
-            self._update_visibility(campaign)
-            self._canvas_update()
+        # NOTE: The widgets are only created once the campaign scrolls into view
+        self._campaigns.append(campaign)
+        if self._is_shown(campaign):
+            self._shown.append(campaign)
+            self._schedule_layout()
 
     def clear(self) -> None:
-        for child in self._main_frame.winfo_children():
-            child.destroy()
+        for card in self._cards.values():
+            card.release()
+            self._free_cards.append(card)
+        self._cards.clear()
         self._drops.clear()
         self._campaigns.clear()
+        self._shown.clear()
+        self._heights.clear()
+        self._width = 0
+        self._schedule_layout()
 
     def update_progress(self, drop: TimedDrop, label: ttk.Label) -> None:
         progress_text: str
@@ -1543,6 +1817,7 @@ class InventoryOverview:
         if label is None:
             return
         self.update_progress(drop, label)
+        self._manager.request_update()
 
 
 def proxy_validate(entry: PlaceholderEntry, settings: Settings) -> bool:
@@ -2165,11 +2440,15 @@ class HelpTab:
 
 
 class GUIManager:
-    def __init__(self, twitch: Twitch, *, service: MinerService | None = None):
+    def __init__(self, twitch: Twitch, *, service: Account | None = None):
         self._twitch: Twitch = twitch
-        self._service: MinerService | None = service or getattr(twitch, "_service", None)
+        self._service: Account | None = service or getattr(twitch, "_service", None)
         self._poll_task: asyncio.Task[NoReturn] | None = None
         self._close_requested = asyncio.Event()
+        # set to run the poller early, see request_update
+        self._poll_wakeup = asyncio.Event()
+        self._window_visible: bool = False
+        self._last_input: float = 0.0
         self._root = root = Tk(className=WINDOW_TITLE)
         # withdraw immediately to prevent the window from flashing
         self._root.withdraw()
@@ -2177,6 +2456,9 @@ class GUIManager:
         set_root_icon(root, resource_path("icons/pickaxe.ico"))
         root.title(WINDOW_TITLE)  # window title
         root.bind_all("<KeyPress-Escape>", self.unfocus)  # pressing ESC unfocuses selection
+        # input events on any of the widgets make the poller run more often, see _poll
+        for sequence in ("<Motion>", "<ButtonPress>", "<KeyPress>", "<MouseWheel>"):
+            root.bind(sequence, self._on_input, add=True)
         # Image cache for displaying images
         self._cache = ImageCache(self)
 
@@ -2332,7 +2614,7 @@ class GUIManager:
         return self._close_requested.is_set()
 
     @property
-    def service(self) -> MinerService:
+    def service(self) -> Account:
         assert self._service is not None
         return self._service
 
@@ -2369,20 +2651,54 @@ class GUIManager:
     async def _poll(self):
         """
         This runs the Tkinter event loop via asyncio instead of calling mainloop.
-        0.05s gives similar performance and CPU usage.
         Not ideal, but the simplest way to avoid threads, thread safety,
         loop.call_soon_threadsafe, futures and all of that.
+
+        The polling interval adapts to the window: short while it's being interacted with,
+        longer while it's idle, and much longer while it's minimized or hidden in the tray.
+        Pending GUI updates cut the wait short, see request_update.
         """
-        update = self._root.update
+        loop = asyncio.get_running_loop()
+        root = self._root
+        update = root.update
+        wakeup = self._poll_wakeup
         while True:
+            wakeup.clear()
             try:
                 update()
+                # 'normal', 'zoomed', 'iconic' or 'withdrawn'
+                window_state = root.state()
             except tk.TclError:
                 # root has been destroyed
                 break
-            await asyncio.sleep(0.05)
+            metrics.GUI_POLLS.labels(window_state).inc()
+            self._window_visible = window_state not in ("iconic", "withdrawn")
+            if window_state == "withdrawn":
+                delay = POLL_WITHDRAWN
+            elif window_state == "iconic":
+                delay = POLL_ICONIC
+            elif monotonic() - self._last_input < POLL_ACTIVE_PERIOD:
+                delay = POLL_ACTIVE
+            else:
+                delay = POLL_IDLE
+            handle = loop.call_later(delay, wakeup.set)
+            try:
+                await wakeup.wait()
+            finally:
+                handle.cancel()
         self._poll_task = None
 
+    def _on_input(self, event: tk.Event[tk.Misc]) -> None:
+        self._last_input = monotonic()
+
+    def request_update(self, *, force: bool = False) -> None:
+        """
+        Lets Tk process the pending GUI changes right away, instead of at the next poll.
+        Does nothing while the window can't be seen, unless forced.
+        """
+        if force or self._window_visible:
+            self._poll_wakeup.set()
+
     def close(self, *args) -> int:
         """
         Requests the GUI application to close.
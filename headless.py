@@ -12,7 +12,7 @@ from constants import OUTPUT_FORMATTER
 if TYPE_CHECKING:
     from channel import Channel
     from inventory import DropsCampaign, TimedDrop
-    from miner_service import MinerService
+    from miner_service import Account
     from twitch import Twitch
     from utils import Game
 
@@ -20,6 +20,14 @@ if TYPE_CHECKING:
 logger = logging.getLogger("TwitchDrops")
 
 
+class _AccountLogger(logging.LoggerAdapter):
+    """
+    Prefixes the messages with the account name, for every account but the main one.
+    """
+    def process(self, msg: Any, kwargs: Any) -> tuple[Any, Any]:
+        return f"{self.extra['prefix']}{msg}", kwargs
+
+
 class _HeadlessTray:
     def __init__(self, manager: "HeadlessGUI") -> None:
         self._manager = manager
@@ -30,9 +38,9 @@ class _HeadlessTray:
 
     def notify(self, message: str, title: str | None = None) -> None:
         if title:
-            logger.info(f"{title}: {message}")
+            self._manager.logger.info(f"{title}: {message}")
         else:
-            logger.info(message)
+            self._manager.logger.info(message)
 
     def stop(self) -> None:
         return
@@ -43,7 +51,7 @@ class _HeadlessStatus:
         self._manager = manager
 
     def update(self, message: str) -> None:
-        logger.info(message)
+        self._manager.logger.info(message)
 
 
 class _HeadlessChannels:
@@ -63,14 +71,14 @@ class _HeadlessChannels:
     def set_watching(self, channel: Channel | None) -> None:
         self._selection = channel
         if channel is not None:
-            logger.info(_("status", "watching").format(channel=channel.name))
+            self._manager.logger.info(_("status", "watching").format(channel=channel.name))
 
     def get_selection(self) -> Channel | None:
         return self._selection
 
     def display(self, channel: Channel, *, add: bool = True) -> None:
         if add:
-            logger.debug(f"Tracking channel: {channel.name}")
+            self._manager.logger.debug(f"Tracking channel: {channel.name}")
 
     def remove(self, channel: Channel) -> None:
         if self._selection is channel:
@@ -85,10 +93,10 @@ class _HeadlessInventory:
         return
 
     async def add_campaign(self, campaign: DropsCampaign) -> None:
-        logger.info(f"Added campaign: {campaign.game.name}")
+        self._manager.logger.info(f"Added campaign: {campaign.game.name}")
 
     def update_drop(self, drop: TimedDrop) -> None:
-        logger.debug(f"Drop updated: {drop}")
+        self._manager.logger.debug(f"Drop updated: {drop}")
 
 
 class _HeadlessProgress:
@@ -133,17 +141,23 @@ class _HeadlessLogin:
         raise NotImplementedError("Headless mode uses cookie-based auth only")
 
     async def ask_enter_code(self, page_url, user_code: str) -> None:
-        logger.info(f"Open {page_url} and enter code: {user_code}")
+        self._manager.logger.info(f"Open {page_url} and enter code: {user_code}")
 
     def update(self, status: str, user_id: int | None) -> None:
-        logger.info(f"{status} ({user_id or '-'})")
+        self._manager.logger.info(f"{status} ({user_id or '-'})")
 
 
 class HeadlessGUI:
-    def __init__(self, twitch: "Twitch", *, service: "MinerService | None" = None) -> None:
+    def __init__(self, twitch: "Twitch", *, service: "Account | None" = None) -> None:
         self._twitch = twitch
-        self._service: MinerService | None = service or getattr(twitch, "_service", None)
+        self._service: Account | None = service or getattr(twitch, "_service", None)
         self._close_requested = asyncio.Event()
+        service = self._service
+        # with several accounts in one process, tell their messages apart
+        prefix = ""
+        if service is not None and service is not service.host.main:
+            prefix = f"[{service.name}] "
+        self.logger = _AccountLogger(logger, {"prefix": prefix})
         self.tray = _HeadlessTray(self)
         self.status = _HeadlessStatus(self)
         self.channels = _HeadlessChannels(self)
@@ -159,7 +173,7 @@ class HeadlessGUI:
             self._handler = handler
 
     @property
-    def service(self) -> "MinerService":
+    def service(self) -> "Account":
         assert self._service is not None
         return self._service
 
@@ -171,7 +185,7 @@ class HeadlessGUI:
         self._close_requested.clear()
 
     def start(self) -> None:
-        logger.debug("Starting in headless mode")
+        self.logger.debug("Starting in headless mode")
 
     def stop(self) -> None:
         self.progress.stop_timer()
@@ -197,7 +211,7 @@ class HeadlessGUI:
         return
 
     def print(self, message: str) -> None:
-        logger.info(message)
+        self.logger.info(message)
 
     async def wait_until_closed(self):
         return
@@ -208,7 +222,7 @@ class HeadlessGUI:
         return await coro
 
     def display_drop(self, drop: TimedDrop, *, countdown: bool = True, subone: bool = False):
-        logger.info(drop.rewards_text())
+        self.logger.info(drop.rewards_text())
 
     def clear_drop(self) -> None:
         # In headless mode there's no UI to clear, but keep the API consistent
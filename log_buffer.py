@@ -0,0 +1,138 @@
+"""
+The most recent log records, kept in memory, searchable through the Web API.
+
+Meant mostly for headless deployments, where the console output isn't at hand.
+"""
+from __future__ import annotations
+
+import re
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, NamedTuple
+
+
+# records kept by default
+DEFAULT_CAPACITY = 5000
+
+
+class _Entry(NamedTuple):
+    seq: int
+    created: float
+    levelno: int
+    levelname: str
+    name: str
+    message: str
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "time": datetime.fromtimestamp(self.created, timezone.utc).isoformat(),
+            "level": self.levelname,
+            "logger": self.name,
+            "message": self.message,
+        }
+
+
+def _parse_level(level: str | int) -> int:
+    if isinstance(level, int):
+        return level
+    if level.isdigit():
+        return int(level)
+    levelno = logging.getLevelName(level.upper())
+    if not isinstance(levelno, int):
+        raise ValueError(f"Unknown log level: {level}")
+    return levelno
+
+
+class LogBuffer(logging.Handler):
+    """
+    A logging handler keeping the last `capacity` records in a ring buffer.
+
+    Each record gets a sequence number, which keeps growing as the oldest records are dropped,
+    and serves as the paging cursor.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        super().__init__()
+        self._entries: deque[_Entry] = deque(maxlen=max(capacity, 1))
+        self._seq: int = 0
+        # guards the entries against the searches, emit is guarded by the handler's own lock
+        self._entries_lock = threading.Lock()
+        # the level and time are kept separately, the message keeps the traceback, if any
+        self.setFormatter(logging.Formatter("{message}", style="{"))
+
+    @property
+    def capacity(self) -> int:
+        assert self._entries.maxlen is not None
+        return self._entries.maxlen
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            message = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._entries_lock:
+            self._seq += 1
+            self._entries.append(
+                _Entry(
+                    self._seq,
+                    record.created,
+                    record.levelno,
+                    record.levelname,
+                    record.name,
+                    message,
+                )
+            )
+
+    def search(
+        self,
+        before: int | None = None,
+        limit: int = 50,
+        *,
+        query: str | None = None,
+        regex: bool = False,
+        level: str | int | None = None,
+        logger: str | None = None,
+    ) -> tuple[list[dict[str, Any]], int | None]:
+        """
+        Returns up to `limit` records older than the `before` sequence number, newest first,
+        together with the cursor to pass as `before` for the next page.
+
+        Records can be filtered by a case-insensitive text or regular expression `query`,
+        a minimum `level`, and a `logger` name, which includes the loggers below it.
+        Raises ValueError on an invalid level or regular expression.
+        """
+        pattern: re.Pattern[str] | None = None
+        if query:
+            try:
+                pattern = re.compile(query if regex else re.escape(query), re.IGNORECASE)
+            except re.error as exc:
+                raise ValueError(f"Invalid regular expression: {exc}") from None
+        min_level = _parse_level(level) if level is not None else None
+        with self._entries_lock:
+            entries = list(self._entries)
+        items: list[_Entry] = []
+        for entry in reversed(entries):
+            if before is not None and entry.seq >= before:
+                continue
+            if min_level is not None and entry.levelno < min_level:
+                continue
+            if logger is not None and not (
+                entry.name == logger or entry.name.startswith(f"{logger}.")
+            ):
+                continue
+            if pattern is not None and pattern.search(entry.message) is None:
+                continue
+            items.append(entry)
+            if len(items) >= limit:
+                break
+        next_cursor: int | None = None
+        if items and len(items) >= limit and items[-1].seq > entries[0].seq:
+            next_cursor = items[-1].seq
+        return [entry.as_dict() for entry in items], next_cursor
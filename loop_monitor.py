@@ -0,0 +1,239 @@
+"""
+Event loop lag monitoring, catching whatever blocks the loop for too long.
+
+A sampler task measures how late the loop wakes it up. A watcher thread notices when
+the sampler stops running for longer than the threshold, and captures the stack of the loop
+thread while it's blocked, along with the task that was running at the time.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import asyncio
+import logging
+import threading
+import traceback
+from collections import Counter, deque
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any
+
+import metrics
+
+
+logger = logging.getLogger("TwitchDrops.loop")
+# how often the sampler runs, in seconds
+SAMPLE_INTERVAL = 0.1
+# lag samples kept for the recent percentiles, about a minute worth of them
+LAG_HISTORY = 600
+# slow callbacks kept, with their stacks
+SLOW_HISTORY = 50
+# innermost stack frames kept per slow callback
+STACK_DEPTH = 12
+# how often the task counts get refreshed, and the lag summary logged, in seconds
+TASKS_INTERVAL = 5.0
+REPORT_INTERVAL = 300.0
+# where the loop runs its callbacks from
+_HANDLE_FILE = os.path.join("asyncio", "events.py")
+
+
+def _task_name(task: asyncio.Task[Any]) -> str:
+    coro = task.get_coro()
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class LoopMonitor:
+    def __init__(
+        self, *, threshold: float = 0.1, interval: float = SAMPLE_INTERVAL
+    ) -> None:
+        # callbacks blocking the loop for at least this long are reported, in seconds
+        self.threshold: float = threshold
+        self._interval = interval
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._sampler_task: asyncio.Task[None] | None = None
+        self._watcher: threading.Thread | None = None
+        self._stopping = threading.Event()
+        # updated by the sampler, read by the watcher thread
+        self._beat: float = perf_counter()
+        # the stall the watcher has captured, waiting for the loop to resume to finish it
+        self._stall: dict[str, Any] | None = None
+        self._stall_lock = threading.Lock()
+        self._lags: deque[float] = deque(maxlen=LAG_HISTORY)
+        self._max_lag: float = 0.0
+        self._slow: deque[dict[str, Any]] = deque(maxlen=SLOW_HISTORY)
+        self._slow_total: int = 0
+        self._task_counts: dict[str, int] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._sampler_task is not None and not self._sampler_task.done()
+
+    def start(self) -> None:
+        """
+        Starts monitoring the running loop. Has to be called from within it.
+        """
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = perf_counter()
+        self._stopping.clear()
+        self._sampler_task = asyncio.create_task(self._sampler())
+        self._watcher = threading.Thread(target=self._watch, name="LoopMonitor", daemon=True)
+        self._watcher.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._sampler_task is not None:
+            self._sampler_task.cancel()
+            try:
+                await self._sampler_task
+            except asyncio.CancelledError:
+                pass
+            self._sampler_task = None
+        if self._watcher is not None:
+            await asyncio.to_thread(self._watcher.join)
+            self._watcher = None
+
+    async def _sampler(self) -> None:
+        assert self._loop is not None
+        loop = self._loop
+        interval = self._interval
+        next_tasks = next_report = loop.time()
+        next_report += REPORT_INTERVAL
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            now = loop.time()
+            lag = max(now - expected, 0.0)
+            self._beat = perf_counter()
+            self._lags.append(lag)
+            self._max_lag = max(self._max_lag, lag)
+            metrics.LOOP_LAG.observe(lag)
+            with self._stall_lock:
+                stall, self._stall = self._stall, None
+            if lag >= self.threshold:
+                # a stall captured right as the loop resumed is dropped, if it turned out short
+                self._record_slow(lag, stall)
+            if now >= next_tasks:
+                next_tasks = now + TASKS_INTERVAL
+                self._count_tasks()
+            if now >= next_report:
+                next_report = now + REPORT_INTERVAL
+                self._report()
+
+    def _watch(self) -> None:
+        # runs in its own thread, so it can look at the loop while it's blocked
+        check = min(self.threshold / 2, 0.05)
+        captured_beat: float | None = None
+        while not self._stopping.wait(check):
+            beat = self._beat
+            if perf_counter() - beat < self._interval + self.threshold or beat == captured_beat:
+                continue
+            # the loop is blocked - capture once per stall
+            captured_beat = beat
+            stall = self._capture()
+            with self._stall_lock:
+                self._stall = stall
+
+    def _capture(self) -> dict[str, Any]:
+        assert self._loop is not None
+        frame = sys._current_frames().get(self._loop_thread_id)  # type: ignore[arg-type]
+        frames = traceback.extract_stack(frame) if frame is not None else []
+        # skip the loop machinery, down to where it has called the callback
+        for index in range(len(frames) - 1, -1, -1):
+            if frames[index].filename.endswith(_HANDLE_FILE):
+                frames = frames[index + 1:]
+                break
+        stack = traceback.format_list(frames[-STACK_DEPTH:])
+        task_name: str | None = None
+        coro_name: str | None = None
+        try:
+            task = asyncio.current_task(self._loop)
+        except Exception:
+            # not every asyncio version supports looking this up from another thread
+            task = None
+        if task is not None:
+            task_name = task.get_name()
+            coro_name = _task_name(task)
+        return {
+            "task": task_name,
+            "coroutine": coro_name,
+            "stack": [line.rstrip() for line in stack],
+        }
+
+    def _record_slow(self, lag: float, stall: dict[str, Any] | None) -> None:
+        # the lag includes the sampling interval the sleep was overshot by
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "duration": round(lag, 4),
+            "task": None,
+            "coroutine": None,
+            "stack": None,
+            **(stall or {}),
+        }
+        self._slow.appendleft(entry)
+        self._slow_total += 1
+        metrics.LOOP_SLOW_CALLBACKS.inc()
+        where = entry["coroutine"] or "a callback"
+        if entry["stack"]:
+            stack = "\n".join(entry["stack"])
+            logger.warning(f"Event loop blocked for {lag:.3f}s in {where}:\n{stack}")
+        else:
+            logger.warning(f"Event loop blocked for {lag:.3f}s in {where}")
+
+    def _count_tasks(self) -> None:
+        # NOTE: runs on the loop
+        counts = Counter(_task_name(task) for task in asyncio.all_tasks(self._loop))
+        for name in self._task_counts.keys() - counts.keys():
+            metrics.LOOP_TASKS.labels(name).set(0)
+        for name, count in counts.items():
+            metrics.LOOP_TASKS.labels(name).set(count)
+        self._task_counts = dict(counts)
+
+    def _lag_stats(self) -> dict[str, float]:
+        ordered = sorted(self._lags)
+        return {
+            "last": round(self._lags[-1], 4) if self._lags else 0.0,
+            "p50": round(_percentile(ordered, 0.5), 4),
+            "p99": round(_percentile(ordered, 0.99), 4),
+            "max_recent": round(ordered[-1], 4) if ordered else 0.0,
+            "max": round(self._max_lag, 4),
+        }
+
+    def _report(self) -> None:
+        lag = self._lag_stats()
+        logger.info(
+            f"Event loop lag: p50 {lag['p50'] * 1000:.1f}ms, p99 {lag['p99'] * 1000:.1f}ms, "
+            f"max {lag['max'] * 1000:.1f}ms, {self._slow_total} slow callbacks, "
+            f"{sum(self._task_counts.values())} tasks"
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the recent loop lag, the slow callbacks caught, newest first,
+        and the running tasks per coroutine name. Has to be called from the loop.
+        """
+        if self.running:
+            self._count_tasks()
+        return {
+            "running": self.running,
+            "interval": self._interval,
+            "threshold": self.threshold,
+            "lag": self._lag_stats(),
+            "slow_callbacks": self._slow_total,
+            "recent_slow_callbacks": list(self._slow),
+            "tasks": {
+                "total": sum(self._task_counts.values()),
+                "by_coroutine": dict(
+                    sorted(self._task_counts.items(), key=lambda item: item[1], reverse=True)
+                ),
+            },
+        }
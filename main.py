@@ -9,6 +9,7 @@ if __name__ == "__main__":
     import asyncio
     import logging
     import io
+    import os
     import sys
     import argparse
     import contextlib
@@ -21,18 +22,19 @@ if __name__ == "__main__":
     import truststore
     truststore.inject_into_ssl()
 
+    import constants
+    import persistence
     from translate import _
     from settings import Settings
     from version import __version__
-    from miner_service import MinerService
+    from miner_service import Account, MinerService
     from utils import lock_file, resource_path, set_root_icon
     from constants import (
         LOGGING_LEVELS,
         SELF_PATH,
         FILE_FORMATTER,
-        LOG_PATH,
-        LOCK_PATH,
         set_paths,
+        AccountPaths,
         State,
     )
 
@@ -57,7 +59,10 @@ if __name__ == "__main__":
         headless: bool
         config: Path | None
         data_dir: Path | None
+        accounts: list[Path]
+        shared_cache_dir: Path | None
         bind: str | None
+        base_url: str | None
 
         # TODO: replace int with union of literal values once typeshed updates
         @property
@@ -98,6 +103,20 @@ if __name__ == "__main__":
         parser.add_argument("--headless", action="store_true", help="Run without GUI")
         parser.add_argument("--config", type=Path, help="Path to settings file")
         parser.add_argument("--data-dir", type=Path, help="Directory for app data")
+        parser.add_argument(
+            "--account",
+            dest="accounts",
+            type=Path,
+            action="append",
+            default=[],
+            help="Data directory of an additional account to mine on, can be repeated",
+        )
+        parser.add_argument(
+            "--shared-cache",
+            dest="shared_cache_dir",
+            type=Path,
+            help="Directory to share the public data cache through, with other processes",
+        )
         parser.add_argument(
             "--bind",
             type=str,
@@ -110,6 +129,8 @@ if __name__ == "__main__":
         parser.add_argument(
             "--debug-gql", dest="_debug_gql", action="store_true", help=argparse.SUPPRESS
         )
+        # redirects all Twitch traffic to a stand-in server, see tools/stand_in_server.py
+        parser.add_argument("--base-url", dest="base_url", type=str, help=argparse.SUPPRESS)
         return parser
 
     # Pre-parse to determine headless/config/data-dir without pulling in GUI deps
@@ -159,6 +180,16 @@ if __name__ == "__main__":
         root.update()
         parser = _add_common_args(Parser(**parser_kwargs))
         args = parser.parse_args(namespace=ParsedArgs())
+        if args.accounts:
+            parser.error("additional accounts are only supported in headless mode")
+    # every account needs a data directory of its own, for its lock file, cookies and claims
+    seen_dirs = {constants.WORKING_DIR.resolve()}
+    for data_dir in args.accounts:
+        resolved = data_dir.resolve()
+        if resolved in seen_dirs:
+            parser.error(f"the data directory {data_dir} is already used by another account")
+        seen_dirs.add(resolved)
+    del seen_dirs
     # load settings
     try:
         settings = Settings(args, settings_path=pre_args.config)
@@ -191,13 +222,15 @@ if __name__ == "__main__":
             # this language doesn't exist - stick to English
             pass
 
-        async def watchdog_loop(service: MinerService, logger: logging.Logger) -> None:
+        async def watchdog_loop(service: Account, logger: logging.Logger) -> None:
             check_interval = max(
                 60.0,
                 min(service.expected_refresh_interval().total_seconds() / 3, 300.0),
             )
             consecutive_exceedances = 0
             iteration = 0
+            # tells the additional accounts apart in the log
+            label = "" if service is service.host.main else f" [{service.name}]"
             while True:
                 try:
                     await asyncio.sleep(check_interval)
@@ -260,9 +293,10 @@ if __name__ == "__main__":
                     diff_minutes = diff.total_seconds() / 60 if diff else None
                     threshold_minutes = threshold.total_seconds() / 60
                     log_msg = (
-                        "Watchdog: state=%s, idle=%s, threshold=%.2fm, "
+                        "Watchdog%s: state=%s, idle=%s, threshold=%.2fm, "
                         "consecutive=%d, action=%s"
                     ) % (
+                        label,
                         state_name or "unknown",
                         f"{diff_minutes:.2f}m" if diff_minutes is not None else "n/a",
                         threshold_minutes,
@@ -296,7 +330,7 @@ if __name__ == "__main__":
                 )
                 handlers.append(stream_handler)
             if settings.log:
-                handler = logging.FileHandler(LOG_PATH)
+                handler = logging.FileHandler(constants.LOG_PATH)
                 if prefix == "main":
                     handler.setFormatter(FILE_FORMATTER)
                 else:
@@ -341,34 +375,81 @@ if __name__ == "__main__":
         for handler in _logger_handlers("watch"):
             watch_logger.addHandler(handler)
 
+        loop_logger = logging.getLogger("TwitchDrops.loop")
+        loop_logger.setLevel(
+            settings.logging_loop_level
+            if settings.logging_loop_level is not None
+            else settings.logging_level
+        )
+        loop_logger.propagate = False
+        for handler in _logger_handlers("loop"):
+            loop_logger.addHandler(handler)
+
         logging.getLogger("TwitchDrops.gql").setLevel(settings.debug_gql)
         logging.getLogger("TwitchDrops.websocket").setLevel(settings.debug_ws)
 
         service = MinerService(settings)
+        for paths in account_paths:
+            service.add_account(paths)
+        # the recent records of all of our loggers, searchable through the Web API
+        for log in (logger, watchdog_logger, watch_logger, loop_logger):
+            log.addHandler(service.log_buffer)
         api = None
         if settings.bind:
             from web_api import build_api
 
             api = build_api(service)
             await api.start(settings.bind)
-        watchdog_task = asyncio.create_task(watchdog_loop(service, watchdog_logger))
+        watchdog_tasks = [
+            asyncio.create_task(watchdog_loop(account, watchdog_logger))
+            for account in service.accounts.values()
+        ]
+        service.loop_monitor.start()
         try:
             exit_status = await service.start()
         finally:
-            watchdog_task.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
-                await watchdog_task
+            for watchdog_task in watchdog_tasks:
+                watchdog_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await watchdog_task
+            await service.loop_monitor.stop()
             if api is not None:
                 await api.stop()
+            await service.close()
+            # wait for all of the pending writes to reach the disk
+            persistence.close()
+        if service.restart_requested:
+            return True
         sys.exit(exit_status)
 
+    account_paths: list[AccountPaths] = []
+    lock_files: list[io.TextIOWrapper] = []
+    restart: bool = False
     try:
         # use lock_file to check if we're not already running
-        success, file = lock_file(LOCK_PATH)
+        # NOTE: Read the path here, as it changes with the data directory, see set_paths
+        success, file = lock_file(constants.LOCK_PATH)
+        lock_files.append(file)
         if not success:
             # already running - exit
             sys.exit(3)
-
-        asyncio.run(main())
+        for data_dir in args.accounts:
+            data_dir.mkdir(parents=True, exist_ok=True)
+            paths = AccountPaths(data_dir)
+            # the same account can't be mined on by two processes at once either
+            success, file = lock_file(paths.LOCK)
+            lock_files.append(file)
+            if not success:
+                sys.exit(3)
+            account_paths.append(paths)
+
+        restart = asyncio.run(main())
     finally:
-        file.close()
+        for file in lock_files:
+            file.close()
+    if restart:
+        # NOTE: os.execv only works when running from source.
+        # In a PyInstaller-frozen build, sys.executable points to the bundle
+        # and sys.argv may not produce a valid restart command.
+        logging.getLogger("TwitchDrops").info("Executing full process restart via os.execv")
+        os.execv(sys.executable, [sys.executable] + sys.argv)
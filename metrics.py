@@ -0,0 +1,423 @@
+"""
+A lightweight in-process metrics registry, exposed in the Prometheus text format.
+
+Updating a metric is a dict lookup and an addition, so it's cheap enough for the hot paths.
+All of the application metrics are defined at the bottom of this module.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left
+from functools import wraps
+from time import perf_counter, time
+from typing import Any, Callable, Generic, TypeVar
+
+
+_C = TypeVar("_C", bound="_Child")
+_F = TypeVar("_F", bound=Callable[..., Any])
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return f"{{{','.join(pairs)}}}" if pairs else ""
+
+
+class _Child:
+    __slots__ = ("_lock",)
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+
+class _CounterChild(_Child):
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.value: float = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild(_Child):
+    __slots__ = ("_value", "_function")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._value: float = 0.0
+        self._function: Callable[[], float] | None = None
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._value
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """
+        Makes the gauge report the value returned by the function, evaluated on scrape.
+        """
+        self._function = function
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: _HistogramChild) -> None:
+        self._child = child
+
+    def __enter__(self) -> _Timer:
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._child.observe(perf_counter() - self._start)
+
+
+class _HistogramChild(_Child):
+    __slots__ = ("_buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        super().__init__()
+        self._buckets = buckets
+        # per bucket, not cumulative, with the last one being +Inf
+        self.counts: list[int] = [0] * (len(buckets) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self) -> _Timer:
+        """
+        Context manager observing the time spent inside of it, in seconds.
+        """
+        return _Timer(self)
+
+
+class _Metric(Generic[_C]):
+    type_name: str = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        registry: Registry | None = None,
+    ) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: tuple[str, ...] = labelnames
+        self._children: dict[tuple[str, ...], _C] = {}
+        self._lock = threading.Lock()
+        if not labelnames:
+            self._children[()] = self._new_child()
+        (registry or REGISTRY).register(self)
+
+    def _new_child(self) -> _C:
+        raise NotImplementedError
+
+    def labels(self, *values: str) -> _C:
+        """
+        Returns the metric for the given label values, creating it on first use.
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels: {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self._samples(),
+        ]
+        return "\n".join(lines)
+
+
+class Counter(_Metric[_CounterChild]):
+    type_name = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+            for values, child in list(self._children.items())
+        ]
+
+
+class Gauge(_Metric[_GaugeChild]):
+    type_name = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._children[()].set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._children[()].dec(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._children[()].set_function(function)
+
+    def _samples(self) -> list[str]:
+        samples: list[str] = []
+        for values, child in list(self._children.items()):
+            try:
+                value = child.value
+            except Exception:
+                # a broken callback shouldn't break the whole scrape
+                continue
+            samples.append(
+                f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}"
+            )
+        return samples
+
+
+class Histogram(_Metric[_HistogramChild]):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        registry: Registry | None = None,
+    ) -> None:
+        self._buckets: tuple[float, ...] = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry=registry)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self._buckets)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def time(self) -> _Timer:
+        return self._children[()].time()
+
+    def _samples(self) -> list[str]:
+        samples: list[str] = []
+        bounds = [*self._buckets, math.inf]
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts = child.counts[:]
+                total, count = child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labelnames, values, f'le="{_format_value(bound)}"'
+                )
+                samples.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            samples.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            samples.append(f"{self.name}_count{labels} {count}")
+        return samples
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric[Any]] = {}
+
+    def register(self, metric: _Metric[Any]) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """
+        Renders all metrics in the Prometheus text exposition format.
+        """
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def timed(histogram: Histogram, *labels: str) -> Callable[[_F], _F]:
+    """
+    Decorator observing the time spent in a (non-async) function.
+    """
+    child = histogram.labels(*labels)
+
+    def decorator(func: _F) -> _F:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(perf_counter() - start)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+# Application metrics
+
+START_TIME = Gauge("tdm_start_time_seconds", "Unix time the miner has been started at")
+START_TIME.set(time())
+
+GQL_REQUESTS = Counter(
+    "tdm_gql_requests_total", "GQL requests sent, per operation", ("operation",)
+)
+GQL_LATENCY = Histogram(
+    "tdm_gql_request_seconds", "GQL request latency, per operation", ("operation",)
+)
+GQL_ERRORS = Counter(
+    "tdm_gql_errors_total", "GQL responses carrying errors, per operation", ("operation",)
+)
+GQL_RETRIES = Counter(
+    "tdm_gql_retries_total", "GQL requests retried after an error, per operation", ("operation",)
+)
+GQL_RATE_LIMIT_WAIT = Histogram(
+    "tdm_gql_rate_limit_wait_seconds",
+    "Time GQL requests spent waiting on the rate limiter",
+    buckets=(0.001, 0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0),
+)
+
+WATCH_HEARTBEATS = Counter(
+    "tdm_watch_heartbeats_total", "Watch heartbeats sent, per result", ("result",)
+)
+WATCH_LATENCY = Histogram("tdm_watch_heartbeat_seconds", "Watch heartbeat latency")
+
+WEBSOCKET_CONNECTIONS = Gauge(
+    "tdm_websocket_connections", "Pubsub websocket connections currently open"
+)
+WEBSOCKET_TOPICS = Gauge("tdm_websocket_topics", "Pubsub topics currently subscribed to")
+WEBSOCKET_MESSAGES = Counter(
+    "tdm_websocket_messages_total", "Pubsub messages received, per topic", ("topic",)
+)
+WEBSOCKET_RECONNECTS = Counter("tdm_websocket_reconnects_total", "Pubsub websocket reconnects")
+
+INVENTORY_FETCH = Histogram(
+    "tdm_inventory_fetch_seconds", "Time spent fetching and processing the inventory"
+)
+INVENTORY_CAMPAIGNS = Gauge(
+    "tdm_inventory_campaigns", "Campaigns in the inventory, per status", ("status",)
+)
+
+STATE_SECONDS = Counter(
+    "tdm_state_seconds_total", "Time spent in each state of the main loop", ("state",)
+)
+STATE_TRANSITIONS = Counter(
+    "tdm_state_transitions_total", "Main loop state changes, per target state", ("state",)
+)
+
+STATE_STORE_WRITE = Histogram(
+    "tdm_state_store_write_seconds",
+    "Time spent updating the state store, lock wait included, per operation",
+    ("operation",),
+    buckets=(0.00001, 0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5),
+)
+RECORD_LOG_WRITE = Histogram(
+    "tdm_record_log_write_seconds",
+    "Time spent writing and syncing a batch of journal records, per file",
+    ("file",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+)
+PERSISTENCE_WRITE = Histogram(
+    "tdm_persistence_write_seconds",
+    "Time the write-behind writer spent writing out a file, per file",
+    ("file",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+)
+PERSISTENCE_COALESCED = Counter(
+    "tdm_persistence_coalesced_total",
+    "Writes merged into a write still pending for the same file",
+)
+
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "tdm_response_cache_lookups_total",
+    "Response cache lookups, per result (hits, misses, expired)",
+    ("result",),
+)
+
+LOOP_LAG = Histogram(
+    "tdm_loop_lag_seconds",
+    "How late the event loop runs a periodic sampler, measuring its scheduling delay",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_SLOW_CALLBACKS = Counter(
+    "tdm_loop_slow_callbacks_total", "Callbacks that blocked the event loop past the threshold"
+)
+LOOP_TASKS = Gauge("tdm_loop_tasks", "Running asyncio tasks, per coroutine name", ("coroutine",))
+
+IMAGE_CACHE_BYTES = Gauge(
+    "tdm_image_cache_bytes", "Size of the image cache, per tier (images, photos, disk)", ("tier",)
+)
+IMAGE_CACHE_ENTRIES = Gauge(
+    "tdm_image_cache_entries", "Entries in the image cache, per tier", ("tier",)
+)
+IMAGE_CACHE_EVICTIONS = Counter(
+    "tdm_image_cache_evictions_total",
+    "Entries evicted from the image cache to stay within its budget, per tier",
+    ("tier",),
+)
+
+GUI_POLLS = Counter(
+    "tdm_gui_polls_total",
+    "Times Tk was let to process its events, per window state (normal, zoomed, iconic, withdrawn)",
+    ("state",),
+)
+
+SHARED_CACHE = Counter(
+    "tdm_shared_cache_lookups_total",
+    "Public GQL responses looked up in the cache shared by the accounts, "
+    "per operation and result (hit, coalesced, miss)",
+    ("operation", "result"),
+)
@@ -10,29 +10,47 @@ from typing import TYPE_CHECKING, Any
 
 from translate import _
 from exceptions import AuthMissingCookies, CaptchaRequired
-from constants import State
-from state_store import StateStore
+from constants import MAX_WEBSOCKETS, AccountPaths, State
+from profiler import Profiler
+from log_buffer import LogBuffer
+from loop_monitor import LoopMonitor
+from shared_cache import SharedCache
+from state_store import Snapshot, StateStore
 
 if TYPE_CHECKING:
+    import aiohttp
+
     from channel import Channel
     from settings import Settings
     from twitch import Twitch
 
 
 logger = logging.getLogger("TwitchDrops")
+# connections the shared connector allows for the main account, and for every additional one
+# NOTE: Every additional account needs room for its websockets, the rest of its requests
+# are mostly served from the shared cache
+BASE_CONNECTIONS = 50
+EXTRA_CONNECTIONS = MAX_WEBSOCKETS + 10
+# name of the main account, the one using the main data directory
+MAIN_ACCOUNT = "main"
 
 
-class MinerService:
+class Account:
     """
-    Centralized controller for the miner lifecycle.
+    Lifecycle of a single Twitch account, hosted by the MinerService.
 
-    Provides a narrow API that can be used by the GUI or other callers to
-    control the miner without directly coupling to the core Twitch logic.
+    Each account has its own client, with its own session cookies, inventory, progress,
+    pubsub topics and state store, kept within its own data directory.
     """
 
-    def __init__(self, settings: Settings):
-        self.settings: Settings = settings
-        self._state_store = StateStore(settings)
+    MAX_RESTART_ATTEMPTS = 10
+
+    def __init__(self, host: MinerService, name: str, paths: AccountPaths) -> None:
+        self.host: MinerService = host
+        self.name: str = name
+        self.paths: AccountPaths = paths
+        self.settings: Settings = host.settings
+        self._state_store = StateStore(host.settings, paths=paths)
         self._twitch: Twitch | None = None
         self._task: asyncio.Task[int] | None = None
         self._requested_channel: int | str | None = None
@@ -61,6 +79,12 @@ class MinerService:
     def state_store(self) -> StateStore:
         return self._state_store
 
+    @property
+    def user_id(self) -> int | None:
+        if self._twitch is None:
+            return None
+        return getattr(self._twitch._auth_state, "user_id", None)
+
     async def ensure_started(self) -> bool:
         """
         Start the miner loop if it is not already running.
@@ -83,6 +107,9 @@ class MinerService:
                 self.settings,
                 service=self,
                 state_store=self._state_store,
+                paths=self.paths,
+                cache=self.host.shared_cache,
+                connector=self.host.connector,
             )
         return self._twitch
 
@@ -113,6 +140,13 @@ class MinerService:
         self._stop_requested = True
         twitch.close()
 
+    def close(self) -> None:
+        """
+        Closes the account the same way the user closing the application window does.
+        """
+        if self._twitch is not None:
+            self._twitch.gui.close()
+
     def reload_state(self) -> None:
         twitch = self._ensure_twitch()
         twitch.request_inventory_refresh(force=True)
@@ -178,10 +212,30 @@ class MinerService:
         return None
 
     def get_snapshot(self) -> dict[str, Any]:
+        return self.get_versioned_snapshot().data
+
+    def get_versioned_snapshot(self) -> Snapshot:
         self._state_store.update_settings(self.settings)
-        return self._state_store.get_snapshot()
+        return self._state_store.get_versioned_snapshot()
 
-    MAX_RESTART_ATTEMPTS = 10
+    def summary(self) -> dict[str, Any]:
+        """
+        A short overview of the account, for listing all of the accounts at once.
+        """
+        runtime = self.get_snapshot()["runtime"]
+        return {
+            "name": self.name,
+            "data_dir": str(self.paths.DATA_DIR),
+            "user_id": self.user_id,
+            "running": self.is_running,
+            "state": runtime["state"],
+            "watching": runtime["watching"],
+            "channels": len(runtime["channels"]),
+            "campaigns": len(runtime["campaigns"]),
+            "claims_total": runtime["claims_total"],
+            "errors": len(runtime["errors"]),
+            "last_reload": runtime["last_reload"],
+        }
 
     async def _supervise(self, client: Twitch) -> int:
         attempt = 0
@@ -214,10 +268,6 @@ class MinerService:
     async def _run(self, client: Twitch) -> int:
         self._exit_status = 0
         self._restartable_error = False
-        loop = asyncio.get_running_loop()
-        if sys.platform == "linux":
-            loop.add_signal_handler(signal.SIGINT, lambda *_: client.gui.close())
-            loop.add_signal_handler(signal.SIGTERM, lambda *_: client.gui.close())
         try:
             await client.run()
         except CaptchaRequired:
@@ -229,7 +279,9 @@ class MinerService:
             self._exit_status = 1
             self._state_store.record_error("AUTH_MISSING_COOKIES")
             client.prevent_close()
-            client.print("Authentication cookies are missing. Please provide cookies.jar.")
+            client.print(
+                f"Authentication cookies are missing. Please provide {self.paths.COOKIES}."
+            )
         except Exception:
             self._exit_status = 1
             self._restartable_error = True
@@ -238,9 +290,6 @@ class MinerService:
             client.print("Fatal error encountered:\n")
             client.print(traceback.format_exc())
         finally:
-            if sys.platform == "linux":
-                loop.remove_signal_handler(signal.SIGINT)
-                loop.remove_signal_handler(signal.SIGTERM)
             client.print(_("gui", "status", "exiting"))
             await client.shutdown()
         if client.gui and not client.gui.close_requested:
@@ -253,3 +302,143 @@ class MinerService:
         client.gui.stop()
         client.gui.close_window()
         return self._exit_status
+
+
+class MinerService:
+    """
+    Centralized controller for the miner lifecycle.
+
+    Provides a narrow API that can be used by the GUI or other callers to
+    control the miner without directly coupling to the core Twitch logic.
+
+    Hosts one or more accounts within the same event loop, sharing the connection pool
+    and the cache of public responses between them. The single-account API
+    controls the main account.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings: Settings = settings
+        self.loop_monitor = LoopMonitor(threshold=settings.slow_callback_ms / 1000)
+        self.profiler = Profiler()
+        self.log_buffer = LogBuffer(settings.log_buffer_size)
+        self.shared_cache = SharedCache(directory=settings.shared_cache_dir)
+        self._connector: aiohttp.TCPConnector | None = None
+        self.accounts: dict[str, Account] = {}
+        # set when the process should start anew, once all of the accounts have stopped
+        self.restart_requested: bool = False
+        self.main: Account = self.add_account(AccountPaths.default(), name=MAIN_ACCOUNT)
+
+    def add_account(self, paths: AccountPaths, *, name: str | None = None) -> Account:
+        """
+        Adds an account using the given data directory, named after it unless told otherwise.
+        Accounts have to be added before any of them starts, see connector.
+        """
+        if self._connector is not None:
+            # the pool is sized for the accounts there were when it was created
+            raise RuntimeError("Accounts can't be added once the connection pool is in use")
+        if name is None:
+            name = paths.DATA_DIR.name
+        base_name, suffix = name, 1
+        while name in self.accounts:
+            suffix += 1
+            name = f"{base_name}-{suffix}"
+        account = self.accounts[name] = Account(self, name, paths)
+        return account
+
+    @property
+    def connector(self) -> aiohttp.TCPConnector:
+        """
+        The connection pool shared by all of the accounts, created once it's first needed.
+        """
+        if self._connector is None or self._connector.closed:
+            import aiohttp
+
+            limit = BASE_CONNECTIONS + EXTRA_CONNECTIONS * (len(self.accounts) - 1)
+            self._connector = aiohttp.TCPConnector(limit=limit)
+        return self._connector
+
+    def close_all(self) -> None:
+        for account in self.accounts.values():
+            account.close()
+
+    def request_restart(self) -> None:
+        """
+        Closes all of the accounts, and has the process start anew once they've stopped.
+        """
+        self.restart_requested = True
+        self.close_all()
+
+    async def start(self) -> int:
+        """
+        Start all of the accounts, and return the resulting exit status,
+        once all of them have stopped. The first non-zero exit status wins.
+        """
+        loop = asyncio.get_running_loop()
+        if sys.platform == "linux":
+            loop.add_signal_handler(signal.SIGINT, lambda *_: self.close_all())
+            loop.add_signal_handler(signal.SIGTERM, lambda *_: self.close_all())
+        try:
+            statuses = await asyncio.gather(
+                *(account.start() for account in self.accounts.values())
+            )
+        finally:
+            if sys.platform == "linux":
+                loop.remove_signal_handler(signal.SIGINT)
+                loop.remove_signal_handler(signal.SIGTERM)
+        return next((status for status in statuses if status), 0)
+
+    async def close(self) -> None:
+        """
+        Releases everything the accounts have shared, once they've all stopped.
+        """
+        for account in self.accounts.values():
+            # writes out the journal and closes the claims database, off the loop
+            await asyncio.to_thread(account.state_store.close)
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+
+    # the single-account API, controlling the main account
+
+    @property
+    def twitch(self) -> Twitch | None:
+        return self.main.twitch
+
+    @property
+    def gui(self):
+        return self.main.gui
+
+    @property
+    def is_running(self) -> bool:
+        return self.main.is_running
+
+    @property
+    def state_store(self) -> StateStore:
+        return self.main.state_store
+
+    async def ensure_started(self) -> bool:
+        return await self.main.ensure_started()
+
+    async def stop(self, *, manual: bool = True) -> None:
+        await self.main.stop(manual=manual)
+
+    def request_stop(self) -> None:
+        self.main.request_stop()
+
+    def reload_state(self) -> None:
+        self.main.reload_state()
+
+    async def reload(self) -> bool:
+        return await self.main.reload()
+
+    def expected_refresh_interval(self) -> timedelta:
+        return self.main.expected_refresh_interval()
+
+    def switch_channel(self, channel_ref: int | str | None = None) -> None:
+        self.main.switch_channel(channel_ref)
+
+    def get_snapshot(self) -> dict[str, Any]:
+        return self.main.get_snapshot()
+
+    def get_versioned_snapshot(self) -> Snapshot:
+        return self.main.get_versioned_snapshot()
@@ -0,0 +1,244 @@
+"""
+Write-behind persistence, keeping disk I/O off of the event loop.
+
+Writes are queued and carried out by a single background thread. Repeated writes to the same
+file are coalesced, so only the most recent contents end up being written, and each file
+is replaced atomically, through a temporary file and a rename.
+`flush` acts as a barrier, blocking until everything queued so far is on the disk.
+"""
+from __future__ import annotations
+
+import os
+import atexit
+import logging
+import threading
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Union
+
+import metrics
+
+
+logger = logging.getLogger("TwitchDrops")
+# Either the contents to write, or a callable writing the contents to the path it's given.
+# Callables run on the writer thread, so they must not touch anything the loop can modify.
+Contents = Union[bytes, Callable[[Path], None]]
+
+
+class _Job:
+    __slots__ = ("contents", "append", "remove", "label", "done")
+
+    def __init__(
+        self,
+        contents: Contents | None,
+        append: list[bytes],
+        *,
+        remove: bool = False,
+        label: str | None = None,
+        done: Callable[[], None] | None = None,
+    ) -> None:
+        # None if the data should only be appended to the existing file
+        self.contents: Contents | None = contents
+        # data appended after the contents, or to the existing file if there's none
+        self.append: list[bytes] = append
+        # True if the file should be removed instead
+        self.remove: bool = remove
+        # what the write is reported as in the metrics, the file name by default
+        self.label: str | None = label
+        # called on the writer thread, once the file has been written
+        self.done: Callable[[], None] | None = done
+
+
+class WriteBehindWriter:
+    def __init__(self, *, delay: float = 0.2, retries: int = 3) -> None:
+        # how long to wait for more writes to coalesce, before writing out a batch
+        self._delay = delay
+        self._retries = retries
+        self._cond = threading.Condition()
+        self._jobs: dict[Path, _Job] = {}
+        # number of jobs taken by the writer thread, and not finished yet
+        self._active: int = 0
+        self._closing: bool = False
+        self._thread: threading.Thread | None = None
+
+    def _ensure_thread(self) -> None:
+        # NOTE: the condition's lock has to be held by the caller
+        if self._thread is None or not self._thread.is_alive():
+            self._closing = False
+            self._thread = threading.Thread(
+                target=self._writer, name="WriteBehindWriter", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.close)
+
+    def write(
+        self,
+        path: Path,
+        contents: Contents,
+        *,
+        label: str | None = None,
+        done: Callable[[], None] | None = None,
+    ) -> None:
+        """
+        Queues replacing the file's contents. Replaces any write still pending for this file.
+        Files that come and go, like cache entries, should pass a `label` to group them under.
+        `done` is called on the writer thread once the file has been replaced,
+        unless the write fails or gets replaced by a later one.
+        """
+        with self._cond:
+            job = self._jobs.get(path)
+            if job is not None:
+                metrics.PERSISTENCE_COALESCED.inc()
+            self._jobs[path] = _Job(contents, [], label=label, done=done)
+            self._ensure_thread()
+            self._cond.notify()
+
+    def append(self, path: Path, data: bytes) -> None:
+        """
+        Queues appending data to the file.
+        """
+        with self._cond:
+            job = self._jobs.get(path)
+            if job is not None:
+                metrics.PERSISTENCE_COALESCED.inc()
+                if job.remove:
+                    job.remove = False
+                    job.contents = b''
+                job.append.append(data)
+            else:
+                self._jobs[path] = _Job(None, [data])
+            self._ensure_thread()
+            self._cond.notify()
+
+    def remove(self, path: Path, *, label: str | None = None) -> None:
+        """
+        Queues removing the file. Replaces any write still pending for this file.
+        """
+        with self._cond:
+            if path in self._jobs:
+                metrics.PERSISTENCE_COALESCED.inc()
+            self._jobs[path] = _Job(None, [], remove=True, label=label)
+            self._ensure_thread()
+            self._cond.notify()
+
+    def _write_job(self, path: Path, job: _Job) -> None:
+        if job.remove:
+            path.unlink(missing_ok=True)
+            return
+        contents = job.contents
+        if contents is None:
+            with open(path, "ab") as file:
+                file.write(b''.join(job.append))
+            return
+        temp_path = path.with_name(f"{path.name}.tmp")
+        if isinstance(contents, bytes):
+            with open(temp_path, "wb") as file:
+                file.write(contents)
+                file.write(b''.join(job.append))
+                file.flush()
+                os.fsync(file.fileno())
+        else:
+            contents(temp_path)
+            if job.append:
+                with open(temp_path, "ab") as file:
+                    file.write(b''.join(job.append))
+        os.replace(temp_path, path)
+
+    def _run_job(self, path: Path, job: _Job) -> None:
+        start = perf_counter()
+        for attempt in range(self._retries):
+            try:
+                self._write_job(path, job)
+                if job.done is not None:
+                    job.done()
+                break
+            except RuntimeError:
+                # a callable raced with the loop modifying its data - try again
+                if attempt == self._retries - 1:
+                    logger.warning(f"Failed to write {path.name}", exc_info=True)
+            except OSError:
+                logger.warning(f"Failed to write {path.name}", exc_info=True)
+                break
+        metrics.PERSISTENCE_WRITE.labels(job.label or path.name).observe(perf_counter() - start)
+
+    def _writer(self) -> None:
+        with self._cond:
+            while True:
+                while not self._jobs and not self._closing:
+                    self._cond.wait()
+                if not self._jobs:
+                    return
+                if not self._closing:
+                    # let repeated writes coalesce
+                    self._cond.wait(self._delay)
+                jobs = self._jobs
+                self._jobs = {}
+                self._active = len(jobs)
+                self._cond.release()
+                try:
+                    for path, job in jobs.items():
+                        self._run_job(path, job)
+                finally:
+                    self._cond.acquire()
+                    self._active = 0
+                    self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Blocks until all writes queued so far have been carried out.
+        Returns False if the timeout expired first.
+        """
+        with self._cond:
+            if self._thread is None:
+                return True
+            self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: not (self._jobs or self._active) or not self._thread.is_alive(),
+                timeout,
+            )
+
+    def close(self) -> None:
+        """
+        Carries out all pending writes, and stops the writer thread.
+        Writes queued afterwards start it back up.
+        """
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        thread.join()
+        with self._cond:
+            if self._thread is thread:
+                self._thread = None
+        atexit.unregister(self.close)
+
+
+writer = WriteBehindWriter()
+
+
+def write(
+    path: Path,
+    contents: Contents,
+    *,
+    label: str | None = None,
+    done: Callable[[], None] | None = None,
+) -> None:
+    writer.write(path, contents, label=label, done=done)
+
+
+def append(path: Path, data: bytes) -> None:
+    writer.append(path, data)
+
+
+def remove(path: Path, *, label: str | None = None) -> None:
+    writer.remove(path, label=label)
+
+
+def flush(timeout: float | None = None) -> bool:
+    return writer.flush(timeout)
+
+
+def close() -> None:
+    writer.close()
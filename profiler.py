@@ -0,0 +1,230 @@
+"""
+On-demand profiling of the running miner.
+
+Two modes are available:
+- "sample": a background thread samples the stacks of all threads at a fixed interval,
+  producing collapsed stacks, ready to be turned into a flamegraph.
+- "cprofile": deterministic profiling of the event loop thread, producing a pstats file.
+
+Nothing is hooked into the interpreter, or even imported, unless a profile is running.
+Results are saved into the profiles directory, through the write-behind writer.
+"""
+from __future__ import annotations
+
+import io
+import sys
+import asyncio
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any, TYPE_CHECKING
+
+import constants
+import persistence
+
+if TYPE_CHECKING:
+    import cProfile
+
+
+logger = logging.getLogger("TwitchDrops")
+MODES = ("sample", "cprofile")
+DEFAULT_DURATION = 30.0
+MAX_DURATION = 600.0
+# sampling interval, in seconds
+DEFAULT_INTERVAL = 0.01
+MIN_INTERVAL = 0.001
+MAX_INTERVAL = 1.0
+# pstats entries included in the text summary
+SUMMARY_LINES = 40
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def _frame_label(code: Any, lineno: int) -> str:
+    # NOTE: ';' separates the frames in the collapsed format
+    filename = Path(code.co_filename).name
+    return f"{code.co_name} ({filename}:{lineno})".replace(";", ":")
+
+
+class _StackSampler:
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._stop = threading.Event()
+        self.stacks: Counter[str] = Counter()
+        self.samples: int = 0
+        self._thread = threading.Thread(target=self._run, name="StackSampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self._interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels: list[str] = []
+                current = frame
+                while current is not None:
+                    labels.append(_frame_label(current.f_code, current.f_lineno))
+                    current = current.f_back
+                labels.append(names.get(thread_id, str(thread_id)).replace(";", ":"))
+                labels.reverse()
+                self.stacks[";".join(labels)] += 1
+            self.samples += 1
+
+    def collapsed(self) -> bytes:
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        return ("\n".join(lines) + "\n").encode("utf8")
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self._mode: str | None = None
+        self._started: datetime | None = None
+        self._started_counter: float = 0.0
+        self._duration: float = 0.0
+        self._sampler: _StackSampler | None = None
+        self._profile: cProfile.Profile | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        # the last file saved to, which might not be on the disk yet
+        self._last_path: Path | None = None
+        # the outcome of the last finished profile
+        self._result: dict[str, Any] | None = None
+        self._summary: str | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._mode is not None
+
+    def start(
+        self,
+        mode: str = "sample",
+        *,
+        duration: float = DEFAULT_DURATION,
+        interval: float = DEFAULT_INTERVAL,
+    ) -> dict[str, Any]:
+        """
+        Starts profiling, for `duration` seconds at most. Has to be called from the loop.
+        Raises ProfilerBusy if a profile is already running.
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of: {', '.join(MODES)}")
+        # NOTE: These comparisons reject NaN and infinity as well
+        if not 0 < duration <= MAX_DURATION:
+            raise ValueError(f"duration must be between 0 and {MAX_DURATION:.0f} seconds")
+        if not MIN_INTERVAL <= interval <= MAX_INTERVAL:
+            raise ValueError(
+                f"interval must be between {MIN_INTERVAL * 1000:.0f}"
+                f" and {MAX_INTERVAL * 1000:.0f}ms"
+            )
+        if self.running:
+            raise ProfilerBusy("A profile is already running")
+        if mode == "cprofile":
+            import cProfile
+
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as exc:
+                # another profiler is already active
+                raise ProfilerBusy(str(exc)) from None
+            self._profile = profile
+        else:
+            self._sampler = _StackSampler(interval)
+            self._sampler.start()
+        self._mode = mode
+        self._started = datetime.now(timezone.utc)
+        self._started_counter = perf_counter()
+        self._duration = duration
+        self._timer = asyncio.get_running_loop().call_later(duration, self.stop)
+        logger.info(f"Profiling started ({mode}, {duration:.0f}s)")
+        return self.status()
+
+    def _output_path(self, directory: Path, stamp: str, extension: str) -> Path:
+        # never overwrite an earlier profile, even one started within the same millisecond
+        path = directory / f"profile-{stamp}{extension}"
+        index = 1
+        while path == self._last_path or path.exists():
+            index += 1
+            path = directory / f"profile-{stamp}-{index}{extension}"
+        self._last_path = path
+        return path
+
+    def stop(self) -> dict[str, Any] | None:
+        """
+        Stops profiling, and saves the results. Returns None if no profile was running.
+        """
+        if self._mode is None:
+            return None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        elapsed = perf_counter() - self._started_counter
+        assert self._started is not None
+        stamp = f"{self._started:%Y%m%d-%H%M%S}-{self._started.microsecond // 1000:03d}"
+        directory = constants.WORKING_DIR / "profiles"
+        directory.mkdir(parents=True, exist_ok=True)
+        result: dict[str, Any] = {
+            "mode": self._mode,
+            "started": self._started.isoformat(),
+            "elapsed": round(elapsed, 3),
+        }
+        if self._profile is not None:
+            import pstats
+
+            profile, self._profile = self._profile, None
+            profile.disable()
+            path = self._output_path(directory, stamp, ".pstats")
+            stream = io.StringIO()
+            stats = pstats.Stats(profile, stream=stream)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_LINES)
+            self._summary = stream.getvalue()
+            persistence.write(path, stats.dump_stats)
+            result.update(file=str(path), format="pstats")
+        elif self._sampler is not None:
+            sampler, self._sampler = self._sampler, None
+            sampler.stop()
+            path = self._output_path(directory, stamp, ".collapsed")
+            data = sampler.collapsed()
+            self._summary = data.decode("utf8")
+            persistence.write(path, data)
+            result.update(
+                file=str(path),
+                format="collapsed",
+                samples=sampler.samples,
+                stacks=len(sampler.stacks),
+            )
+        self._mode = None
+        self._result = result
+        logger.info(f"Profiling finished ({result['mode']}), saved to: {path}")
+        return result
+
+    def status(self) -> dict[str, Any]:
+        status: dict[str, Any] = {"running": self.running, "last": self._result}
+        if self._mode is not None:
+            assert self._started is not None
+            status.update(
+                mode=self._mode,
+                started=self._started.isoformat(),
+                duration=self._duration,
+                elapsed=round(perf_counter() - self._started_counter, 3),
+            )
+        return status
+
+    def summary(self) -> str | None:
+        """
+        The results of the last finished profile: the collapsed stacks,
+        or the top cumulative entries of the pstats.
+        """
+        return self._summary
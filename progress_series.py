@@ -0,0 +1,275 @@
+"""
+Drop progress history, used to tell how fast each drop is being mined.
+
+Every progress update is kept as a sample, in a ring buffer per drop. Samples falling off
+of the ring buffer are downsampled into coarse buckets, keeping the last sample per bucket,
+so the history of each drop takes a bounded amount of memory, as does the number of drops tracked.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from time import time
+from typing import Any, Iterable, NamedTuple
+
+
+# recent samples kept per drop, at full resolution
+RAW_SAMPLES = 60
+# older samples, downsampled into buckets of this many seconds
+COARSE_INTERVAL = 600
+COARSE_SAMPLES = 144
+# drops tracked at once, the least recently updated ones are dropped
+MAX_DROPS = 200
+# the window progress rates are computed over, in seconds
+RATE_WINDOW = 15 * 60
+# how long the drop being mined can go without any progress, before it's considered stalled
+STALL_AFTER = 5 * 60
+# the shortest time span a rate can be computed over, in seconds
+MIN_RATE_SPAN = 30
+# progress going back by more than this many minutes means the drop has been reset,
+# smaller corrections are expected after the estimated progress overshoots
+RESET_MINUTES = 15
+
+
+class Sample(NamedTuple):
+    time: float
+    minutes: int
+    channel_id: int | None
+    source: str
+
+
+def _isoformat(timestamp: float | None) -> str | None:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class _DropSeries:
+    __slots__ = ("campaign_id", "required", "raw", "coarse", "last_increase")
+
+    def __init__(self, campaign_id: str | None, required: int) -> None:
+        self.campaign_id: str | None = campaign_id
+        self.required: int = required
+        self.raw: deque[Sample] = deque()
+        self.coarse: deque[Sample] = deque(maxlen=COARSE_SAMPLES)
+        # when the minutes have last gone up
+        self.last_increase: float | None = None
+
+    @property
+    def last(self) -> Sample:
+        return self.raw[-1]
+
+    def add(self, sample: Sample) -> None:
+        if self.raw:
+            last = self.raw[-1]
+            if sample.minutes < last.minutes - RESET_MINUTES:
+                self.raw.clear()
+                self.coarse.clear()
+                self.last_increase = None
+            elif sample.minutes > last.minutes:
+                self.last_increase = sample.time
+        if self.last_increase is None:
+            self.last_increase = sample.time
+        if len(self.raw) >= RAW_SAMPLES:
+            self._downsample(self.raw.popleft())
+        self.raw.append(sample)
+
+    def _downsample(self, sample: Sample) -> None:
+        coarse = self.coarse
+        if coarse and coarse[-1].time // COARSE_INTERVAL == sample.time // COARSE_INTERVAL:
+            coarse[-1] = sample
+        else:
+            coarse.append(sample)
+
+    def samples(self) -> list[Sample]:
+        """
+        All samples, oldest first.
+        """
+        return [*self.coarse, *self.raw]
+
+    def rate(self, now: float) -> float | None:
+        """
+        Minutes of progress per minute, over the rate window.
+        None if there isn't enough data to tell.
+        """
+        start = now - RATE_WINDOW
+        first: Sample | None = None
+        for sample in self.samples():
+            if sample.time >= start:
+                first = sample
+                break
+        last = self.raw[-1]
+        if first is None or last.time - first.time < MIN_RATE_SPAN:
+            return None
+        return max(last.minutes - first.minutes, 0) / ((now - first.time) / 60)
+
+
+class ProgressSeries:
+    """
+    Progress samples of the recently mined drops, with the rate, stall and ETA analytics.
+    Each sample records where the update came from: "websocket", "gql" or "estimated".
+
+    Not thread-safe, the state store guards it with its own lock.
+    """
+
+    def __init__(self) -> None:
+        self._drops: OrderedDict[str, _DropSeries] = OrderedDict()
+        # the drop that has received the latest update, most likely the one being mined
+        self._active: str | None = None
+
+    def __len__(self) -> int:
+        return len(self._drops)
+
+    def __contains__(self, drop_id: str) -> bool:
+        return drop_id in self._drops
+
+    def record(
+        self,
+        drop_id: str,
+        minutes: int,
+        required: int,
+        *,
+        campaign_id: str | None = None,
+        channel_id: int | None = None,
+        source: str = "websocket",
+        timestamp: float | None = None,
+    ) -> None:
+        series = self._drops.get(drop_id)
+        if series is None:
+            series = self._drops[drop_id] = _DropSeries(campaign_id, required)
+            if len(self._drops) > MAX_DROPS:
+                self._drops.popitem(last=False)
+        else:
+            self._drops.move_to_end(drop_id)
+            series.required = required
+            if campaign_id is not None:
+                series.campaign_id = campaign_id
+        if timestamp is None:
+            timestamp = time()
+        series.add(Sample(timestamp, minutes, channel_id, source))
+        self._active = drop_id
+
+    def samples(self, drop_id: str) -> list[dict[str, Any]] | None:
+        """
+        The progress history of a drop, oldest first, or None if it isn't tracked.
+        """
+        series = self._drops.get(drop_id)
+        if series is None:
+            return None
+        return [
+            {
+                "time": _isoformat(sample.time),
+                "minutes": sample.minutes,
+                "channel_id": sample.channel_id,
+                "source": sample.source,
+            }
+            for sample in series.samples()
+        ]
+
+    def summary(
+        self, drop_id: str, *, mining: bool = True, now: float | None = None
+    ) -> dict[str, Any] | None:
+        """
+        Returns the current progress, the progress rate, status and ETA of a drop.
+
+        The status is one of:
+        - "complete": all of the required minutes have been mined
+        - "stalled": the drop is being mined, but hasn't progressed in a while
+        - "progressing": the drop has progressed within the rate window
+        - "idle": the drop isn't being mined
+        """
+        series = self._drops.get(drop_id)
+        if series is None:
+            return None
+        if now is None:
+            now = time()
+        last = series.last
+        rate = series.rate(now)
+        remaining = max(series.required - last.minutes, 0)
+        eta: float | None = None
+        if remaining == 0:
+            status = "complete"
+        elif (
+            mining
+            and drop_id == self._active
+            and series.last_increase is not None
+            and now - series.last_increase > STALL_AFTER
+        ):
+            status = "stalled"
+        elif rate:
+            status = "progressing"
+            eta = now + remaining / rate * 60
+        else:
+            status = "idle"
+        return {
+            "drop_id": drop_id,
+            "campaign_id": series.campaign_id,
+            "channel_id": last.channel_id,
+            "source": last.source,
+            "minutes": last.minutes,
+            "required": series.required,
+            "remaining": remaining,
+            "rate": round(rate, 3) if rate is not None else None,
+            "status": status,
+            "eta": _isoformat(eta),
+            "updated": _isoformat(last.time),
+            "last_progress": _isoformat(series.last_increase),
+        }
+
+    def summaries(self, *, mining: bool = True, now: float | None = None) -> list[dict[str, Any]]:
+        """
+        Summaries of all tracked drops, most recently updated first.
+        """
+        if now is None:
+            now = time()
+        return [
+            summary
+            for drop_id in reversed(self._drops)
+            if (summary := self.summary(drop_id, mining=mining, now=now)) is not None
+        ]
+
+    @staticmethod
+    def campaign_summary(
+        campaign_id: str,
+        drops: Iterable[dict[str, Any]],
+        summaries: Iterable[dict[str, Any]],
+        *,
+        now: float | None = None,
+    ) -> dict[str, Any]:
+        """
+        Combines the drop summaries of a campaign, with the campaign's drop payloads
+        filling in the drops that aren't tracked. The drops of a campaign are all mined
+        at the same time, so the campaign completes with its longest remaining drop.
+        """
+        if now is None:
+            now = time()
+        summaries = list(summaries)
+        rates = [s["rate"] for s in summaries if s["rate"] is not None]
+        rate = max(rates) if rates else None
+        remaining = max(
+            (
+                max(drop["required_minutes"] - drop["current_minutes"], 0)
+                for drop in drops
+                if not drop.get("claimed")
+            ),
+            default=0,
+        )
+        statuses = {s["status"] for s in summaries}
+        if remaining == 0:
+            status = "complete"
+        elif "stalled" in statuses:
+            status = "stalled"
+        elif "progressing" in statuses:
+            status = "progressing"
+        else:
+            status = "idle"
+        eta = None
+        if status == "progressing" and rate:
+            eta = _isoformat(now + remaining / rate * 60)
+        return {
+            "campaign_id": campaign_id,
+            "remaining": remaining,
+            "rate": rate,
+            "status": status,
+            "eta": eta,
+        }
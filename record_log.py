@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import os
+import atexit
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+import codec
+import metrics
+
+
+logger = logging.getLogger("TwitchDrops")
+
+
+class RecordLog:
+    """
+    Append-only JSON Lines file, used for the journal and claims history.
+
+    Appending is O(1) for the caller: records are encoded and queued in memory,
+    then written out in batches by a background thread, with a single fsync per batch.
+    If `max_records` is set, the file is compacted down to the newest `max_records` records,
+    once it grows past twice that size.
+
+    Records are addressed by a sequence number, starting at 0 for the oldest record.
+    Compaction doesn't renumber the remaining records, so paging cursors stay valid.
+    """
+
+    def __init__(
+        self, path: Path, *, max_records: int | None = None, flush_interval: float = 1.0
+    ) -> None:
+        self._path = path
+        self._max_records = max_records
+        self._flush_interval = flush_interval
+        # guards all of the attributes below
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        # held by whoever is writing to the file
+        self._io_lock = threading.Lock()
+        # sequence number of the first record in the file
+        self._base: int = 0
+        # byte offsets of the records in the file, followed by the file size
+        self._offsets: list[int] = [0]
+        # encoded records waiting to be written
+        self._pending: list[bytes] = []
+        # encoded records being written right now, taken off the pending list
+        self._batch: list[bytes] = []
+        self._closing: bool = False
+        self._write_latency = metrics.RECORD_LOG_WRITE.labels(path.name)
+        self._scan()
+        self._thread = threading.Thread(
+            target=self._writer, name=f"RecordLog({path.name})", daemon=True
+        )
+        self._thread.start()
+        # in case close() is never called
+        atexit.register(self.close)
+
+    def _scan(self) -> None:
+        if not self._path.exists():
+            return
+        with open(self._path, "rb") as file:
+            data = file.read()
+        offset = 0
+        while (end := data.find(b"\n", offset)) != -1:
+            offset = end + 1
+            self._offsets.append(offset)
+        if offset < len(data):
+            # a partially written record, most likely from a crash - drop it
+            logger.warning(f"Dropping a partial record at the end of {self._path.name}")
+            with open(self._path, "r+b") as file:
+                file.truncate(offset)
+
+    def __len__(self) -> int:
+        """
+        Total number of records ever appended, including the ones dropped by compaction.
+        """
+        with self._lock:
+            return self._base + len(self._offsets) - 1 + len(self._batch) + len(self._pending)
+
+    def append(self, record: Any) -> None:
+        self.extend((record,))
+
+    def extend(self, records: Any) -> None:
+        encoded = [codec.dumps(record) + b"\n" for record in records]
+        with self._cond:
+            if self._closing:
+                # the writer is gone, so write these right away
+                self._pending.extend(encoded)
+                self._write_pending()
+                return
+            self._pending.extend(encoded)
+            self._cond.notify()
+
+    def _read(self, start: int, stop: int) -> list[bytes]:
+        # NOTE: the lock has to be held by the caller, and the range has to be valid
+        lines: list[bytes] = []
+        file_count = len(self._offsets) - 1
+        if start < file_count:
+            offsets = self._offsets
+            with open(self._path, "rb") as file:
+                file.seek(offsets[start])
+                data = file.read(offsets[min(stop, file_count)] - offsets[start])
+            lines.extend(data.splitlines())
+        if stop > file_count:
+            queued = self._batch + self._pending
+            lines.extend(queued[max(start - file_count, 0):stop - file_count])
+        return lines
+
+    def page(self, before: int | None = None, limit: int = 50) -> tuple[list[Any], int | None]:
+        """
+        Returns up to `limit` records older than the `before` sequence number, newest first,
+        together with the cursor to pass as `before` for the next page.
+        The cursor is None once there are no more records to return.
+        """
+        with self._lock:
+            base = self._base
+            count = len(self._offsets) - 1 + len(self._batch) + len(self._pending)
+            stop = count if before is None else min(before - base, count)
+            start = max(stop - max(limit, 0), 0)
+            if stop <= 0:
+                return [], None
+            lines = self._read(start, stop)
+        records = [codec.loads(line) for line in reversed(lines)]
+        return records, (base + start if start > 0 else None)
+
+    def tail(self, limit: int) -> list[Any]:
+        """
+        Returns the newest `limit` records, newest first.
+        """
+        return self.page(limit=limit)[0]
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Iterates over all records, oldest first.
+        """
+        with self._lock:
+            lines = self._read(0, len(self._offsets) - 1 + len(self._batch) + len(self._pending))
+        for line in lines:
+            yield codec.loads(line)
+
+    def _write_pending(self) -> bool:
+        # NOTE: the lock has to be held by the caller
+        while self._batch:
+            # another batch is being written, and the records have to stay in order
+            self._cond.wait()
+        # take the whole batch at once, so that records appended meanwhile aren't written twice
+        batch, self._pending = self._pending, []
+        if not batch:
+            return True
+        self._batch = batch
+        written = False
+        self._lock.release()
+        try:
+            with self._io_lock, self._write_latency.time():
+                with open(self._path, "ab") as file:
+                    file.write(b''.join(batch))
+                    file.flush()
+                    os.fsync(file.fileno())
+            written = True
+        except OSError:
+            logger.warning(f"Failed to write {self._path.name}", exc_info=True)
+        finally:
+            self._lock.acquire()
+            self._batch = []
+            self._cond.notify_all()
+        if not written:
+            # put the records back in front, to be retried with the next batch
+            self._pending[:0] = batch
+            return False
+        offset = self._offsets[-1]
+        for line in batch:
+            offset += len(line)
+            self._offsets.append(offset)
+        if self._max_records is not None and len(self._offsets) - 1 > 2 * self._max_records:
+            self._compact(self._max_records)
+        return True
+
+    def _compact(self, keep: int) -> None:
+        # NOTE: the lock has to be held by the caller
+        drop = max(len(self._offsets) - 1 - keep, 0)
+        start = self._offsets[drop]
+        temp_path = self._path.with_name(f"{self._path.name}.tmp")
+        with self._io_lock:
+            try:
+                with open(self._path, "rb") as file:
+                    file.seek(start)
+                    data = file.read()
+                with open(temp_path, "wb") as file:
+                    file.write(data)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temp_path, self._path)
+            except OSError:
+                logger.warning(f"Failed to compact {self._path.name}", exc_info=True)
+                return
+        self._base += drop
+        self._offsets = [offset - start for offset in self._offsets[drop:]]
+
+    def _writer(self) -> None:
+        with self._cond:
+            while True:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._closing:
+                    # let more records join the batch
+                    self._cond.wait(self._flush_interval)
+                if not self._pending and self._closing:
+                    return
+                if not self._write_pending() and self._closing:
+                    # don't hang the shutdown on a broken file
+                    self._pending.clear()
+                    return
+
+    def flush(self) -> None:
+        """
+        Blocks until all records appended so far have been written to the disk.
+        """
+        with self._cond:
+            while (self._pending or self._batch) and self._thread.is_alive():
+                self._cond.notify_all()
+                self._cond.wait(0.1)
+
+    def clear(self) -> None:
+        """
+        Removes all records. Sequence numbers keep increasing.
+        """
+        with self._lock:
+            # wait for the writer to finish the batch it's working on
+            while self._batch:
+                self._cond.wait(0.1)
+            self._base += len(self._offsets) - 1 + len(self._pending)
+            self._pending.clear()
+            self._offsets = [0]
+            with self._io_lock:
+                try:
+                    with open(self._path, "wb"):
+                        pass
+                except OSError:
+                    logger.warning(f"Failed to clear {self._path.name}", exc_info=True)
+
+    def close(self) -> None:
+        """
+        Writes out all pending records and stops the writer thread.
+        """
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+        atexit.unregister(self.close)
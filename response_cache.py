@@ -1,12 +1,23 @@
 from __future__ import annotations
 
-import json
+import gzip
+import hashlib
+import logging
 import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
-from utils import json_load, json_save
+import metrics
+import persistence
+from utils import json_decode, json_encode
+
+
+logger = logging.getLogger("TwitchDrops")
+SUFFIX = ".json.gz"
+# total size of the compressed entries, past which the least recently used ones are evicted
+MAX_BYTES = 32 * 1024 * 1024
 
 
 class ResponseCache:
@@ -15,51 +26,185 @@ class ResponseCache:
 
     Stores payloads on disk with their fetch time to avoid repeating
     expensive operations between runs while still respecting a TTL.
+
+    Each entry is kept in its own gzip-compressed file, inside the `path` directory,
+    and is only read when requested. Files are written through the write-behind writer,
+    compressed on its thread and replaced atomically, so a crash can't corrupt the other entries.
+    The total size of the entries is bound by `max_bytes`, evicting the least recently used ones.
     """
 
-    def __init__(self, path: Path) -> None:
+    def __init__(self, path: Path, *, max_bytes: int = MAX_BYTES) -> None:
         self._path = path
+        self._max_bytes = max_bytes
         self._lock = threading.Lock()
-        path.parent.mkdir(parents=True, exist_ok=True)
+        path.mkdir(parents=True, exist_ok=True)
+        # file name -> size on disk, least recently used first
+        self._index: OrderedDict[str, int] = OrderedDict()
+        # file name -> encoded entry, for the entries that haven't been written out yet
+        self._pending: dict[str, bytes] = {}
+        self._stats: dict[str, int] = dict.fromkeys(
+            ("hits", "misses", "expired", "evictions", "bytes_read", "bytes_written"), 0
+        )
+        files: list[tuple[float, str, int]] = []
+        for file in path.glob(f"*{SUFFIX}"):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, file.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._index[name] = size
+        self._migrate_legacy_file(path.with_suffix(".json"))
+
+    def _migrate_legacy_file(self, legacy_path: Path) -> None:
+        # the whole cache used to be kept in a single JSON file
+        if not legacy_path.exists():
+            return
+        try:
+            with open(legacy_path, "rb") as file:
+                entries: dict[str, dict[str, Any]] = json_decode(file.read())
+        except (ValueError, OSError):
+            # Corrupt cache file – there's nothing to salvage.
+            entries = {}
+        for key, entry in entries.items():
+            if isinstance(entry, dict) and "fetched_at" in entry and "data" in entry:
+                self._store(key, entry["fetched_at"], entry["data"])
+        persistence.remove(legacy_path)
+
+    @staticmethod
+    def _file_name(key: str) -> str:
+        return hashlib.sha1(key.encode("utf8")).hexdigest() + SUFFIX
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of the entries, in bytes.
+        """
+        with self._lock:
+            return sum(self._index.values())
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the hit/miss counts, bytes read and written, the entry count and total size.
+        """
+        with self._lock:
+            return {
+                **self._stats, "entries": len(self._index), "size": sum(self._index.values())
+            }
+
+    def _count(self, result: str) -> None:
+        # NOTE: the lock has to be held by the caller
+        self._stats[result] += 1
+        metrics.RESPONSE_CACHE_LOOKUPS.labels(result).inc()
+
+    def _read(self, name: str) -> dict[str, Any] | None:
+        # NOTE: the lock has to be held by the caller
+        encoded = self._pending.get(name)
+        if encoded is None:
+            try:
+                with open(self._path / name, "rb") as file:
+                    data = file.read()
+                self._stats["bytes_read"] += len(data)
+                encoded = gzip.decompress(data)
+            except (OSError, EOFError) as exc:
+                # gzip.BadGzipFile is an OSError too
+                logger.warning(f"Failed to read the cached {name} response: {exc}")
+                return None
         try:
-            self._entries: dict[str, dict[str, Any]] = json_load(path, {}, merge=False)
-        except (json.JSONDecodeError, OSError):
-            # Corrupt cache file – start clean to avoid hard failures.
-            self._entries = {}
+            entry = json_decode(encoded)
+        except ValueError:
+            return None
+        return entry if isinstance(entry, dict) else None
 
     def get(self, key: str, *, max_age: timedelta) -> tuple[Any, datetime] | None:
         """
         Return a cached payload if it is not older than max_age.
         """
+        name = self._file_name(key)
         with self._lock:
-            entry = self._entries.get(key)
-            if entry is None:
+            if name not in self._index:
+                self._count("misses")
                 return None
+            entry = self._read(name)
+            if entry is None or entry.get("key") != key:
+                # corrupted, or a hash collision
+                self._count("misses")
+                self._evict(name)
+                return None
+            self._index.move_to_end(name)
             fetched_at_str = entry.get("fetched_at")
             payload = entry.get("data")
             if fetched_at_str is None or payload is None:
+                self._count("misses")
                 return None
             try:
                 fetched_at = datetime.fromisoformat(fetched_at_str)
             except ValueError:
+                self._count("misses")
                 return None
             if fetched_at.tzinfo is None:
                 fetched_at = fetched_at.replace(tzinfo=timezone.utc)
             if datetime.now(timezone.utc) - fetched_at > max_age:
+                self._count("expired")
                 return None
+            self._count("hits")
             return payload, fetched_at
 
+    def _writer(self, name: str, encoded: bytes) -> Callable[[Path], None]:
+        # compression runs on the writer thread
+        def write(temp_path: Path) -> None:
+            data = gzip.compress(encoded, mtime=0)
+            with open(temp_path, "wb") as file:
+                file.write(data)
+            with self._lock:
+                if name in self._index:
+                    self._index[name] = len(data)
+                self._stats["bytes_written"] += len(data)
+        return write
+
+    def _written(self, name: str, encoded: bytes) -> Callable[[], None]:
+        # the entry stays pending until the file has been replaced, as there may be no file yet
+        def done() -> None:
+            with self._lock:
+                if self._pending.get(name) is encoded:
+                    del self._pending[name]
+        return done
+
+    def _store(self, key: str, fetched_at: str, payload: Any) -> None:
+        # NOTE: the lock has to be held by the caller
+        name = self._file_name(key)
+        encoded = json_encode({"key": key, "fetched_at": fetched_at, "data": payload})
+        self._pending[name] = encoded
+        # the uncompressed size stands in, until the compressed file is written
+        self._index[name] = len(encoded)
+        self._index.move_to_end(name)
+        persistence.write(
+            self._path / name,
+            self._writer(name, encoded),
+            label=self._path.name,
+            done=self._written(name, encoded),
+        )
+        total = sum(self._index.values())
+        # always keep the entry that's just been stored
+        while total > self._max_bytes and len(self._index) > 1:
+            oldest = next(iter(self._index))
+            total -= self._index[oldest]
+            self._evict(oldest)
+            self._stats["evictions"] += 1
+
+    def _evict(self, name: str) -> None:
+        # NOTE: the lock has to be held by the caller
+        self._index.pop(name, None)
+        self._pending.pop(name, None)
+        persistence.remove(self._path / name, label=self._path.name)
+
     def set(self, key: str, payload: Any) -> datetime:
         """
         Persist a payload and return the timestamp used for the write.
         """
         with self._lock:
             fetched_at = datetime.now(timezone.utc)
-            self._entries[key] = {
-                "fetched_at": fetched_at.isoformat(),
-                "data": payload,
-            }
-            json_save(self._path, self._entries, sort=True)
+            self._store(key, fetched_at.isoformat(), payload)
             return fetched_at
 
     def clear(self, key: str | None = None) -> None:
@@ -68,7 +213,7 @@ class ResponseCache:
         """
         with self._lock:
             if key is None:
-                self._entries.clear()
+                for name in list(self._index):
+                    self._evict(name)
             else:
-                self._entries.pop(key, None)
-            json_save(self._path, self._entries, sort=True)
+                self._evict(self._file_name(key))
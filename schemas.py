@@ -0,0 +1,341 @@
+"""
+Typed schemas for the hot pubsub and GQL payload shapes.
+
+Only the fields the miner actually uses are declared, everything else is skipped while decoding.
+When msgspec is installed, payloads are decoded straight into the structs below, without ever
+building the intermediate dict tree. Otherwise, a small compatible fallback is used, which
+converts the decoded dicts into slotted objects, validating their shape the same way.
+"""
+from __future__ import annotations
+
+import types
+import typing
+from functools import lru_cache
+from typing import Any, Callable, TypeVar, Union
+
+import codec
+
+
+_S = TypeVar("_S")
+_NODEFAULT: Any = object()
+_Converter = Callable[[Any, str], Any]
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None  # type: ignore[assignment]
+
+
+def _camel(name: str) -> str:
+    first, *rest = name.split('_')
+    return first + ''.join(part.title() for part in rest)
+
+
+class _StructMeta(type):
+    def __new__(
+        mcls,
+        name: str,
+        bases: tuple[type, ...],
+        namespace: dict[str, Any],
+        *,
+        rename: str | None = None,
+        kw_only: bool = False,
+        gc: bool = True,
+    ):
+        # NOTE: 'kw_only' and 'gc' only matter for msgspec, and are accepted for compatibility
+        if not any(isinstance(base, _StructMeta) for base in bases):
+            # the base class itself
+            return super().__new__(mcls, name, bases, namespace)
+        annotations: dict[str, Any] = namespace.get("__annotations__", {})
+        defaults: dict[str, Any] = {}
+        for field in annotations:
+            if field in namespace:
+                defaults[field] = namespace.pop(field)
+        namespace["__slots__"] = tuple(annotations)
+        cls = super().__new__(mcls, name, bases, namespace)
+        fields: list[str] = []
+        all_defaults: dict[str, Any] = {}
+        for base in reversed(cls.__mro__[1:]):
+            if isinstance(base, _StructMeta):
+                fields.extend(f for f in base.__struct_fields__ if f not in fields)
+                all_defaults.update(base._struct_defaults)
+        fields.extend(f for f in annotations if f not in fields)
+        all_defaults.update(defaults)
+        cls.__struct_fields__ = tuple(fields)
+        cls._struct_defaults = all_defaults
+        if rename is not None:
+            if rename != "camel":
+                raise ValueError(f"Unsupported rename: {rename}")
+            cls._struct_rename = True
+        return cls
+
+
+class _Struct(metaclass=_StructMeta):
+    """
+    A minimal stand-in for `msgspec.Struct`, covering the features used in this module.
+    """
+    __struct_fields__: tuple[str, ...] = ()
+    _struct_defaults: dict[str, Any] = {}
+    _struct_rename: bool = False
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        for name, value in zip(self.__struct_fields__, args):
+            kwargs[name] = value
+        for name in self.__struct_fields__:
+            if name in kwargs:
+                setattr(self, name, kwargs[name])
+            elif name in self._struct_defaults:
+                setattr(self, name, self._struct_defaults[name])
+            else:
+                raise TypeError(f"Missing required argument '{name}'")
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__struct_fields__)
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.__struct_fields__
+        )
+
+
+class _ValidationError(ValueError):
+    pass
+
+
+def _type_name(value: Any) -> str:
+    if value is None:
+        return "null"
+    elif isinstance(value, dict):
+        return "object"
+    elif isinstance(value, list):
+        return "array"
+    return type(value).__name__
+
+
+def _mismatch(expected: str, value: Any, path: str) -> _ValidationError:
+    # same format msgspec uses
+    return _ValidationError(f"Expected `{expected}`, got `{_type_name(value)}` - at `{path}`")
+
+
+@lru_cache(maxsize=None)
+def _struct_fields(cls: type[_Struct]) -> list[tuple[str, str, _Converter, Any]]:
+    # resolved lazily, so that forward references work
+    hints = typing.get_type_hints(cls)
+    return [
+        (
+            name,
+            _camel(name) if cls._struct_rename else name,
+            _converter(hints[name]),
+            cls._struct_defaults.get(name, _NODEFAULT),
+        )
+        for name in cls.__struct_fields__
+    ]
+
+
+@lru_cache(maxsize=None)
+def _converter(tp: Any) -> _Converter:
+    origin = typing.get_origin(tp)
+    if tp is Any:
+        return lambda value, path: value
+    elif tp is None or tp is type(None):
+        def convert_none(value: Any, path: str) -> None:
+            if value is not None:
+                raise _mismatch("null", value, path)
+            return None
+        return convert_none
+    elif origin is Union or origin is types.UnionType:
+        args = typing.get_args(tp)
+        rest = [arg for arg in args if arg is not type(None)]
+        if len(rest) != 1:
+            raise TypeError(f"Only optional unions are supported: {tp}")
+        inner = _converter(rest[0])
+        return lambda value, path: None if value is None else inner(value, path)
+    elif origin is list:
+        item = _converter(typing.get_args(tp)[0])
+
+        def convert_list(value: Any, path: str) -> list[Any]:
+            if not isinstance(value, list):
+                raise _mismatch("array", value, path)
+            return [item(v, f"{path}[{i}]") for i, v in enumerate(value)]
+        return convert_list
+    elif isinstance(tp, type) and issubclass(tp, _Struct):
+        def convert_struct(value: Any, path: str) -> _Struct:
+            if not isinstance(value, dict):
+                raise _mismatch("object", value, path)
+            obj = tp.__new__(tp)
+            for name, key, field_converter, default in _struct_fields(tp):
+                if key in value:
+                    setattr(obj, name, field_converter(value[key], f"{path}.{key}"))
+                elif default is not _NODEFAULT:
+                    setattr(obj, name, default)
+                else:
+                    raise _ValidationError(f"Object missing required field `{key}` - at `{path}`")
+            return obj
+        return convert_struct
+    elif tp in (str, int, bool):
+        def convert_plain(value: Any, path: str) -> Any:
+            # bool is a subclass of int, but shouldn't pass as one
+            if type(value) is not tp:
+                raise _mismatch(tp.__name__, value, path)
+            return value
+        return convert_plain
+    elif tp is float:
+        def convert_float(value: Any, path: str) -> float:
+            if type(value) not in (int, float):
+                raise _mismatch("float", value, path)
+            return float(value)
+        return convert_float
+    raise TypeError(f"Unsupported schema type: {tp}")
+
+
+if msgspec is not None:
+    Struct = msgspec.Struct
+    ValidationError = msgspec.ValidationError
+
+    @lru_cache(maxsize=None)
+    def _decoder(type: Any) -> msgspec.json.Decoder:
+        return msgspec.json.Decoder(type)
+
+    def decode(data: str | bytes, type: type[_S]) -> _S:
+        """
+        Decodes JSON straight into the given schema type.
+        Raises a ValueError subclass if the data doesn't match the schema.
+        """
+        return _decoder(type).decode(data)
+
+    def convert(obj: Any, type: type[_S]) -> _S:
+        """
+        Converts already decoded JSON into the given schema type.
+        """
+        return msgspec.convert(obj, type)
+else:
+    Struct = _Struct  # type: ignore[misc, assignment]
+    ValidationError = _ValidationError  # type: ignore[misc, assignment]
+
+    def decode(data: str | bytes, type: type[_S]) -> _S:
+        """
+        Decodes JSON straight into the given schema type.
+        Raises a ValueError subclass if the data doesn't match the schema.
+        """
+        return _converter(type)(codec.loads(data), "$")
+
+    def convert(obj: Any, type: type[_S]) -> _S:
+        """
+        Converts already decoded JSON into the given schema type.
+        """
+        return _converter(type)(obj, "$")
+
+
+# Pubsub
+
+class PubsubData(Struct, gc=False):
+    topic: str
+    # JSON-encoded body, decoded by the topic it's addressed to
+    message: str
+
+
+class PubsubFrame(Struct, gc=False):
+    type: str
+    data: PubsubData | None = None
+
+
+class StreamState(Struct, gc=False):
+    # "video-playback-by-id" topic
+    type: str
+    viewers: int = 0
+
+
+class StreamUpdate(Struct, gc=False):
+    # "broadcast-settings-update" topic
+    game: str | None = None
+    old_game: str | None = None
+
+
+class DropEventData(Struct, gc=False):
+    drop_id: str | None = None
+    current_progress_min: int = 0
+    required_progress_min: int = 0
+    drop_instance_id: str | None = None
+
+
+class DropEvent(Struct, gc=False):
+    # "user-drop-events" topic
+    type: str
+    data: DropEventData | None = None
+
+
+class NotificationInfo(Struct, gc=False):
+    id: str
+    type: str
+
+
+class NotificationData(Struct, gc=False):
+    notification: NotificationInfo | None = None
+
+
+class NotificationEvent(Struct, gc=False):
+    # "onsite-notifications" topic
+    type: str
+    data: NotificationData | None = None
+
+
+# GQL
+
+class GQLResponse(Struct, kw_only=True, gc=False):
+    # Responses carrying any errors fail validation on purpose,
+    # so that they go through the generic GQL error handling instead.
+    errors: None = None
+
+
+class GameInfo(Struct, rename="camel", gc=False):
+    id: str
+    name: str
+    display_name: str | None = None
+    slug: str | None = None
+
+
+class StreamInfo(Struct, rename="camel", gc=False):
+    id: str
+    viewers_count: int
+
+
+class BroadcastSettings(Struct, rename="camel", gc=False):
+    title: str
+    game: GameInfo | None = None
+
+
+class ChannelInfo(Struct, rename="camel", gc=False):
+    id: str
+    display_name: str
+    broadcast_settings: BroadcastSettings
+    stream: StreamInfo | None = None
+
+
+class StreamInfoData(Struct, gc=False):
+    user: ChannelInfo | None = None
+
+
+class StreamInfoResponse(GQLResponse, kw_only=True):
+    # "GetStreamInfo" operation
+    data: StreamInfoData
+
+
+class CampaignRef(Struct, gc=False):
+    id: str
+
+
+class AvailableDropsChannel(Struct, rename="camel", gc=False):
+    id: str
+    viewer_drop_campaigns: list[CampaignRef] | None = None
+
+
+class AvailableDropsData(Struct, gc=False):
+    channel: AvailableDropsChannel | None = None
+
+
+class AvailableDropsResponse(GQLResponse, kw_only=True):
+    # "AvailableDrops" operation
+    data: AvailableDropsData
@@ -26,6 +26,11 @@ class SettingsFile(TypedDict):
     priority_mode: PriorityMode
     logging_watchdog_level: int | None
     logging_watch_level: int | None
+    logging_loop_level: int | None
+    slow_callback_ms: int
+    console_lines: int
+    log_buffer_size: int
+    warm_restart: bool
     api_token: str | None
 
 
@@ -43,6 +48,11 @@ default_settings: SettingsFile = {
     "priority_mode": PriorityMode.PRIORITY_ONLY,
     "logging_watchdog_level": None,
     "logging_watch_level": None,
+    "logging_loop_level": None,
+    "slow_callback_ms": 100,
+    "console_lines": 1000,
+    "log_buffer_size": 5000,
+    "warm_restart": True,
     "api_token": None,
 }
 
@@ -54,14 +64,18 @@ class Settings:
     dump: bool
     headless: bool
     bind: str | None
+    base_url: str | None
     config: Any
     data_dir: Any
+    accounts: list[Any]
+    shared_cache_dir: Any
     # args properties
     debug_ws: int
     debug_gql: int
     logging_level: int
     logging_watchdog_level: int | None
     logging_watch_level: int | None
+    logging_loop_level: int | None
     # from settings file
     proxy: URL
     language: str
@@ -74,6 +88,10 @@ class Settings:
     enable_badges_emotes: bool
     available_drops_check: bool
     priority_mode: PriorityMode
+    slow_callback_ms: int
+    console_lines: int
+    log_buffer_size: int
+    warm_restart: bool
     api_token: str | None
 
     PASSTHROUGH = ("_settings", "_args", "_altered", "_settings_path")
@@ -0,0 +1,377 @@
+"""
+Public data, shared between all of the accounts hosted by the same process,
+and optionally between all of the processes running on the same host.
+
+Responses that don't depend on the account requesting them, like the game directories,
+the stream info of a channel and the campaign definitions, are kept for a while, keyed by
+the operation name and its variables. Anything user-specific is removed from the responses
+before they're kept, and the variables only telling the users apart are left out of the key.
+The spade URLs of the channels are kept the same way.
+
+Accounts tracking the same games and channels then share one request between them,
+and a request that's already in flight is awaited instead of being repeated. With a shared
+directory set, the entries are also written there, one file per entry, for the other processes
+to pick up instead of requesting the same data again.
+"""
+from __future__ import annotations
+
+import os
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from time import time
+from contextlib import suppress
+from typing import Any, Awaitable, Callable, NamedTuple, TypeVar, TYPE_CHECKING
+
+import codec
+import schemas
+import metrics
+import persistence
+from constants import GQL_OPERATIONS
+
+if TYPE_CHECKING:
+    from constants import GQLOperation, URLType
+
+
+logger = logging.getLogger("TwitchDrops")
+_S = TypeVar("_S")
+_Key = tuple[str, bytes]
+
+
+class CachePolicy(NamedTuple):
+    # how long the responses are kept, in seconds
+    ttl: float
+    # variables that only tell the users apart, left out of the key
+    user_variables: tuple[str, ...] = ()
+    # keys of the user-specific fields, removed from the responses at any depth
+    user_fields: tuple[str, ...] = ()
+    # paths to the user-specific fields, removed from the responses
+    user_paths: tuple[tuple[str, ...], ...] = ()
+
+
+# NOTE: Only operations listed here are cached, everything else is always requested
+POLICIES: dict[str, CachePolicy] = {
+    GQL_OPERATIONS["GameDirectory"]["operationName"]: CachePolicy(60.0),
+    GQL_OPERATIONS["GetStreamInfo"]["operationName"]: CachePolicy(15.0),
+    # the campaign definitions, without the account linking status and the drops progress,
+    # which come from the campaigns list and the inventory of each user anyway
+    GQL_OPERATIONS["CampaignDetails"]["operationName"]: CachePolicy(
+        600.0,
+        user_variables=("channelLogin",),
+        user_fields=("self",),
+        user_paths=(("data", "user", "id"),),
+    ),
+}
+SPADE_URL = "spade_url"
+SPADE_URL_TTL = 6 * 3600.0
+# expired entries are dropped once this many have been added since the last sweep
+SWEEP_EVERY = 500
+
+
+def _public(data: Any, fields: tuple[str, ...]) -> Any:
+    if isinstance(data, dict):
+        return {k: _public(v, fields) for k, v in data.items() if k not in fields}
+    if isinstance(data, list):
+        return [_public(v, fields) for v in data]
+    return data
+
+
+class _Entry:
+    __slots__ = ("expires", "data", "_typed")
+
+    def __init__(self, expires: float, data: Any) -> None:
+        self.expires: float = expires
+        self.data: Any = data
+        # schema type -> the data converted into it
+        self._typed: dict[type, Any] = {}
+
+    def get(self, schema: type[_S] | None) -> Any:
+        if schema is None:
+            return self.data
+        if (typed := self._typed.get(schema)) is None:
+            typed = self._typed[schema] = schemas.convert(self.data, schema)
+        return typed
+
+
+class _Abandoned(Exception):
+    pass
+
+
+class _DiskStore:
+    """
+    Entries kept in a directory shared by several processes, one file per entry.
+
+    Files are replaced atomically by the persistence writer, so a reader never sees a partial
+    entry. Expired files are left in place until a sweep removes them.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path: Path = path
+        path.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, key: _Key) -> Path:
+        digest = hashlib.sha1(key[0].encode("utf8") + b"\0" + key[1]).hexdigest()
+        return Path(self.path, f"{digest}.json")
+
+    def read(self, keys: list[_Key], now: float) -> list[_Entry | None]:
+        # runs on a worker thread
+        entries: list[_Entry | None] = []
+        for key in keys:
+            entry: _Entry | None = None
+            try:
+                with open(self._file(key), "rb") as file:
+                    stored = codec.loads(file.read())
+                if (
+                    stored["key"] == [key[0], key[1].decode("utf8")]
+                    and stored["expires"] > now
+                ):
+                    entry = _Entry(stored["expires"], stored["data"])
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, KeyError, TypeError):
+                logger.debug("Ignoring an unreadable shared cache entry", exc_info=True)
+            entries.append(entry)
+        return entries
+
+    def write(self, key: _Key, entry: _Entry) -> None:
+        stored = {
+            "key": [key[0], key[1].decode("utf8")],
+            "expires": entry.expires,
+            "data": entry.data,
+        }
+        persistence.write(self._file(key), codec.dumps(stored), label="shared_cache")
+
+    def sweep(self, max_age: float) -> int:
+        # runs on a worker thread
+        removed = 0
+        cutoff = time() - max_age
+        with os.scandir(self.path) as it:
+            for dir_entry in it:
+                with suppress(OSError):
+                    if dir_entry.name.endswith(".json") and dir_entry.stat().st_mtime < cutoff:
+                        os.remove(dir_entry.path)
+                        removed += 1
+        return removed
+
+
+class SharedCache:
+    """
+    A TTL cache of public data, with concurrent requests for the same key coalesced.
+
+    The cached responses are shared, and must not be modified.
+    """
+
+    def __init__(
+        self,
+        policies: dict[str, CachePolicy] | None = None,
+        *,
+        directory: Path | None = None,
+    ) -> None:
+        self._policies: dict[str, CachePolicy] = POLICIES if policies is None else policies
+        self._entries: dict[_Key, _Entry] = {}
+        self._in_flight: dict[_Key, asyncio.Future[_Entry]] = {}
+        self._added: int = 0
+        self._disk: _DiskStore | None = _DiskStore(directory) if directory is not None else None
+        self._sweep_task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _key(self, op: GQLOperation) -> _Key | None:
+        policy = self._policies.get(op["operationName"])
+        if policy is None:
+            return None
+        variables = op.get("variables")
+        if variables and policy.user_variables:
+            variables = {k: v for k, v in variables.items() if k not in policy.user_variables}
+        return (op["operationName"], codec.dumps(variables, sort_keys=True))
+
+    def _entry(self, op: GQLOperation, response: Any, now: float) -> _Entry:
+        # any errors left in the response have been handled already, see Twitch.gql_request
+        data = {k: v for k, v in response.items() if k != "errors"}
+        policy = self._policies.get(op["operationName"])
+        if policy is None:
+            # never cached, only converted
+            return _Entry(now, data)
+        if policy.user_fields or policy.user_paths:
+            # copies everything, so the paths can be removed from the copy
+            data = _public(data, policy.user_fields)
+            for *parents, field in policy.user_paths:
+                parent: Any = data
+                for name in parents:
+                    parent = parent.get(name) if isinstance(parent, dict) else None
+                if isinstance(parent, dict):
+                    parent.pop(field, None)
+        return _Entry(now + policy.ttl, data)
+
+    def _store(self, key: _Key, entry: _Entry, now: float, *, write: bool = True) -> None:
+        self._entries[key] = entry
+        if write and self._disk is not None:
+            self._disk.write(key, entry)
+        self._added += 1
+        if self._added >= SWEEP_EVERY:
+            self._added = 0
+            for expired in [k for k, e in self._entries.items() if e.expires <= now]:
+                del self._entries[expired]
+            if self._disk is not None and (
+                self._sweep_task is None or self._sweep_task.done()
+            ):
+                self._sweep_task = asyncio.create_task(self._sweep_disk())
+
+    async def _sweep_disk(self) -> None:
+        assert self._disk is not None
+        max_age = max([SPADE_URL_TTL, *(policy.ttl for policy in self._policies.values())])
+        try:
+            removed = await asyncio.to_thread(self._disk.sweep, max_age)
+        except OSError as exc:
+            logger.warning(f"Failed to sweep the shared cache directory: {exc}")
+        else:
+            logger.debug(f"Removed {removed} expired shared cache entries")
+
+    async def _resolve(
+        self,
+        keys: list[_Key | None],
+        fetch: Callable[[list[int]], Awaitable[list[_Entry]]],
+    ) -> list[_Entry]:
+        """
+        Returns the entries for the keys, in order. The ones that aren't cached, in memory
+        or on the disk, and aren't already being requested, are requested together,
+        in a single `fetch` call, with the indexes of the keys they're for.
+
+        Keys that are None are always requested, and never cached.
+        Failed requests aren't cached, the error is raised to everyone waiting on them.
+        """
+        now = time()
+        results: list[_Entry | None] = [None] * len(keys)
+        waiting: list[tuple[int, asyncio.Future[_Entry]]] = []
+        missing: list[int] = []
+        owned: dict[_Key, asyncio.Future[_Entry]] = {}
+        for i, key in enumerate(keys):
+            if key is None:
+                missing.append(i)
+                continue
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires > now:
+                metrics.SHARED_CACHE.labels(key[0], "hit").inc()
+                results[i] = entry
+            elif (future := self._in_flight.get(key)) is not None:
+                metrics.SHARED_CACHE.labels(key[0], "coalesced").inc()
+                waiting.append((i, future))
+            elif (future := owned.get(key)) is not None:
+                # the same key requested twice within the batch
+                waiting.append((i, future))
+            else:
+                owned[key] = self._in_flight[key] = asyncio.get_running_loop().create_future()
+                missing.append(i)
+        try:
+            if self._disk is not None and owned:
+                await self._read_disk(keys, missing, owned, results, now)
+            for i in missing:
+                if (key := keys[i]) is not None:
+                    metrics.SHARED_CACHE.labels(key[0], "miss").inc()
+            if missing:
+                entries = await fetch(missing)
+                now = time()
+                for i, entry in zip(missing, entries):
+                    results[i] = entry
+                    key = keys[i]
+                    if key is not None and (future := owned.pop(key, None)) is not None:
+                        del self._in_flight[key]
+                        self._store(key, entry, now)
+                        future.set_result(entry)
+        except BaseException as exc:
+            self._release(owned, exc)
+            raise
+        # anything left without a response is requested again by whoever waits on it
+        self._release(owned, _Abandoned())
+        for i, future in waiting:
+            try:
+                results[i] = await asyncio.shield(future)
+            except _Abandoned:
+                results[i] = (
+                    await self._resolve([keys[i]], lambda _, i=i: fetch([i]))  # type: ignore
+                )[0]
+        return results  # type: ignore[return-value]
+
+    async def _read_disk(
+        self,
+        keys: list[_Key | None],
+        missing: list[int],
+        owned: dict[_Key, asyncio.Future[_Entry]],
+        results: list[_Entry | None],
+        now: float,
+    ) -> None:
+        # the entries found are taken out of the missing ones
+        assert self._disk is not None
+        indexes = [i for i in missing if keys[i] is not None]
+        disk_keys: list[_Key] = [keys[i] for i in indexes]  # type: ignore[misc]
+        entries = await asyncio.to_thread(self._disk.read, disk_keys, now)
+        for i, key, entry in zip(indexes, disk_keys, entries):
+            if entry is None:
+                continue
+            metrics.SHARED_CACHE.labels(key[0], "disk").inc()
+            results[i] = entry
+            missing.remove(i)
+            self._store(key, entry, now, write=False)
+            del self._in_flight[key]
+            owned.pop(key).set_result(entry)
+
+    def _release(self, owned: dict[_Key, asyncio.Future[_Entry]], exc: BaseException) -> None:
+        if not isinstance(exc, Exception):
+            # cancelled, the requests waiting on this one have to be made again
+            exc = _Abandoned()
+        for key, future in owned.items():
+            del self._in_flight[key]
+            future.set_exception(exc)
+            # NOTE: Mark the exception as retrieved, as nothing might be waiting on it
+            future.exception()
+        owned.clear()
+
+    async def get_many(
+        self,
+        ops: list[GQLOperation],
+        fetch: Callable[[list[GQLOperation]], Awaitable[list[Any]]],
+        *,
+        schema: type[_S] | None = None,
+    ) -> list[Any]:
+        """
+        Returns the responses to the operations, in order, converted into the `schema` type
+        if one is given. The ones that have to be requested, are requested together,
+        in a single `fetch` call, which should return the responses as plain JSON.
+        """
+        async def fetch_missing(indexes: list[int]) -> list[_Entry]:
+            missing_ops = [ops[i] for i in indexes]
+            responses = await fetch(missing_ops)
+            now = time()
+            return [self._entry(op, data, now) for op, data in zip(missing_ops, responses)]
+
+        entries = await self._resolve([self._key(op) for op in ops], fetch_missing)
+        return [entry.get(schema) for entry in entries]
+
+    async def get(
+        self,
+        op: GQLOperation,
+        fetch: Callable[[GQLOperation], Awaitable[Any]],
+        *,
+        schema: type[_S] | None = None,
+    ) -> Any:
+        """
+        Returns the response to the operation, converted into the `schema` type if one is given.
+        """
+        async def fetch_one(ops: list[GQLOperation]) -> list[Any]:
+            return [await fetch(ops[0])]
+
+        return (await self.get_many([op], fetch_one, schema=schema))[0]
+
+    async def get_spade_url(
+        self, channel_id: int, fetch: Callable[[], Awaitable[URLType]]
+    ) -> URLType:
+        """
+        Returns the spade URL of the channel, or the one `fetch` returns for it.
+        """
+        async def fetch_one(_: list[int]) -> list[_Entry]:
+            return [_Entry(time() + SPADE_URL_TTL, await fetch())]
+
+        key: _Key = (SPADE_URL, str(channel_id).encode("utf8"))
+        return (await self._resolve([key], fetch_one))[0].data
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import gzip
 import logging
 import os
-import json
-from copy import deepcopy
+from collections import deque
 from datetime import datetime, timezone
 from threading import Lock
-from typing import TYPE_CHECKING, Any, Iterable
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Callable, Iterable
 
-from constants import State, JOURNAL_PATH, CLAIMS_PATH
+import codec
+import metrics
+from constants import AccountPaths, State
+from claims_db import ClaimsStore
+from progress_series import ProgressSeries
+from record_log import RecordLog
 
 logger = logging.getLogger("TwitchDrops")
 
@@ -18,23 +24,121 @@ if TYPE_CHECKING:
     from settings import Settings
 
 
+# journal entries kept in memory for the snapshot, and the history kept on disk for paging
+JOURNAL_LIMIT = 100
+JOURNAL_HISTORY = 1000
+# claims shipped with the snapshot, the full history is queried separately
+CLAIMS_WINDOW = 20
+# how often the system load in the snapshot gets refreshed, in seconds
+LOAD_INTERVAL = 5.0
+# state change events kept around, for event stream clients to resume from
+EVENTS_HISTORY = 1000
+# how often the progress analytics in the snapshot get refreshed, in seconds
+PROGRESS_INTERVAL = 30.0
+
+
+class StateEvent:
+    """
+    A single change to the state, tagged with the state version it has produced.
+
+    Event types, and the data they carry:
+    - "runtime": a dict of the changed simple runtime fields, like "state" or "watching"
+    - "channels": the full channels list, when channels have been added, removed or reordered
+    - "channel": a single changed channel
+    - "campaigns": the full campaigns list, when campaigns have been added, removed or reordered
+    - "campaign": a single changed campaign
+    - "drop": {"campaign_id": ..., "drop": ...}, the drop progress changing
+    - "journal": a new journal entry
+    - "journal_cleared": an empty dict
+    - "claim": {"claim": ..., "total": ...}, a new claim
+    - "settings": the changed settings
+    - "watchdog": a new watchdog log entry
+    """
+    __slots__ = ("version", "type", "data", "_body")
+
+    def __init__(self, version: int, event_type: str, data: Any) -> None:
+        self.version: int = version
+        self.type: str = event_type
+        self.data: Any = data
+        self._body: bytes | None = None
+
+    @property
+    def body(self) -> bytes:
+        # encoded once, no matter how many clients it's sent to
+        if self._body is None:
+            self._body = codec.dumps(self.data)
+        return self._body
+
+
+class Snapshot:
+    """
+    An immutable view of the state, built at most once per state version.
+
+    The JSON-encoded and gzip-compressed forms are only built when first needed,
+    and then cached, so that unchanged state can be served without any work.
+    """
+    __slots__ = ("version", "etag", "data", "_body", "_gzip_body")
+
+    def __init__(self, version: int, etag: str, data: dict[str, Any]) -> None:
+        self.version: int = version
+        self.etag: str = etag
+        # NOTE: shares structure with the state store, and must not be modified
+        self.data: dict[str, Any] = data
+        self._body: bytes | None = None
+        self._gzip_body: bytes | None = None
+
+    @property
+    def body(self) -> bytes:
+        if self._body is None:
+            self._body = codec.dumps(self.data)
+        return self._body
+
+    @property
+    def gzip_body(self) -> bytes:
+        if self._gzip_body is None:
+            self._gzip_body = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzip_body
+
+
 class StateStore:
-    def __init__(self, settings: "Settings"):
+    def __init__(self, settings: "Settings", *, paths: AccountPaths | None = None):
         self._lock = Lock()
         self._settings = self._settings_payload(settings)
         self._started_at = datetime.now(timezone.utc)
+        # bumped on every change to the state the snapshot is built from
+        self._version: int = 0
+        # tells apart the versions of different runs, for the ETags and event IDs
+        self.run_id: str = f"{int(self._started_at.timestamp() * 1000):x}"
+        self._snapshot: Snapshot | None = None
+        self._load_checked: float = 0.0
+        self._events: deque[StateEvent] = deque(maxlen=EVENTS_HISTORY)
+        self._listeners: list[Callable[[], None]] = []
 
         self._last_watching_login = None
         self._known_claims = set()
         self._first_campaign_load = True
-        self._journal_file = JOURNAL_PATH
-        self._claims_file = CLAIMS_PATH
+        self._paths: AccountPaths = paths or AccountPaths.default()
+        self._journal_log = RecordLog(self._paths.JOURNAL, max_records=JOURNAL_HISTORY)
+        self._claims_db = ClaimsStore(self._paths.CLAIMS)
+        self._migrate_legacy_files()
 
         self._game_last_seen: dict[str, datetime] = {}
-        self._claims: list[dict[str, Any]] = self._load_claims()
-        self._migrate_journal_claims()
+        self._claims: deque[dict[str, Any]] = self._load_claims()
+        self._claims_total: int = len(self._claims_db)
 
         self._watchdog_log: list = []
+        # lookup indexes into the runtime lists, for the resource endpoints
+        self._campaign_index: dict[str, dict[str, Any]] = {}
+        self._campaigns_by_game: dict[str, list[str]] = {}
+        # True while the campaigns list is shared with a snapshot or an event,
+        # and has to be copied before being modified
+        self._campaigns_shared: bool = False
+        # campaign ID -> position in the campaigns list, drop ID -> campaign ID and position
+        self._campaign_positions: dict[str, int] = {}
+        self._drop_index: dict[str, tuple[str, int]] = {}
+        self._channel_index: dict[int, dict[str, Any]] = {}
+        self._progress = ProgressSeries()
+        self._progress_checked: float = 0.0
 
         self._runtime: dict[str, Any] = {
             "state": State.EXIT.name,
@@ -43,75 +147,72 @@ class StateStore:
             "campaigns": [],
             "last_reload": self._isoformat(datetime.now(timezone.utc)),
             "errors": [],
-            "journal": self._load_journal(),
+            "journal": deque(self._journal_log.tail(JOURNAL_LIMIT), maxlen=JOURNAL_LIMIT),
             "pending_switch": None,
             "started_at": self._isoformat(self._started_at),
             "sys_load": "0.00 0.00 0.00",
+            "progress": {"drops": [], "campaigns": []},
         }
         self._add_journal_entry("info", "Service started", "fa-power-off")
 
-    def _load_journal(self) -> list:
-        if not os.path.exists(self._journal_file):
-            return []
+    def _migrate_legacy_files(self):
+        """
+        One-time migration from the old journal and claims files.
+
+        journal.json and claims.json held JSON arrays, newest entry first, and the journal
+        also carried claim entries from before they've been split off into their own file.
+        claims.jsonl held one claim per line, oldest first.
+        """
+        legacy_journal = self._paths.JOURNAL.with_suffix(".json")
+        legacy_claims = self._paths.CLAIMS.with_suffix(".json")
+        legacy_claims_log = self._paths.CLAIMS.with_suffix(".jsonl")
+        journal: list[dict[str, Any]] = []
+        claims: list[dict[str, Any]] = []
         try:
-            with open(self._journal_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            for path, entries in ((legacy_journal, journal), (legacy_claims, claims)):
+                if path.exists():
+                    with open(path, 'rb') as f:
+                        entries.extend(codec.loads(f.read()))
+            if legacy_claims_log.exists():
+                with open(legacy_claims_log, 'rb') as f:
+                    claims.extend(codec.loads(line) for line in f if line.strip())
         except Exception:
-            return []
-
-    def _migrate_journal_claims(self):
-        """Migrate existing claim entries from journal.json into claims.json (one-time)."""
-        if not os.path.exists(self._journal_file):
+            logger.warning("Failed to migrate the journal and claims files", exc_info=True)
             return
-        known_ids = {e.get("drop_id") for e in self._claims if e.get("drop_id")}
+        journal.reverse()
+        if journal and len(self._journal_log) == 0:
+            self._journal_log.extend(journal)
+            self._journal_log.flush()
+        if self._claims_db.created:
+            claims.extend(e for e in journal if e.get("type") == "claim")
+            claims.extend(e for e in self._journal_log if e.get("type") == "claim")
+            # entries without a drop ID aren't deduplicated by the database
+            seen: set[tuple[str, str]] = set()
+            unique: list[dict[str, Any]] = []
+            for entry in claims:
+                key = (entry.get("drop_id") or entry.get("time", ""), entry.get("msg", ""))
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(entry)
+            unique.sort(key=lambda e: e.get("time", ""))
+            count = self._claims_db.extend(unique)
+            if count:
+                logger.info(f"Migrated {count} claims into {self._paths.CLAIMS.name}")
+            self._claims_db.mark_populated()
+        for path in (legacy_journal, legacy_claims, legacy_claims_log):
+            if path.exists():
+                os.remove(path)
+
+    def _load_claims(self) -> deque[dict[str, Any]]:
+        claims: deque[dict[str, Any]] = deque(maxlen=CLAIMS_WINDOW)
         try:
-            with open(self._journal_file, 'r', encoding='utf-8') as f:
-                journal = json.load(f)
+            self._known_claims.update(
+                f"claim:{drop_id}" for drop_id in self._claims_db.drop_ids()
+            )
+            claims.extend(self._claims_db.recent(CLAIMS_WINDOW))
         except Exception:
-            return
-        migrated = 0
-        for entry in reversed(journal):
-            if entry.get("type") != "claim":
-                continue
-            drop_id = entry.get("drop_id")
-            if drop_id and drop_id in known_ids:
-                continue
-            self._claims.append(entry)
-            if drop_id:
-                known_ids.add(drop_id)
-                self._known_claims.add(f"claim:{drop_id}")
-            migrated += 1
-        if migrated:
-            self._claims.sort(key=lambda e: e.get("time", ""), reverse=True)
-            self._save_claims()
-
-    def _load_claims(self) -> list[dict[str, Any]]:
-        if not os.path.exists(self._claims_file):
-            return []
-        try:
-            with open(self._claims_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                for entry in data:
-                    drop_id = entry.get("drop_id")
-                    if drop_id:
-                        self._known_claims.add(f"claim:{drop_id}")
-                return data
-        except Exception:
-            return []
-
-    def _save_claims(self):
-        try:
-            with open(self._claims_file, 'w', encoding='utf-8') as f:
-                json.dump(self._claims, f, ensure_ascii=False, indent=2)
-        except Exception:
-            logger.warning("Failed to save claims file", exc_info=True)
-
-    def _save_journal(self):
-        try:
-            with open(self._journal_file, 'w', encoding='utf-8') as f:
-                json.dump(self._runtime["journal"], f, ensure_ascii=False, indent=2)
-        except Exception:
-            logger.warning("Failed to save journal file", exc_info=True)
+            logger.warning("Failed to load the claims history", exc_info=True)
+        return claims
 
     def _add_journal_entry(self, entry_type: str, msg: str, icon: str = None, **extra):
         entry = {
@@ -121,10 +222,9 @@ class StateStore:
             "icon": icon,
             **extra,
         }
-        journal = self._runtime["journal"]
-        journal.insert(0, entry)
-        self._runtime["journal"] = journal[:100]
-        self._save_journal()
+        self._runtime["journal"].appendleft(entry)
+        self._journal_log.append(entry)
+        self._emit("journal", entry)
 
     def _add_claim_entry(self, msg: str, **extra):
         entry = {
@@ -134,11 +234,33 @@ class StateStore:
             "icon": "fa-gift",
             **extra,
         }
-        self._claims.insert(0, entry)
-        self._save_claims()
+        # NOTE: The caller checks the drop hasn't been recorded yet, see _known_claims,
+        # so the claim can be counted before the database has it
+        self._claims_db.append(entry)
+        self._claims.appendleft(entry)
+        self._claims_total += 1
+        self._emit("claim", {"claim": entry, "total": self._claims_total})
         # Also add to journal for the activity timeline
         self._add_journal_entry("claim", msg, "fa-gift", **extra)
 
+    def _emit(self, event_type: str, data: Any) -> None:
+        # NOTE: the lock has to be held by the caller
+        self._version += 1
+        self._events.append(StateEvent(self._version, event_type, data))
+        for listener in self._listeners:
+            listener()
+
+    def _set_runtime(self, key: str, value: Any) -> bool:
+        # NOTE: values are replaced, never modified in place, as snapshots share them
+        if self._runtime.get(key) == value:
+            return False
+        self._runtime[key] = value
+        return True
+
+    def _update_runtime(self, key: str, value: Any) -> None:
+        if self._set_runtime(key, value):
+            self._emit("runtime", {key: value})
+
     def _settings_payload(self, settings: "Settings") -> dict[str, Any]:
         return {
             "language": settings.language,
@@ -205,10 +327,12 @@ class StateStore:
             "drops": [self._drop_payload(drop) for drop in campaign.drops],
         }
 
+    @metrics.timed(metrics.STATE_STORE_WRITE, "set_state")
     def set_state(self, state: State) -> None:
         with self._lock:
-            self._runtime["state"] = state.name
+            self._update_runtime("state", state.name)
 
+    @metrics.timed(metrics.STATE_STORE_WRITE, "set_watching")
     def set_watching(self, channel: "Channel" | None) -> None:
         with self._lock:
             current_login = channel._login if channel else None
@@ -226,65 +350,186 @@ class StateStore:
                     self._add_journal_entry("info", "Stream stopped / searching...", "fa-pause")
                 self._last_watching_login = current_login
 
-            self._runtime["watching"] = self._channel_payload(channel)
+            self._update_runtime("watching", self._channel_payload(channel))
 
+    @metrics.timed(metrics.STATE_STORE_WRITE, "set_channels")
     def set_channels(self, channels: Iterable["Channel"]) -> None:
         with self._lock:
-            self._runtime["channels"] = [self._channel_payload(ch) for ch in channels]
-
+            old: list[dict[str, Any]] = self._runtime["channels"]
+            new = [self._channel_payload(ch) for ch in channels]
+            if not self._set_runtime("channels", new):
+                return
+            self._channel_index = {ch["id"]: ch for ch in new}
+            if [ch["id"] for ch in old] != [ch["id"] for ch in new]:
+                self._emit("channels", new)
+                return
+            for old_channel, channel in zip(old, new):
+                if old_channel != channel:
+                    self._emit("channel", channel)
+
+    def _check_claims(self, campaign: "DropsCampaign") -> None:
+        # NOTE: the lock has to be held by the caller
+        g_name = campaign.game.name if campaign.game else "?"
+        for d in campaign.drops:
+            if not d.is_claimed:
+                continue
+            claim_key = f"claim:{d.id}"
+            if not self._first_campaign_load and claim_key not in self._known_claims:
+                self._add_claim_entry(
+                    f"Drop claimed: {d.name} ({g_name})",
+                    drop_id=d.id,
+                    drop_name=d.name,
+                    campaign_id=campaign.id,
+                    campaign_name=campaign.name,
+                    game=g_name,
+                )
+            self._known_claims.add(claim_key)
+
+    def _index_campaign(self, position: int, campaign: dict[str, Any]) -> None:
+        # NOTE: the lock has to be held by the caller
+        campaign_id: str = campaign["id"]
+        old = self._campaign_index.get(campaign_id)
+        game_key: str = campaign["game"].lower()
+        old_key: str | None = old["game"].lower() if old is not None else None
+        self._campaign_index[campaign_id] = campaign
+        self._campaign_positions[campaign_id] = position
+        if old_key != game_key:
+            if old_key is not None:
+                old_ids = self._campaigns_by_game[old_key]
+                old_ids.remove(campaign_id)
+                if not old_ids:
+                    del self._campaigns_by_game[old_key]
+            ids = self._campaigns_by_game.setdefault(game_key, [])
+            ids.append(campaign_id)
+            # keep the campaigns list order
+            ids.sort(key=self._campaign_positions.__getitem__)
+        if old is not None:
+            # drops can leave a campaign, so their old positions can't be left behind
+            for drop in old["drops"]:
+                if self._drop_index.get(drop["id"], (None,))[0] == campaign_id:
+                    del self._drop_index[drop["id"]]
+        for d_index, drop in enumerate(campaign["drops"]):
+            self._drop_index[drop["id"]] = (campaign_id, d_index)
+
+    def _reindex_campaigns(self, campaigns: list[dict[str, Any]]) -> None:
+        # NOTE: the lock has to be held by the caller
+        self._campaign_index = {}
+        self._campaign_positions = {}
+        self._drop_index = {}
+        self._campaigns_by_game = {}
+        for position, campaign in enumerate(campaigns):
+            self._index_campaign(position, campaign)
+
+    @metrics.timed(metrics.STATE_STORE_WRITE, "set_campaigns")
     def set_campaigns(self, campaigns: Iterable["DropsCampaign"]) -> None:
         with self._lock:
-            payload_list = []
+            old_list: list[dict[str, Any]] = self._runtime["campaigns"]
+            payload_list: list[dict[str, Any]] = []
+            changed: list[tuple[int, dict[str, Any]]] = []
             for c in campaigns:
                 try:
-                    payload_list.append(self._campaign_payload(c))
-
-                    if not self._first_campaign_load:
-                        g_name = c.game.name if c.game else "?"
-                        for d in c.drops:
-                            claim_key = f"claim:{d.id}"
-                            if d.is_claimed and claim_key not in self._known_claims:
-                                msg = f"Drop claimed: {d.name} ({g_name})"
-                                self._add_claim_entry(msg, drop_id=d.id)
-                                self._known_claims.add(claim_key)
-                            elif d.is_claimed:
-                                self._known_claims.add(claim_key)
-                    else:
-                        for d in c.drops:
-                            if d.is_claimed:
-                                self._known_claims.add(f"claim:{d.id}")
+                    payload = self._campaign_payload(c)
+                    old = self._campaign_index.get(payload["id"])
+                    if old is not None and old == payload:
+                        # unchanged - keep the old payload, already shared with the snapshots
+                        payload_list.append(old)
+                        continue
+                    # a drop can only have been claimed since, if the payload has changed
+                    self._check_claims(c)
                 except Exception:
                     logger.warning("Failed to build campaign payload", exc_info=True)
                     continue
+                changed.append((len(payload_list), payload))
+                payload_list.append(payload)
 
             self._first_campaign_load = False
+            if [c["id"] for c in old_list] != [c["id"] for c in payload_list]:
+                self._runtime["campaigns"] = payload_list
+                self._reindex_campaigns(payload_list)
+                self._campaigns_shared = True
+                self._emit("campaigns", payload_list)
+                return
+            if not changed:
+                return
             self._runtime["campaigns"] = payload_list
+            self._campaigns_shared = False
+            for position, payload in changed:
+                self._index_campaign(position, payload)
+                self._emit("campaign", payload)
 
-    def update_drop_progress(self, drop_id: str, current_minutes: int, required_minutes: int) -> None:
+    @metrics.timed(metrics.STATE_STORE_WRITE, "update_drop_progress")
+    def update_drop_progress(
+        self,
+        drop_id: str,
+        current_minutes: int,
+        required_minutes: int,
+        *,
+        channel_id: int | None = None,
+        source: str = "websocket",
+    ) -> None:
         with self._lock:
-            for campaign in self._runtime.get("campaigns", []):
-                for drop in campaign.get("drops", []):
-                    if drop["id"] == drop_id:
-                        drop["current_minutes"] = current_minutes
-                        drop["required_minutes"] = required_minutes
-                        drop["progress"] = current_minutes / required_minutes if required_minutes > 0 else 0.0
-                        return
-
+            located = self._drop_index.get(drop_id)
+            if located is None:
+                return
+            campaign_id, d_index = located
+            c_index = self._campaign_positions[campaign_id]
+            campaigns: list[dict[str, Any]] = self._runtime["campaigns"]
+            campaign = campaigns[c_index]
+            if (
+                d_index >= len(campaign["drops"])
+                or campaign["drops"][d_index]["id"] != drop_id
+            ):
+                # the index is out of date, don't patch whatever drop sits there now
+                logger.debug(f"Drop {drop_id} isn't where the index says it is")
+                return
+            self._progress.record(
+                drop_id,
+                current_minutes,
+                required_minutes,
+                campaign_id=campaign_id,
+                channel_id=channel_id,
+                source=source,
+            )
+            old_drop: dict[str, Any] = campaign["drops"][d_index]
+            drop = {
+                **old_drop,
+                "current_minutes": current_minutes,
+                "required_minutes": required_minutes,
+                "progress": current_minutes / required_minutes if required_minutes > 0 else 0.0,
+            }
+            if drop != old_drop:
+                # copy-on-write, down from the campaign
+                drops = list(campaign["drops"])
+                drops[d_index] = drop
+                campaign = {**campaign, "drops": drops}
+                if self._campaigns_shared:
+                    # the list is only copied once per snapshot, not once per progress update
+                    campaigns = self._runtime["campaigns"] = list(campaigns)
+                    self._campaigns_shared = False
+                campaigns[c_index] = campaign
+                self._campaign_index[campaign_id] = campaign
+                # only the drop goes out, the progress analytics follow with the periodic refresh
+                self._emit("drop", {"campaign_id": campaign_id, "drop": drop})
+            self._refresh_progress()
+
+    @metrics.timed(metrics.STATE_STORE_WRITE, "set_last_reload")
     def set_last_reload(self, when: datetime | None = None) -> None:
         with self._lock:
-            self._runtime["last_reload"] = self._isoformat(when or datetime.now(timezone.utc))
+            self._update_runtime("last_reload", self._isoformat(when or datetime.now(timezone.utc)))
 
+    @metrics.timed(metrics.STATE_STORE_WRITE, "set_pending_switch")
     def set_pending_switch(self, requested: Any) -> None:
         with self._lock:
-            self._runtime["pending_switch"] = requested
+            self._update_runtime("pending_switch", requested)
 
+    @metrics.timed(metrics.STATE_STORE_WRITE, "record_error")
     def record_error(self, message: str) -> None:
         with self._lock:
             self._add_journal_entry("error", message, "fa-exclamation-triangle")
             errors: list[str] = self._runtime["errors"]
-            errors.append(message)
-            self._runtime["errors"] = errors[-10:]
+            self._update_runtime("errors", [*errors, message][-10:])
 
+    @metrics.timed(metrics.STATE_STORE_WRITE, "record_watchdog")
     def record_watchdog(
         self,
         *,
@@ -305,37 +550,217 @@ class StateStore:
             }
             self._watchdog_log.insert(0, entry)
             self._watchdog_log = self._watchdog_log[:20]
+            self._emit("watchdog", entry)
 
     def get_watchdog_log(self) -> list:
         with self._lock:
             return list(self._watchdog_log)
 
+    @metrics.timed(metrics.STATE_STORE_WRITE, "record_restart_attempt")
     def record_restart_attempt(self, message: str) -> None:
         with self._lock:
             self._add_journal_entry("restart", message, "fa-redo")
 
-    def get_snapshot(self) -> dict[str, Any]:
+    def refresh_load(self) -> None:
         with self._lock:
-            if "started_at" not in self._runtime:
-                self._runtime["started_at"] = self._isoformat(self._started_at)
-            try:
-                if hasattr(os, "getloadavg"):
-                    av = os.getloadavg()
-                    self._runtime["sys_load"] = f"{av[0]:.2f} {av[1]:.2f} {av[2]:.2f}"
-                else:
-                    self._runtime["sys_load"] = "Win/NA"
-            except Exception:
-                self._runtime["sys_load"] = "-"
+            self._refresh_load()
 
-            snapshot = deepcopy({"settings": self._settings, "runtime": self._runtime})
-            snapshot["runtime"]["claims"] = deepcopy(self._claims)
+    def _refresh_load(self) -> None:
+        # NOTE: the lock has to be held by the caller
+        now = monotonic()
+        if now - self._load_checked < LOAD_INTERVAL:
+            return
+        self._load_checked = now
+        try:
+            if hasattr(os, "getloadavg"):
+                av = os.getloadavg()
+                sys_load = f"{av[0]:.2f} {av[1]:.2f} {av[2]:.2f}"
+            else:
+                sys_load = "Win/NA"
+        except Exception:
+            sys_load = "-"
+        self._update_runtime("sys_load", sys_load)
+
+    def _progress_payload(self) -> dict[str, Any]:
+        # NOTE: the lock has to be held by the caller
+        drops = self._progress.summaries(mining=self._runtime["watching"] is not None)
+        by_campaign: dict[str, list[dict[str, Any]]] = {}
+        for summary in drops:
+            if summary["campaign_id"] is not None:
+                by_campaign.setdefault(summary["campaign_id"], []).append(summary)
+        campaigns: list[dict[str, Any]] = []
+        for campaign_id, summaries in by_campaign.items():
+            campaign = self._campaign_index.get(campaign_id)
+            if campaign is not None:
+                campaigns.append(
+                    self._progress.campaign_summary(campaign_id, campaign["drops"], summaries)
+                )
+        return {"drops": drops, "campaigns": campaigns}
+
+    def _refresh_progress(self, *, force: bool = False) -> None:
+        # NOTE: the lock has to be held by the caller
+        # the analytics change with time alone, so they're refreshed periodically too
+        now = monotonic()
+        if not force and now - self._progress_checked < PROGRESS_INTERVAL:
+            return
+        self._progress_checked = now
+        self._update_runtime("progress", self._progress_payload())
+
+    def get_progress(self) -> dict[str, Any]:
+        """
+        Returns the progress rate, status and ETA of the recently mined drops and campaigns.
+        """
+        with self._lock:
+            return self._progress_payload()
+
+    def get_drop_progress(self, drop_id: str) -> dict[str, Any] | None:
+        """
+        Returns the progress analytics of a drop, together with its progress history.
+        """
+        with self._lock:
+            summary = self._progress.summary(
+                drop_id, mining=self._runtime["watching"] is not None
+            )
+            if summary is None:
+                return None
+            return {**summary, "samples": self._progress.samples(drop_id)}
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            return self._version
+
+    def get_versioned_snapshot(self) -> Snapshot:
+        """
+        Returns the snapshot of the current state version, building it only if the state
+        has changed since the last call.
+        """
+        with self._lock:
+            self._refresh_load()
+            self._refresh_progress()
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == self._version:
+                return snapshot
+            # all of the values are replaced on change instead of being modified,
+            # so a shallow copy is enough to freeze them
+            runtime = dict(self._runtime)
+            self._campaigns_shared = True
+            runtime["journal"] = list(self._runtime["journal"])
+            # only the most recent claims, the rest is available through query_claims
+            runtime["claims"] = list(self._claims)
+            runtime["claims_total"] = self._claims_total
+            snapshot = self._snapshot = Snapshot(
+                self._version,
+                f"{self.run_id}-{self._version}",
+                {"settings": self._settings, "runtime": runtime},
+            )
             return snapshot
 
-    def clear_journal(self) -> None:
+    def get_snapshot(self) -> dict[str, Any]:
+        """
+        Returns the current state. The returned data is shared, and must not be modified.
+        """
+        return self.get_versioned_snapshot().data
+
+    def get_campaigns(self, game: str | None = None) -> list[dict[str, Any]]:
+        """
+        Returns the campaigns, optionally only the ones of a specific game (case-insensitive).
+        The returned data is shared, and must not be modified.
+        """
+        with self._lock:
+            if game is None:
+                return list(self._runtime["campaigns"])
+            index = self._campaign_index
+            return [index[cid] for cid in self._campaigns_by_game.get(game.lower(), [])]
+
+    def get_campaign(self, campaign_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            return self._campaign_index.get(campaign_id)
+
+    def get_channels(self, status: str | None = None) -> list[dict[str, Any]]:
+        """
+        Returns the channels, optionally only the ones with a specific status.
+        The returned data is shared, and must not be modified.
+        """
+        with self._lock:
+            channels: list[dict[str, Any]] = self._runtime["channels"]
+        if status is None:
+            return list(channels)
+        return [ch for ch in channels if ch["status"] == status]
+
+    def get_channel(self, channel_id: int) -> dict[str, Any] | None:
+        with self._lock:
+            return self._channel_index.get(channel_id)
+
+    def get_events(self, since: int) -> list[StateEvent] | None:
+        """
+        Returns the events that came after the `since` state version, oldest first.
+        Returns None if some of them aren't available anymore, or the version is unknown,
+        in which case the client has to start over from a full snapshot.
+        """
+        with self._lock:
+            if since > self._version:
+                return None
+            missing = self._version - since
+            if missing > len(self._events):
+                return None
+            return list(self._events)[len(self._events) - missing:]
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """
+        Registers a callable, called after every state change, with the lock held.
+        It can be called from any thread, and must not call back into the state store.
+        """
         with self._lock:
-            self._runtime["journal"] = []
-            self._save_journal()
+            self._listeners.append(listener)
 
+    def remove_listener(self, listener: Callable[[], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def get_journal_page(
+        self, before: int | None = None, limit: int = 50
+    ) -> tuple[list[dict[str, Any]], int | None]:
+        """
+        Pages through the journal history, newest first. See RecordLog.page.
+        """
+        return self._journal_log.page(before, limit)
+
+    def query_claims(
+        self, before: int | None = None, limit: int = 50, **filters: Any
+    ) -> tuple[list[dict[str, Any]], int | None]:
+        """
+        Queries the claims history, newest first. See ClaimsStore.query.
+        Blocks on the database, so it should be run off of the event loop.
+        """
+        return self._claims_db.query(before=before, limit=limit, **filters)
+
+    def get_claim_stats(self, group: str = "game") -> list[dict[str, Any]]:
+        """
+        Per-game or per-campaign claim counts. See ClaimsStore.aggregate.
+        Blocks on the database, so it should be run off of the event loop.
+        """
+        return self._claims_db.aggregate(group)
+
+    @metrics.timed(metrics.STATE_STORE_WRITE, "clear_journal")
+    def clear_journal(self) -> None:
+        with self._lock:
+            self._runtime["journal"].clear()
+            self._journal_log.clear()
+            self._emit("journal_cleared", {})
+
+    def close(self) -> None:
+        """
+        Writes out any pending journal entries, and closes the claims database.
+        """
+        self._journal_log.close()
+        self._claims_db.close()
+
+    @metrics.timed(metrics.STATE_STORE_WRITE, "update_settings")
     def update_settings(self, settings: "Settings") -> None:
         with self._lock:
-            self._settings = self._settings_payload(settings)
\ No newline at end of file
+            payload = self._settings_payload(settings)
+            if payload != self._settings:
+                self._settings = payload
+                self._emit("settings", payload)
\ No newline at end of file
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
+
+SELF_PATH = str(Path(__file__).resolve().parent.parent)
+if SELF_PATH not in sys.path:
+    sys.path.insert(0, SELF_PATH)
+
+from constants import AccountPaths, PriorityMode  # noqa: E402
+from state_store import StateStore  # noqa: E402
+
+
+def _settings() -> SimpleNamespace:
+    return SimpleNamespace(
+        language="English",
+        proxy="",
+        priority=[],
+        exclude=set(),
+        priority_mode=PriorityMode.PRIORITY_ONLY,
+        available_drops_check=False,
+        enable_badges_emotes=False,
+        connection_quality=1,
+        tray_notifications=False,
+        autostart_tray=False,
+    )
+
+
+def _drop(drop_id: str, current_minutes: int = 0) -> SimpleNamespace:
+    now = datetime.now(timezone.utc)
+    return SimpleNamespace(
+        id=drop_id,
+        name=drop_id,
+        progress=current_minutes / 60,
+        is_claimed=False,
+        can_claim=False,
+        current_minutes=current_minutes,
+        required_minutes=60,
+        starts_at=now - timedelta(days=1),
+        ends_at=now + timedelta(days=1),
+    )
+
+
+def _campaign(drops: list[SimpleNamespace]) -> SimpleNamespace:
+    now = datetime.now(timezone.utc)
+    return SimpleNamespace(
+        id="campaign",
+        name="Campaign",
+        game=SimpleNamespace(name="Game"),
+        eligible=True,
+        active=True,
+        upcoming=False,
+        progress=0.0,
+        claimed_drops=0,
+        total_drops=len(drops),
+        starts_at=now - timedelta(days=1),
+        ends_at=now + timedelta(days=1),
+        drops=drops,
+    )
+
+
+def test_progress_of_a_removed_drop_is_ignored(tmp_path: Path):
+    store = StateStore(_settings(), paths=AccountPaths(tmp_path))  # type: ignore[arg-type]
+    try:
+        store.set_campaigns([_campaign([_drop("a"), _drop("b")])])
+        store.set_campaigns([_campaign([_drop("b")])])
+        version = store.version
+        store.update_drop_progress("a", 30, 60)
+        assert store.version == version
+        (drop,) = store.get_campaign("campaign")["drops"]
+        assert drop["id"] == "b"
+        assert drop["current_minutes"] == 0
+        # the remaining drop is still found at its new position
+        store.update_drop_progress("b", 30, 60)
+        (drop,) = store.get_campaign("campaign")["drops"]
+        assert drop["current_minutes"] == 30
+    finally:
+        store.close()
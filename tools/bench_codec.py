@@ -0,0 +1,196 @@
+"""
+Micro-benchmark of the JSON codec backends over GQL responses and pubsub frames.
+
+Captured payloads can be passed in as files: `.json` files hold a single payload,
+while `.jsonl` files hold one payload per line (pubsub frames are recognized by their "type" key).
+Without any files, payloads are generated using the stand-in server scenario data.
+
+Usage:
+    python tools/bench_codec.py
+    python tools/bench_codec.py captured/*.jsonl --scenario tools/scenarios/load.json -n 2000
+"""
+from __future__ import annotations
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from timeit import Timer
+from time import time
+from typing import Callable
+
+SELF_PATH = str(Path(__file__).resolve().parent.parent)
+if SELF_PATH not in sys.path:
+    sys.path.insert(0, SELF_PATH)
+
+import codec  # noqa: E402
+import schemas  # noqa: E402
+from constants import GQL_OPERATIONS, JsonType  # noqa: E402
+from stand_in_server import StandInServer, load_scenario  # noqa: E402
+
+
+def _pubsub_frame(topic: str, message: JsonType) -> str:
+    return json.dumps(
+        {"type": "MESSAGE", "data": {"topic": topic, "message": json.dumps(message)}}
+    )
+
+
+def synthetic_payloads(scenario_path: Path | None) -> tuple[list[str], list[str]]:
+    """
+    Returns a list of encoded GQL responses and a list of encoded pubsub frames.
+    """
+    server = StandInServer(load_scenario(scenario_path))
+    world = server.world
+    game = world.games[0]
+    channel = world.channels_by_game[int(game["id"])][0]
+    campaign = next(iter(world.campaigns.values()))
+    variables: dict[str, JsonType] = {
+        "Inventory": {},
+        "Campaigns": {},
+        "CampaignDetails": {"dropID": campaign["id"]},
+        "GameDirectory": {"slug": game["slug"], "limit": 30},
+        "GetStreamInfo": {"channel": channel["login"]},
+        "CurrentDrop": {"channelID": str(channel["id"])},
+    }
+    gql = [
+        json.dumps(
+            server._gql_single(
+                {"operationName": GQL_OPERATIONS[key]["operationName"], "variables": value}
+            )
+        )
+        for key, value in variables.items()
+    ]
+    # credit some progress so the drop events aren't empty
+    drop_events = world.watch(channel["id"])
+    now = time()
+    pubsub = [
+        _pubsub_frame(
+            f"video-playback-by-id.{channel['id']}",
+            {"type": "viewcount", "server_time": now, "viewers": channel["viewers"]},
+        ),
+        _pubsub_frame(
+            f"broadcast-settings-update.{channel['id']}",
+            {
+                "channel_id": str(channel["id"]),
+                "type": "broadcast_settings_update",
+                "channel": channel["login"],
+                "old_status": channel["title"],
+                "status": channel["title"],
+                "old_game": game["name"],
+                "game": game["name"],
+                "old_game_id": int(game["id"]),
+                "game_id": int(game["id"]),
+            },
+        ),
+        *(
+            _pubsub_frame(f"user-drop-events.{world.user_id}", event)
+            for event in drop_events
+        ),
+        '{"type":"PONG"}',
+        '{"type":"RESPONSE","nonce":"abcdefghijklmnopqrstuvwxyz012345","error":""}',
+    ]
+    return gql, pubsub
+
+
+def captured_payloads(paths: list[Path]) -> tuple[list[str], list[str]]:
+    gql: list[str] = []
+    pubsub: list[str] = []
+    for path in paths:
+        text = path.read_text(encoding="utf8")
+        lines = text.splitlines() if path.suffix == ".jsonl" else [text]
+        for line in lines:
+            if not line.strip():
+                continue
+            payload = json.loads(line)
+            if isinstance(payload, dict) and "type" in payload:
+                pubsub.append(line)
+            else:
+                gql.append(line)
+    return gql, pubsub
+
+
+# topic prefix -> schema, mirroring the topics registered in twitch.py
+TOPIC_SCHEMAS: dict[str, type] = {
+    "video-playback-by-id": schemas.StreamState,
+    "broadcast-settings-update": schemas.StreamUpdate,
+    "user-drop-events": schemas.DropEvent,
+    "onsite-notifications": schemas.NotificationEvent,
+}
+
+
+def _untyped_pubsub(backend: codec.JSONBackend, frame: str) -> JsonType:
+    # decode the frame, then the body it carries
+    message = backend.loads(frame)
+    if message["type"] == "MESSAGE":
+        return backend.loads(message["data"]["message"])
+    return message
+
+
+def _typed_pubsub(frame: str) -> object:
+    # what the websocket does
+    message = schemas.decode(frame, schemas.PubsubFrame)
+    if message.data is not None:
+        schema = TOPIC_SCHEMAS.get(message.data.topic.rpartition('.')[0])
+        if schema is None:
+            return codec.loads(message.data.message)
+        return schemas.decode(message.data.message, schema)
+    return message
+
+
+def bench(backend: codec.JSONBackend, gql: list[str], pubsub: list[str], number: int) -> None:
+    decoded = [backend.loads(payload) for payload in gql]
+    cases = {
+        "gql loads": lambda: [backend.loads(p) for p in gql],
+        "gql dumps": lambda: [backend.dumps(d) for d in decoded],
+        "gql dumps sorted+indent": lambda: [
+            backend.dumps(d, sort_keys=True, indent=True) for d in decoded
+        ],
+        "pubsub loads": lambda: [_untyped_pubsub(backend, p) for p in pubsub],
+    }
+    _run(cases, gql, pubsub, number)
+
+
+def bench_schemas(gql: list[str], pubsub: list[str], number: int) -> None:
+    cases = {
+        "gql decode StreamInfo": lambda: [
+            schemas.decode(p, schemas.StreamInfoResponse) for p in gql
+        ],
+        "pubsub decode typed": lambda: [_typed_pubsub(p) for p in pubsub],
+    }
+    _run(cases, gql, pubsub, number)
+
+
+def _run(cases: dict[str, Callable[[], object]], gql: list[str], pubsub: list[str], number: int):
+    for name, func in cases.items():
+        if not (gql if name.startswith("gql") else pubsub):
+            continue
+        best = min(Timer(func).repeat(repeat=5, number=number))
+        count = len(gql) if name.startswith("gql") else len(pubsub)
+        per_item = best / (number * count) * 1e6
+        print(f"  {name:<26} {per_item:>9.2f} us/payload")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("payloads", type=Path, nargs="*", help="Captured .json/.jsonl files")
+    parser.add_argument("--scenario", type=Path, help="Scenario used for synthetic payloads")
+    parser.add_argument("-n", dest="number", type=int, default=500)
+    args = parser.parse_args()
+    if args.payloads:
+        gql, pubsub = captured_payloads(args.payloads)
+    else:
+        gql, pubsub = synthetic_payloads(args.scenario)
+    total = sum(map(len, gql)) + sum(map(len, pubsub))
+    print(f"{len(gql)} GQL payloads, {len(pubsub)} pubsub frames, {total} bytes total")
+    print(f"selected backend: {codec.backend.name}")
+    for name in codec.available_backends():
+        print(f"{name}:")
+        bench(codec.get_backend(name), gql, pubsub, args.number)
+    print(f"schemas ({'msgspec' if schemas.msgspec is not None else 'fallback'}):")
+    # only the GetStreamInfo responses fit the typed GQL case
+    stream_info = [p for p in gql if '"broadcastSettings"' in p]
+    bench_schemas(stream_info, pubsub, args.number)
+
+
+if __name__ == "__main__":
+    main()
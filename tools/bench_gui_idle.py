@@ -0,0 +1,99 @@
+"""
+Measures the CPU time the GUI polling takes while nothing happens, with the window hidden or shown.
+
+Polls Tk the way the GUI used to, with a fixed 50ms interval, and then the way it does now,
+through GUIManager._poll, reporting the CPU time used and the number of polls made.
+Needs a display, for example: xvfb-run python tools/bench_gui_idle.py
+
+Usage:
+    python tools/bench_gui_idle.py
+    python tools/bench_gui_idle.py --duration 30 --state normal
+"""
+from __future__ import annotations
+
+import sys
+import asyncio
+import argparse
+import tkinter as tk
+from pathlib import Path
+from types import SimpleNamespace
+from time import perf_counter, process_time
+
+SELF_PATH = str(Path(__file__).resolve().parent.parent)
+if SELF_PATH not in sys.path:
+    sys.path.insert(0, SELF_PATH)
+
+import metrics  # noqa: E402
+from gui import GUIManager  # noqa: E402
+
+
+async def _fixed(root: tk.Tk, duration: float) -> int:
+    polls = 0
+    end = perf_counter() + duration
+    while perf_counter() < end:
+        root.update()
+        polls += 1
+        await asyncio.sleep(0.05)
+    return polls
+
+
+async def _adaptive(root: tk.Tk, duration: float) -> int:
+    # only the attributes _poll uses
+    manager = SimpleNamespace(
+        _root=root,
+        _poll_wakeup=asyncio.Event(),
+        _window_visible=False,
+        _last_input=0.0,
+        _poll_task=None,
+    )
+    before = _polls()
+    task = asyncio.create_task(GUIManager._poll(manager))  # type: ignore[arg-type]
+    await asyncio.sleep(duration)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    return int(_polls() - before)
+
+
+def _polls() -> float:
+    return sum(
+        metrics.GUI_POLLS.labels(state).value
+        for state in ("normal", "zoomed", "iconic", "withdrawn")
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per mode")
+    parser.add_argument(
+        "--state",
+        choices=("withdrawn", "iconic", "normal"),
+        default="withdrawn",
+        help="Window state to measure in",
+    )
+    args = parser.parse_args()
+    root = tk.Tk()
+    # some content for Tk to take care of
+    for i in range(50):
+        tk.Label(root, text=f"label {i}").grid(column=i % 5, row=i // 5)
+    if args.state == "withdrawn":
+        root.withdraw()
+    elif args.state == "iconic":
+        root.iconify()
+    root.update()
+    print(f"idle polling, {args.state} window, {args.duration:.0f}s per mode:")
+    for mode, runner in (("fixed 50ms", _fixed), ("adaptive", _adaptive)):
+        start = process_time()
+        polls = asyncio.run(runner(root, args.duration))
+        cpu = process_time() - start
+        print(
+            f"  {mode:<12} {cpu * 1000 / args.duration:7.2f} ms CPU/s   "
+            f"{polls / args.duration:6.1f} polls/s"
+        )
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Measures how long the image cache takes to populate the inventory tab, and the loop lag it causes.
+
+A local server serves distinct PNG images with a simulated network latency, for a fixture of
+campaigns, each with a campaign image and a few drops, with some of the benefit images shared
+between the campaigns. Every campaign is added concurrently, requesting its images the same way
+the inventory tab does - first with an empty cache, then again from the images saved on disk.
+
+Creating the Tk photos needs a display. Without one, the PIL images are requested instead.
+
+Usage:
+    python tools/bench_image_cache.py
+    python tools/bench_image_cache.py --campaigns 200 --latency 80 --downloads 8 --workers 4
+"""
+from __future__ import annotations
+
+import io
+import sys
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from time import perf_counter
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+SELF_PATH = str(Path(__file__).resolve().parent.parent)
+if SELF_PATH not in sys.path:
+    sys.path.insert(0, SELF_PATH)
+
+import aiohttp  # noqa: E402
+from aiohttp import web  # noqa: E402
+from PIL import Image as Image_module  # noqa: E402
+
+import constants  # noqa: E402
+import persistence  # noqa: E402
+
+TICK = 0.001
+DROPS = 3
+BENEFITS = 150
+
+
+def _png(seed: int, size: tuple[int, int]) -> bytes:
+    # noise is random, the seed only tints it, so every image hashes differently
+    noise = Image_module.effect_noise(size, 64).convert("RGB")
+    tint = Image_module.new("RGB", size, (seed * 37 % 256, seed * 91 % 256, seed * 13 % 256))
+    stream = io.BytesIO()
+    Image_module.blend(noise, tint, 0.5).save(stream, format="PNG")
+    return stream.getvalue()
+
+
+def _fixture(base: str, campaigns: int) -> list[tuple[str, list[list[str]]]]:
+    return [
+        (
+            f"{base}/campaign/{i}.png",
+            [[f"{base}/benefit/{(i * DROPS + d) % BENEFITS}.png"] for d in range(DROPS)],
+        )
+        for i in range(campaigns)
+    ]
+
+
+def _app(campaigns: int, latency: float) -> web.Application:
+    images = {f"campaign/{i}.png": _png(i, (285, 380)) for i in range(campaigns)}
+    images.update({f"benefit/{i}.png": _png(i + 1000, (120, 120)) for i in range(BENEFITS)})
+    requests: list[str] = []
+
+    async def serve(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        path = request.match_info["path"]
+        requests.append(path)
+        if path not in images:
+            return web.Response(status=404)
+        return web.Response(body=images[path], content_type="image/png")
+
+    app = web.Application()
+    app["requests"] = requests
+    app.router.add_get("/{path:.+}", serve)
+    return app
+
+
+class _Source:
+    # stands in for the Twitch instance, which the cache downloads the images through
+    def __init__(self, session: aiohttp.ClientSession) -> None:
+        self._session = session
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str) -> AsyncIterator[aiohttp.ClientResponse]:
+        async with self._session.request(method, url) as response:
+            yield response
+
+
+async def _ticker(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(perf_counter() - start - TICK)
+
+
+async def _populate(cache: Any, photos: bool, campaign: tuple[str, list[list[str]]]) -> None:
+    # mirrors a campaign card of the inventory tab loading its images
+    get = cache.get if photos else cache.get_image
+    image_url, drops = campaign
+    await get(image_url, (108, 144))
+    for benefits in drops:
+        await asyncio.gather(*(get(url, (80, 80)) for url in benefits))
+
+
+async def _run(args: argparse.Namespace, root: Any) -> None:
+    from cache import ImageCache
+
+    app = _app(args.campaigns, args.latency / 1000)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    fixture = _fixture(f"http://127.0.0.1:{port}", args.campaigns)
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        manager = SimpleNamespace(_root=root, _twitch=_Source(session))
+        for label in ("cold", "warm"):
+            # a new cache instance each time, like a restart of the application
+            cache = ImageCache(
+                manager, downloads=args.downloads, workers=args.workers  # type: ignore[arg-type]
+            )
+            app["requests"].clear()
+            lags: list[float] = []
+            stop = asyncio.Event()
+            ticker = asyncio.create_task(_ticker(lags, stop))
+            start = perf_counter()
+            await asyncio.gather(
+                *(_populate(cache, root is not None, campaign) for campaign in fixture)
+            )
+            elapsed = perf_counter() - start
+            stop.set()
+            await ticker
+            cache.save(force=True)
+            await asyncio.to_thread(persistence.flush)
+            lags.sort()
+            p99 = lags[int(len(lags) * 0.99)] * 1e3
+            print(
+                f"  {label:<5} {elapsed:7.3f} s   {len(app['requests']):4} downloads   "
+                f"loop lag p99 {p99:7.2f} ms   max {lags[-1] * 1e3:7.2f} ms"
+            )
+    await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--campaigns", type=int, default=200, help="Campaigns to add")
+    parser.add_argument("--latency", type=float, default=80.0, help="Latency per image, in ms")
+    parser.add_argument("--downloads", type=int, default=8, help="Concurrent downloads")
+    parser.add_argument("--workers", type=int, default=4, help="Image processing threads")
+    args = parser.parse_args()
+    root = None
+    try:
+        import tkinter
+
+        root = tkinter.Tk()
+        root.withdraw()
+    except Exception:
+        print("no display available, requesting PIL images instead of Tk photos")
+    print(
+        f"{args.campaigns} campaigns, {args.latency:.0f} ms latency, "
+        f"{args.downloads} downloads, {args.workers} workers:"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        constants.set_paths(working_dir=Path(directory))
+        asyncio.run(_run(args, root))
+    persistence.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Measures the event loop lag caused by saving files, writing them directly versus write-behind.
+
+A ticker task measures how late the loop wakes it up, while another task keeps saving
+a settings-sized and a cache-sized JSON file, plus a PNG image, the way the miner does.
+
+Usage:
+    python tools/bench_persistence.py
+    python tools/bench_persistence.py --entries 20000 --duration 10
+"""
+from __future__ import annotations
+
+import sys
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+from functools import partial
+from time import perf_counter
+
+SELF_PATH = str(Path(__file__).resolve().parent.parent)
+if SELF_PATH not in sys.path:
+    sys.path.insert(0, SELF_PATH)
+
+from PIL import Image as Image_module  # noqa: E402
+
+import codec  # noqa: E402
+import persistence  # noqa: E402
+
+TICK = 0.001
+
+
+def _payloads(entries: int) -> tuple[dict[str, object], dict[str, object]]:
+    settings = {f"key{i}": {"value": i, "list": list(range(10))} for i in range(200)}
+    cache = {
+        f"https://static-cdn.jtvnw.net/{i:08x}.png": {
+            "hash": f"{i:016x}.png", "expires": "2026-01-01T00:00:00+00:00"
+        }
+        for i in range(entries)
+    }
+    return settings, cache
+
+
+def _save_direct(path: Path, contents: object) -> None:
+    data = codec.dumps(contents, sort_keys=True, indent=True)
+    with open(path, "wb") as file:
+        file.write(data)
+
+
+def _save_write_behind(path: Path, contents: object) -> None:
+    data = codec.dumps(contents, sort_keys=True, indent=True)
+    persistence.write(path, data)
+
+
+async def _ticker(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(perf_counter() - start - TICK)
+
+
+async def _run(mode: str, directory: Path, entries: int, duration: float) -> list[float]:
+    settings, cache = _payloads(entries)
+    image = Image_module.effect_noise((256, 256), 64).convert("RGB")
+    lags: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    end = perf_counter() + duration
+    i = 0
+    while perf_counter() < end:
+        image_path = directory / f"{mode}{i % 8}.png"
+        if mode == "direct":
+            _save_direct(directory / "settings.json", settings)
+            _save_direct(directory / "cache.json", cache)
+            image.save(image_path)
+        else:
+            _save_write_behind(directory / "settings.json", settings)
+            _save_write_behind(directory / "cache.json", cache)
+            persistence.write(image_path, partial(image.save, format="PNG"))
+        i += 1
+        await asyncio.sleep(0.05)
+    stop.set()
+    await ticker
+    if mode != "direct":
+        persistence.flush()
+    return lags
+
+
+def _report(mode: str, lags: list[float]) -> None:
+    lags = sorted(lags)
+    p50 = lags[len(lags) // 2] * 1e3
+    p99 = lags[int(len(lags) * 0.99)] * 1e3
+    print(f"  {mode:<12} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms   max {lags[-1] * 1e3:7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=5000, help="Cache entries to save")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per mode")
+    args = parser.parse_args()
+    print(f"loop lag over {args.duration}s, {args.entries} cache entries:")
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ("direct", "write-behind"):
+            lags = asyncio.run(_run(mode, Path(directory), args.entries, args.duration))
+            _report(mode, lags)
+    persistence.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Measures the cold start of a headless run: the time it takes to import everything
+`main.py --headless --bind` needs before it starts connecting, in a fresh interpreter each time.
+
+Every run uses `python -X importtime`, reporting the median wall time and import time,
+the modules taking the most time, and whether any of the GUI-only modules got imported.
+
+Usage:
+    python tools/bench_startup.py
+    python tools/bench_startup.py --runs 20 --top 15
+"""
+from __future__ import annotations
+
+import sys
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+from time import perf_counter
+from collections import defaultdict
+
+SELF_PATH = str(Path(__file__).resolve().parent.parent)
+
+# what main.py imports at the top, then the modules it imports lazily for a headless run
+HEADLESS_IMPORTS = """
+import sys
+sys.path.insert(0, {path!r})
+import truststore
+import constants
+import persistence
+from translate import _
+from settings import Settings
+from version import __version__
+from miner_service import MinerService
+from utils import lock_file, resource_path, set_root_icon
+from constants import LOGGING_LEVELS, SELF_PATH, FILE_FORMATTER, AccountPaths
+import twitch
+import headless
+import web_api
+print(",".join(sorted(name for name in {gui_modules!r} if name in sys.modules)))
+"""
+GUI_MODULES = ("gui", "cache", "tkinter", "PIL", "pystray")
+
+
+def _run() -> tuple[float, dict[str, int], str]:
+    code = HEADLESS_IMPORTS.format(path=SELF_PATH, gui_modules=GUI_MODULES)
+    start = perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=SELF_PATH,
+    )
+    elapsed = perf_counter() - start
+    # "import time: self [us] | cumulative | imported package"
+    self_times: dict[str, int] = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|")
+        self_times[name.strip()] = int(self_us)
+    return elapsed, self_times, process.stdout.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Interpreter starts to measure")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    args = parser.parse_args()
+    # the first run compiles whatever bytecode is missing, it's not measured
+    _run()
+    walls: list[float] = []
+    imports: list[float] = []
+    self_times: defaultdict[str, list[int]] = defaultdict(list)
+    gui_imported = ""
+    for _ in range(args.runs):
+        elapsed, times, gui_imported = _run()
+        walls.append(elapsed)
+        imports.append(sum(times.values()) / 1e6)
+        for name, self_us in times.items():
+            self_times[name].append(self_us)
+    print(f"headless startup, median of {args.runs} runs:")
+    print(f"  wall time    {statistics.median(walls) * 1000:8.1f} ms")
+    print(f"  import time  {statistics.median(imports) * 1000:8.1f} ms")
+    print(f"  modules      {len(self_times):8}")
+    print(f"  GUI modules  {gui_imported or 'none'}")
+    print("  slowest modules (self time):")
+    medians = {name: statistics.median(times) for name, times in self_times.items()}
+    for name, self_us in sorted(medians.items(), key=lambda item: item[1], reverse=True)[
+        :args.top
+    ]:
+        print(f"    {self_us / 1000:7.2f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
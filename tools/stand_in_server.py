@@ -0,0 +1,669 @@
+"""
+Local stand-in for the Twitch endpoints used by the miner.
+
+Implements the pubsub protocol (LISTEN/UNLISTEN/PING/RECONNECT), the persisted GQL
+operations the client uses, the channel page used for spade URL extraction,
+and the spade endpoint itself. The served data is generated from a scenario file,
+which makes throughput and latency measurements reproducible without network access.
+
+Usage:
+    python tools/stand_in_server.py tools/scenarios/small.json --port 8765 --prepare data
+    python main.py --headless --data-dir data --config data/settings.json \\
+        --base-url http://127.0.0.1:8765
+
+Live request/message counters are available at `GET /__stats`.
+"""
+from __future__ import annotations
+
+import sys
+import json
+import random
+import asyncio
+import logging
+import argparse
+from time import time
+from pathlib import Path
+from base64 import b64decode
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web, CookieJar, WSMsgType
+from yarl import URL
+
+SELF_PATH = str(Path(__file__).resolve().parent.parent)
+if SELF_PATH not in sys.path:
+    sys.path.insert(0, SELF_PATH)
+
+from settings import Settings  # noqa: E402
+from constants import GQL_OPERATIONS, ClientType, JsonType, PriorityMode  # noqa: E402
+
+
+logger = logging.getLogger("StandIn")
+CLIENT_INFO = ClientType.ANDROID_APP
+# operationName -> GQL_OPERATIONS key
+OPERATIONS: dict[str, str] = {op["operationName"]: key for key, op in GQL_OPERATIONS.items()}
+default_scenario: JsonType = {
+    "seed": 0,
+    "user_id": 123456789,
+    "games": 5,
+    "campaigns_per_game": 2,
+    "drops_per_campaign": 3,
+    "drop_minutes": 60,
+    "channels_per_game": 100,
+    "acl_channels_per_campaign": 0,
+    "online_ratio": 0.8,
+    # minutes credited per spade request
+    "minutes_per_watch": 1,
+    "events": {
+        # all rates are per pubsub connection
+        "viewcount_per_sec": 20.0,
+        "stream_flap_per_sec": 0.05,
+        "broadcast_update_per_sec": 0.05,
+        "reconnect_interval": 0,
+    },
+    "latency_ms": {
+        "gql": 0,
+        "spade": 0,
+        "pubsub": 0,
+    },
+}
+
+
+def _stamp(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def load_scenario(path: Path | None) -> JsonType:
+    scenario = json.loads(json.dumps(default_scenario))
+    if path is not None:
+        with open(path, 'r', encoding="utf8") as file:
+            overrides: JsonType = json.load(file)
+        for key, value in overrides.items():
+            if isinstance(value, dict) and isinstance(scenario.get(key), dict):
+                scenario[key].update(value)
+            else:
+                scenario[key] = value
+    return scenario
+
+
+class World:
+    """
+    Deterministic in-memory model of games, channels, campaigns and drop progress.
+    """
+
+    def __init__(self, scenario: JsonType) -> None:
+        self.scenario = scenario
+        self.user_id: int = int(scenario["user_id"])
+        self.rng = random.Random(scenario["seed"])
+        now = datetime.now(timezone.utc)
+        self.games: list[JsonType] = []
+        self.channels: dict[int, JsonType] = {}
+        self.channels_by_login: dict[str, JsonType] = {}
+        self.channels_by_game: dict[int, list[JsonType]] = {}
+        self.campaigns: dict[str, JsonType] = {}
+        self.drops: dict[str, JsonType] = {}
+        channel_id = 100000
+        for g in range(scenario["games"]):
+            game = {
+                "id": str(1000 + g),
+                "name": f"Game {g}",
+                "displayName": f"Game {g}",
+                "slug": f"game-{g}",
+                "boxArtURL": f"https://static-cdn.jtvnw.net/ttv-boxart/{1000 + g}-285x380.jpg",
+            }
+            self.games.append(game)
+            game_channels: list[JsonType] = []
+            for _ in range(scenario["channels_per_game"]):
+                channel_id += 1
+                channel = {
+                    "id": channel_id,
+                    "login": f"channel_{channel_id}",
+                    "displayName": f"Channel_{channel_id}",
+                    "game": game,
+                    "online": self.rng.random() < scenario["online_ratio"],
+                    "broadcast_id": channel_id * 10,
+                    "viewers": self.rng.randint(1, 50000),
+                    "title": f"Stream {channel_id}",
+                }
+                game_channels.append(channel)
+                self.channels[channel_id] = channel
+                self.channels_by_login[channel["login"]] = channel
+            self.channels_by_game[int(game["id"])] = game_channels
+            for c in range(scenario["campaigns_per_game"]):
+                campaign_id = f"campaign-{g}-{c}"
+                acl = game_channels[:scenario["acl_channels_per_campaign"]]
+                campaign = {
+                    "id": campaign_id,
+                    "name": f"Campaign {g}.{c}",
+                    "game": game,
+                    "status": "ACTIVE",
+                    "startAt": _stamp(now - timedelta(days=1)),
+                    "endAt": _stamp(now + timedelta(days=7)),
+                    "accountLinkURL": "https://www.twitch.tv/",
+                    "self": {"isAccountConnected": True},
+                    "allow": {
+                        "isEnabled": bool(acl),
+                        "channels": [
+                            {"id": str(ch["id"]), "name": ch["login"], "displayName": ch["displayName"]}
+                            for ch in acl
+                        ] or None,
+                    },
+                    "drop_ids": [],
+                }
+                for d in range(scenario["drops_per_campaign"]):
+                    drop_id = f"drop-{g}-{c}-{d}"
+                    self.drops[drop_id] = {
+                        "id": drop_id,
+                        "name": f"Drop {g}.{c}.{d}",
+                        "campaign_id": campaign_id,
+                        "benefit_id": f"benefit-{g}-{c}-{d}",
+                        "required": scenario["drop_minutes"] * (d + 1),
+                        "current": 0,
+                        "instance_id": None,
+                        "claimed": False,
+                        "claimed_at": None,
+                        "startAt": campaign["startAt"],
+                        "endAt": campaign["endAt"],
+                    }
+                    campaign["drop_ids"].append(drop_id)
+                self.campaigns[campaign_id] = campaign
+
+    # Payload builders
+
+    def _drop_payload(self, drop: JsonType, *, with_self: bool) -> JsonType:
+        payload: JsonType = {
+            "id": drop["id"],
+            "name": drop["name"],
+            "startAt": drop["startAt"],
+            "endAt": drop["endAt"],
+            "requiredMinutesWatched": drop["required"],
+            "preconditionDrops": None,
+            "benefitEdges": [
+                {
+                    "benefit": {
+                        "id": drop["benefit_id"],
+                        "name": f"Reward {drop['name']}",
+                        "distributionType": "DIRECT_ENTITLEMENT",
+                        "imageAssetURL": f"https://static-cdn.jtvnw.net/{drop['benefit_id']}.png",
+                    }
+                }
+            ],
+        }
+        if with_self:
+            payload["self"] = {
+                "dropInstanceID": drop["instance_id"],
+                "isClaimed": drop["claimed"],
+                "currentMinutesWatched": drop["current"],
+            }
+        return payload
+
+    def campaign_payload(self, campaign: JsonType, *, with_self: bool) -> JsonType:
+        payload = {k: v for k, v in campaign.items() if k != "drop_ids"}
+        payload["timeBasedDrops"] = [
+            self._drop_payload(self.drops[drop_id], with_self=with_self)
+            for drop_id in campaign["drop_ids"]
+        ]
+        return payload
+
+    def stream_payload(self, channel: JsonType) -> JsonType:
+        return {
+            "id": str(channel["id"]),
+            "login": channel["login"],
+            "displayName": channel["displayName"],
+            "stream": {
+                "id": str(channel["broadcast_id"]),
+                "viewersCount": channel["viewers"],
+            } if channel["online"] else None,
+            "broadcastSettings": {
+                "title": channel["title"],
+                "game": channel["game"],
+            },
+        }
+
+    # Drop progress
+
+    def active_drop(self, channel: JsonType) -> JsonType | None:
+        game_id = channel["game"]["id"]
+        for campaign in self.campaigns.values():
+            if campaign["game"]["id"] != game_id:
+                continue
+            if campaign["allow"]["isEnabled"] and not any(
+                int(ch["id"]) == channel["id"] for ch in campaign["allow"]["channels"]
+            ):
+                continue
+            for drop_id in campaign["drop_ids"]:
+                drop = self.drops[drop_id]
+                if not drop["claimed"] and drop["current"] < drop["required"]:
+                    return drop
+        return None
+
+    def watch(self, channel_id: int) -> list[JsonType]:
+        """
+        Credits a watched minute and returns the user drop events it caused.
+        """
+        channel = self.channels.get(channel_id)
+        if channel is None or not channel["online"]:
+            return []
+        drop = self.active_drop(channel)
+        if drop is None:
+            return []
+        drop["current"] = min(drop["required"], drop["current"] + self.scenario["minutes_per_watch"])
+        events: list[JsonType] = [
+            {
+                "type": "drop-progress",
+                "data": {
+                    "drop_id": drop["id"],
+                    "channel_id": str(channel_id),
+                    "current_progress_min": drop["current"],
+                    "required_progress_min": drop["required"],
+                },
+            }
+        ]
+        if drop["current"] >= drop["required"]:
+            drop["instance_id"] = f"{self.user_id}#{drop['campaign_id']}#{drop['id']}"
+            events.append(
+                {
+                    "type": "drop-claim",
+                    "data": {"drop_id": drop["id"], "drop_instance_id": drop["instance_id"]},
+                }
+            )
+        return events
+
+    def claim(self, instance_id: str) -> str:
+        for drop in self.drops.values():
+            if drop["instance_id"] == instance_id:
+                if drop["claimed"]:
+                    return "DROP_INSTANCE_ALREADY_CLAIMED"
+                drop["claimed"] = True
+                drop["claimed_at"] = _stamp(datetime.now(timezone.utc))
+                return "ELIGIBLE_FOR_ALL"
+        return "DROP_INSTANCE_NOT_FOUND"
+
+
+class StandInServer:
+    def __init__(self, scenario: JsonType) -> None:
+        self.world = World(scenario)
+        self.events: JsonType = scenario["events"]
+        self.latency: JsonType = scenario["latency_ms"]
+        self.stats: Counter[str] = Counter()
+        self.started_at = time()
+        # topic -> set of subscribed websockets
+        self.subscriptions: dict[str, set[web.WebSocketResponse]] = {}
+        self.app = web.Application()
+        self.app.add_routes(
+            [
+                web.get("/__stats", self._stats),
+                web.post("/gql.twitch.tv/gql", self._gql),
+                web.get("/pubsub-edge.twitch.tv/v1", self._pubsub),
+                web.get("/id.twitch.tv/oauth2/validate", self._validate),
+                web.post("/spade.twitch.tv/track", self._spade),
+                web.get("/www.twitch.tv/", self._client_page),
+                web.get("/www.twitch.tv/{login}", self._channel_page),
+            ]
+        )
+
+    async def _delay(self, kind: str) -> None:
+        if delay := self.latency.get(kind, 0):
+            await asyncio.sleep(delay / 1000)
+
+    async def _stats(self, _: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "uptime": round(time() - self.started_at, 3),
+                "connections": len({ws for wss in self.subscriptions.values() for ws in wss}),
+                "topics": len(self.subscriptions),
+                "counters": dict(self.stats),
+            }
+        )
+
+    # HTTP endpoints
+
+    async def _validate(self, request: web.Request) -> web.Response:
+        self.stats["validate"] += 1
+        return web.json_response(
+            {
+                "client_id": CLIENT_INFO.CLIENT_ID,
+                "login": "stand_in_user",
+                "user_id": str(self.world.user_id),
+                "scopes": [],
+                "expires_in": 3600,
+            }
+        )
+
+    async def _client_page(self, _: web.Request) -> web.Response:
+        self.stats["client_page"] += 1
+        return web.Response(text="<html></html>", content_type="text/html")
+
+    async def _channel_page(self, request: web.Request) -> web.Response:
+        self.stats["channel_page"] += 1
+        return web.Response(
+            text=(
+                "<html><script>window.__config = "
+                '{"spade_url": "https://spade.twitch.tv/track"};</script></html>'
+            ),
+            content_type="text/html",
+        )
+
+    async def _spade(self, request: web.Request) -> web.Response:
+        self.stats["spade"] += 1
+        await self._delay("spade")
+        form = await request.post()
+        try:
+            events = json.loads(b64decode(str(form["data"])))
+            channel_id = int(events[0]["properties"]["channel_id"])
+        except (KeyError, IndexError, ValueError):
+            return web.Response(status=400)
+        topic = f"user-drop-events.{self.world.user_id}"
+        for event in self.world.watch(channel_id):
+            await self.publish(topic, event)
+        return web.Response(status=204)
+
+    async def _gql(self, request: web.Request) -> web.Response:
+        await self._delay("gql")
+        body: JsonType | list[JsonType] = await request.json()
+        if isinstance(body, list):
+            self.stats["gql_batches"] += 1
+            return web.json_response([self._gql_single(op) for op in body])
+        return web.json_response(self._gql_single(body))
+
+    def _gql_single(self, op: JsonType) -> JsonType:
+        name: str = op.get("operationName", '')
+        key = OPERATIONS.get(name)
+        self.stats[f"gql:{key or name}"] += 1
+        handler = getattr(self, f"_op_{key}", None)
+        if handler is None:
+            return {
+                "errors": [{"message": "PersistedQueryNotFound"}],
+                "extensions": {"operationName": name},
+            }
+        data = handler(op.get("variables") or {})
+        return {"data": data, "extensions": {"operationName": name}}
+
+    # GQL operations
+
+    def _op_Inventory(self, variables: JsonType) -> JsonType:
+        world = self.world
+        in_progress = [
+            world.campaign_payload(campaign, with_self=True)
+            for campaign in world.campaigns.values()
+            if any(world.drops[drop_id]["current"] > 0 for drop_id in campaign["drop_ids"])
+        ]
+        return {
+            "currentUser": {
+                "id": str(world.user_id),
+                "inventory": {
+                    "dropCampaignsInProgress": in_progress,
+                    "gameEventDrops": [
+                        {"id": drop["benefit_id"], "lastAwardedAt": drop["claimed_at"]}
+                        for drop in world.drops.values()
+                        if drop["claimed"]
+                    ],
+                },
+            }
+        }
+
+    def _op_Campaigns(self, variables: JsonType) -> JsonType:
+        return {
+            "currentUser": {
+                "id": str(self.world.user_id),
+                "dropCampaigns": [
+                    {
+                        "id": campaign["id"],
+                        "name": campaign["name"],
+                        "status": campaign["status"],
+                        "game": campaign["game"],
+                        "self": campaign["self"],
+                        "startAt": campaign["startAt"],
+                        "endAt": campaign["endAt"],
+                    }
+                    for campaign in self.world.campaigns.values()
+                ],
+            }
+        }
+
+    def _op_CampaignDetails(self, variables: JsonType) -> JsonType:
+        campaign = self.world.campaigns.get(variables.get("dropID", ''))
+        return {
+            "user": {
+                "id": str(self.world.user_id),
+                "dropCampaign": (
+                    self.world.campaign_payload(campaign, with_self=False) if campaign else None
+                ),
+            }
+        }
+
+    def _op_GameDirectory(self, variables: JsonType) -> JsonType:
+        slug = variables.get("slug")
+        limit = int(variables.get("limit", 30))
+        game = next((g for g in self.world.games if g["slug"] == slug), None)
+        if game is None:
+            return {"game": None}
+        online = [
+            ch for ch in self.world.channels_by_game[int(game["id"])] if ch["online"]
+        ]
+        online.sort(key=lambda ch: ch["viewers"], reverse=True)
+        return {
+            "game": {
+                "id": game["id"],
+                "streams": {
+                    "edges": [
+                        {
+                            "node": {
+                                "id": str(ch["broadcast_id"]),
+                                "title": ch["title"],
+                                "viewersCount": ch["viewers"],
+                                "game": ch["game"],
+                                "broadcaster": {
+                                    "id": str(ch["id"]),
+                                    "login": ch["login"],
+                                    "displayName": ch["displayName"],
+                                },
+                            }
+                        }
+                        for ch in online[:limit]
+                    ]
+                },
+            }
+        }
+
+    def _op_GetStreamInfo(self, variables: JsonType) -> JsonType:
+        channel = self.world.channels_by_login.get(variables.get("channel", ''))
+        return {"user": self.world.stream_payload(channel) if channel else None}
+
+    def _op_AvailableDrops(self, variables: JsonType) -> JsonType:
+        channel_id = int(variables.get("channelID", 0))
+        channel = self.world.channels.get(channel_id)
+        campaigns = []
+        if channel is not None:
+            campaigns = [
+                {"id": c["id"]}
+                for c in self.world.campaigns.values()
+                if c["game"]["id"] == channel["game"]["id"]
+            ]
+        return {"channel": {"id": str(channel_id), "viewerDropCampaigns": campaigns or None}}
+
+    def _op_CurrentDrop(self, variables: JsonType) -> JsonType:
+        channel = self.world.channels.get(int(variables.get("channelID", 0)))
+        drop = self.world.active_drop(channel) if channel is not None else None
+        return {
+            "currentUser": {
+                "id": str(self.world.user_id),
+                "dropCurrentSession": {
+                    "dropID": drop["id"],
+                    "currentMinutesWatched": drop["current"],
+                    "requiredMinutesWatched": drop["required"],
+                } if drop is not None else None,
+            }
+        }
+
+    def _op_ClaimDrop(self, variables: JsonType) -> JsonType:
+        instance_id = variables.get("input", {}).get("dropInstanceID", '')
+        return {"claimDropRewards": {"status": self.world.claim(instance_id)}}
+
+    def _op_NotificationsDelete(self, variables: JsonType) -> JsonType:
+        return {"deleteNotification": {"id": variables.get("input", {}).get("id")}}
+
+    # Pubsub
+
+    async def publish(self, topic: str, message: JsonType) -> None:
+        subscribers = self.subscriptions.get(topic)
+        if not subscribers:
+            return
+        await self._delay("pubsub")
+        payload = json.dumps(
+            {"type": "MESSAGE", "data": {"topic": topic, "message": json.dumps(message)}}
+        )
+        for ws in list(subscribers):
+            if not ws.closed:
+                self.stats["pubsub_messages"] += 1
+                await ws.send_str(payload)
+
+    async def _pubsub(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.stats["pubsub_connections"] += 1
+        topics: set[str] = set()
+        generator = asyncio.create_task(self._generate_events(ws, topics))
+        try:
+            async for msg in ws:
+                if msg.type is not WSMsgType.TEXT:
+                    continue
+                message: JsonType = json.loads(msg.data)
+                msg_type = message.get("type")
+                self.stats[f"pubsub:{msg_type}"] += 1
+                if msg_type == "PING":
+                    await ws.send_str('{"type":"PONG"}')
+                elif msg_type in ("LISTEN", "UNLISTEN"):
+                    for topic in message["data"]["topics"]:
+                        if msg_type == "LISTEN":
+                            topics.add(topic)
+                            self.subscriptions.setdefault(topic, set()).add(ws)
+                        else:
+                            topics.discard(topic)
+                            self._unsubscribe(topic, ws)
+                    await ws.send_str(
+                        json.dumps({"type": "RESPONSE", "nonce": message.get("nonce"), "error": ""})
+                    )
+        finally:
+            generator.cancel()
+            for topic in topics:
+                self._unsubscribe(topic, ws)
+        return ws
+
+    def _unsubscribe(self, topic: str, ws: web.WebSocketResponse) -> None:
+        if (subscribers := self.subscriptions.get(topic)) is not None:
+            subscribers.discard(ws)
+            if not subscribers:
+                del self.subscriptions[topic]
+
+    async def _generate_events(self, ws: web.WebSocketResponse, topics: set[str]) -> None:
+        tick = 0.1
+        rng = random.Random(self.world.scenario["seed"] + id(ws))
+        reconnect_at = time() + (self.events["reconnect_interval"] or float("inf"))
+        budget = Counter[str]()
+        while not ws.closed:
+            await asyncio.sleep(tick)
+            if time() >= reconnect_at:
+                self.stats["pubsub_reconnects"] += 1
+                await ws.send_str('{"type":"RECONNECT"}')
+                return
+            playback = [t for t in topics if t.startswith("video-playback-by-id.")]
+            broadcast = [t for t in topics if t.startswith("broadcast-settings-update.")]
+            for kind in ("viewcount", "stream_flap", "broadcast_update"):
+                budget[kind] += self.events[f"{kind}_per_sec"] * tick
+            while budget["viewcount"] >= 1 and playback:
+                budget["viewcount"] -= 1
+                topic = rng.choice(playback)
+                channel = self.world.channels[int(topic.rpartition('.')[2])]
+                if channel["online"]:
+                    channel["viewers"] = max(0, channel["viewers"] + rng.randint(-50, 50))
+                    await self.publish(
+                        topic,
+                        {"type": "viewcount", "server_time": time(), "viewers": channel["viewers"]},
+                    )
+            while budget["stream_flap"] >= 1 and playback:
+                budget["stream_flap"] -= 1
+                topic = rng.choice(playback)
+                channel = self.world.channels[int(topic.rpartition('.')[2])]
+                channel["online"] = not channel["online"]
+                await self.publish(
+                    topic,
+                    {
+                        "type": "stream-up" if channel["online"] else "stream-down",
+                        "server_time": time(),
+                        "play_delay": 0,
+                    },
+                )
+            while budget["broadcast_update"] >= 1 and broadcast:
+                budget["broadcast_update"] -= 1
+                topic = rng.choice(broadcast)
+                channel = self.world.channels[int(topic.rpartition('.')[2])]
+                old_title = channel["title"]
+                channel["title"] = f"Stream {channel['id']} #{rng.randint(0, 9999)}"
+                await self.publish(
+                    topic,
+                    {
+                        "channel_id": str(channel["id"]),
+                        "type": "broadcast_settings_update",
+                        "channel": channel["login"],
+                        "old_status": old_title,
+                        "status": channel["title"],
+                        "old_game": channel["game"]["name"],
+                        "game": channel["game"]["name"],
+                        "old_game_id": int(channel["game"]["id"]),
+                        "game_id": int(channel["game"]["id"]),
+                    },
+                )
+            # drop budget that couldn't be spent due to lack of topics
+            for kind in budget:
+                budget[kind] = min(budget[kind], 1.0)
+
+
+async def prepare_data_dir(data_dir: Path, user_id: int) -> None:
+    """
+    Writes a cookie jar the client accepts as an already logged-in session,
+    and a settings file that lets every generated game be mined.
+    """
+    data_dir.mkdir(parents=True, exist_ok=True)
+    settings_path = data_dir / "settings.json"
+    if not settings_path.exists():
+        settings = Settings(argparse.Namespace(), settings_path=settings_path)
+        settings.priority_mode = PriorityMode.ENDING_SOONEST
+        settings.save()
+    # NOTE: aiohttp requires a running event loop to create a cookie jar
+    jar = CookieJar()
+    jar.update_cookies(
+        {
+            "auth-token": "stand-in-token",
+            "unique_id": "standindevice000",
+            "persistent": str(user_id),
+        },
+        CLIENT_INFO.CLIENT_URL,
+    )
+    jar.save(data_dir / "cookies.jar")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("scenario", type=Path, nargs="?", help="Path to a scenario JSON file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--prepare", type=Path, metavar="DATA_DIR",
+        help="Write a logged-in cookies.jar and settings.json into DATA_DIR before serving",
+    )
+    parser.add_argument("-v", dest="verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    server = StandInServer(load_scenario(args.scenario))
+    if args.prepare is not None:
+        asyncio.run(prepare_data_dir(args.prepare, server.world.user_id))
+    logger.info(
+        f"Serving {len(server.world.channels)} channels and {len(server.world.campaigns)} "
+        f"campaigns on {URL.build(scheme='http', host=args.host, port=args.port)}"
+    )
+    web.run_app(server.app, host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,229 +3,210 @@ from __future__ import annotations
 from collections import abc
 from typing import Any, TypedDict, TYPE_CHECKING
 
+import constants
+import persistence
 from exceptions import MinerException
-from utils import json_load, json_save
-from constants import IS_PACKAGED, LANG_PATH, DEFAULT_LANG
+from utils import json_encode, json_load
+from constants import IS_PACKAGED, DEFAULT_LANG
 
+# NOTE: The translation structure is only needed for type checking, building
+# all of these TypedDicts at runtime would only slow down the import
 if TYPE_CHECKING:
     from typing_extensions import NotRequired
 
-
-class StatusMessages(TypedDict):
-    terminated: str
-    watching: str
-    goes_online: str
-    goes_offline: str
-    claimed_drop: str
-    no_channel: str
-    no_campaign: str
-
-
-class ChromeMessages(TypedDict):
-    startup: str
-    login_to_complete: str
-    no_token: str
-    closed_window: str
-
-
-class LoginMessages(TypedDict):
-    chrome: ChromeMessages
-    error_code: str
-    unexpected_content: str
-    email_code_required: str
-    twofa_code_required: str
-    incorrect_login_pass: str
-    incorrect_email_code: str
-    incorrect_twofa_code: str
-
-
-class ErrorMessages(TypedDict):
-    captcha: str
-    no_connection: str
-    site_down: str
-
-
-class GUIStatus(TypedDict):
-    name: str
-    idle: str
-    exiting: str
-    terminated: str
-    cleanup: str
-    gathering: str
-    switching: str
-    fetching_inventory: str
-    fetching_campaigns: str
-    adding_campaigns: str
-
-
-class GUITabs(TypedDict):
-    main: str
-    inventory: str
-    settings: str
-    help: str
-
-
-class GUITray(TypedDict):
-    notification_title: str
-    minimize: str
-    show: str
-    quit: str
-
-
-class GUILoginForm(TypedDict):
-    name: str
-    labels: str
-    logging_in: str
-    logged_in: str
-    logged_out: str
-    request: str
-    required: str
-    username: str
-    password: str
-    twofa_code: str
-    button: str
-
-
-class GUIWebsocket(TypedDict):
-    name: str
-    websocket: str
-    initializing: str
-    connected: str
-    disconnected: str
-    connecting: str
-    disconnecting: str
-    reconnecting: str
-
-
-class GUIProgress(TypedDict):
-    name: str
-    drop: str
-    game: str
-    campaign: str
-    remaining: str
-    drop_progress: str
-    campaign_progress: str
-
-
-class GUIChannelHeadings(TypedDict):
-    channel: str
-    status: str
-    game: str
-    viewers: str
-
-
-class GUIChannels(TypedDict):
-    name: str
-    switch: str
-    online: str
-    pending: str
-    offline: str
-    headings: GUIChannelHeadings
-
-
-class GUIInvFilter(TypedDict):
-    name: str
-    show: str
-    not_linked: str
-    upcoming: str
-    expired: str
-    excluded: str
-    finished: str
-    refresh: str
-
-
-class GUIInvStatus(TypedDict):
-    linked: str
-    not_linked: str
-    active: str
-    expired: str
-    upcoming: str
-    claimed: str
-    ready_to_claim: str
-
-
-class GUIInventory(TypedDict):
-    filter: GUIInvFilter
-    status: GUIInvStatus
-    starts: str
-    ends: str
-    allowed_channels: str
-    all_channels: str
-    and_more: str
-    percent_progress: str
-    minutes_progress: str
-
-
-class GUISettingsGeneral(TypedDict):
-    name: str
-    autostart: str
-    tray: str
-    tray_notifications: str
-    dark_mode: str
-    priority_mode: str
-    proxy: str
-
-
-class GUISettingsAdvanced(TypedDict):
-    name: str
-    warning: str
-    warning_text: str
-    enable_badges_emotes: str
-    available_drops_check: str
-
-
-class GUIPriorityModes(TypedDict):
-    priority_only: str
-    ending_soonest: str
-    low_availability: str
-
-
-class GUISettings(TypedDict):
-    general: GUISettingsGeneral
-    advanced: GUISettingsAdvanced
-    priority_modes: GUIPriorityModes
-    game_name: str
-    priority: str
-    exclude: str
-    reload: str
-    reload_text: str
-
-
-class GUIHelpLinks(TypedDict):
-    name: str
-    inventory: str
-    campaigns: str
-
-
-class GUIHelp(TypedDict):
-    links: GUIHelpLinks
-    how_it_works: str
-    how_it_works_text: str
-    getting_started: str
-    getting_started_text: str
-
-
-class GUIMessages(TypedDict):
-    output: str
-    status: GUIStatus
-    tabs: GUITabs
-    tray: GUITray
-    login: GUILoginForm
-    websocket: GUIWebsocket
-    progress: GUIProgress
-    channels: GUIChannels
-    inventory: GUIInventory
-    settings: GUISettings
-    help: GUIHelp
-
-
-class Translation(TypedDict):
-    language_name: NotRequired[str]
-    english_name: str
-    status: StatusMessages
-    login: LoginMessages
-    error: ErrorMessages
-    gui: GUIMessages
+    class StatusMessages(TypedDict):
+        terminated: str
+        watching: str
+        goes_online: str
+        goes_offline: str
+        claimed_drop: str
+        no_channel: str
+        no_campaign: str
+
+    class ChromeMessages(TypedDict):
+        startup: str
+        login_to_complete: str
+        no_token: str
+        closed_window: str
+
+    class LoginMessages(TypedDict):
+        chrome: ChromeMessages
+        error_code: str
+        unexpected_content: str
+        email_code_required: str
+        twofa_code_required: str
+        incorrect_login_pass: str
+        incorrect_email_code: str
+        incorrect_twofa_code: str
+
+    class ErrorMessages(TypedDict):
+        captcha: str
+        no_connection: str
+        site_down: str
+
+    class GUIStatus(TypedDict):
+        name: str
+        idle: str
+        exiting: str
+        terminated: str
+        cleanup: str
+        gathering: str
+        switching: str
+        fetching_inventory: str
+        fetching_campaigns: str
+        adding_campaigns: str
+
+    class GUITabs(TypedDict):
+        main: str
+        inventory: str
+        settings: str
+        help: str
+
+    class GUITray(TypedDict):
+        notification_title: str
+        minimize: str
+        show: str
+        quit: str
+
+    class GUILoginForm(TypedDict):
+        name: str
+        labels: str
+        logging_in: str
+        logged_in: str
+        logged_out: str
+        request: str
+        required: str
+        username: str
+        password: str
+        twofa_code: str
+        button: str
+
+    class GUIWebsocket(TypedDict):
+        name: str
+        websocket: str
+        initializing: str
+        connected: str
+        disconnected: str
+        connecting: str
+        disconnecting: str
+        reconnecting: str
+
+    class GUIProgress(TypedDict):
+        name: str
+        drop: str
+        game: str
+        campaign: str
+        remaining: str
+        drop_progress: str
+        campaign_progress: str
+
+    class GUIChannelHeadings(TypedDict):
+        channel: str
+        status: str
+        game: str
+        viewers: str
+
+    class GUIChannels(TypedDict):
+        name: str
+        switch: str
+        online: str
+        pending: str
+        offline: str
+        headings: GUIChannelHeadings
+
+    class GUIInvFilter(TypedDict):
+        name: str
+        show: str
+        not_linked: str
+        upcoming: str
+        expired: str
+        excluded: str
+        finished: str
+        refresh: str
+
+    class GUIInvStatus(TypedDict):
+        linked: str
+        not_linked: str
+        active: str
+        expired: str
+        upcoming: str
+        claimed: str
+        ready_to_claim: str
+
+    class GUIInventory(TypedDict):
+        filter: GUIInvFilter
+        status: GUIInvStatus
+        starts: str
+        ends: str
+        allowed_channels: str
+        all_channels: str
+        and_more: str
+        percent_progress: str
+        minutes_progress: str
+
+    class GUISettingsGeneral(TypedDict):
+        name: str
+        autostart: str
+        tray: str
+        tray_notifications: str
+        dark_mode: str
+        priority_mode: str
+        proxy: str
+
+    class GUISettingsAdvanced(TypedDict):
+        name: str
+        warning: str
+        warning_text: str
+        enable_badges_emotes: str
+        available_drops_check: str
+
+    class GUIPriorityModes(TypedDict):
+        priority_only: str
+        ending_soonest: str
+        low_availability: str
+
+    class GUISettings(TypedDict):
+        general: GUISettingsGeneral
+        advanced: GUISettingsAdvanced
+        priority_modes: GUIPriorityModes
+        game_name: str
+        priority: str
+        exclude: str
+        reload: str
+        reload_text: str
+
+    class GUIHelpLinks(TypedDict):
+        name: str
+        inventory: str
+        campaigns: str
+
+    class GUIHelp(TypedDict):
+        links: GUIHelpLinks
+        how_it_works: str
+        how_it_works_text: str
+        getting_started: str
+        getting_started_text: str
+
+    class GUIMessages(TypedDict):
+        output: str
+        status: GUIStatus
+        tabs: GUITabs
+        tray: GUITray
+        login: GUILoginForm
+        websocket: GUIWebsocket
+        progress: GUIProgress
+        channels: GUIChannels
+        inventory: GUIInventory
+        settings: GUISettings
+        help: GUIHelp
+
+    class Translation(TypedDict):
+        language_name: NotRequired[str]
+        english_name: str
+        status: StatusMessages
+        login: LoginMessages
+        error: ErrorMessages
+        gui: GUIMessages
 
 
 default_translation: Translation = {
@@ -441,42 +422,55 @@ default_translation: Translation = {
 
 class Translator:
     def __init__(self) -> None:
-        self._langs: list[str] = []
+        # NOTE: Nothing is read or written here, the available languages are looked up
+        # on first use, so that importing this module stays cheap
+        self._langs: list[str] | None = None
         # start with (and always copy) the default translation
         self._translation: Translation = default_translation.copy()
-        # if we're in dev, update the template English.json file
-        if not IS_PACKAGED:
-            default_langpath = LANG_PATH.joinpath(f"{DEFAULT_LANG}.json")
-            json_save(default_langpath, default_translation)
         self._translation["language_name"] = DEFAULT_LANG
+
+    def _load_languages(self) -> list[str]:
+        if self._langs is not None:
+            return self._langs
+        lang_path = constants.LANG_PATH
+        # if we're in dev, update the template English.json file, if it's out of date
+        if not IS_PACKAGED:
+            default_langpath = lang_path.joinpath(f"{DEFAULT_LANG}.json")
+            template = json_encode(default_translation, indent=True)
+            try:
+                current: bytes | None = default_langpath.read_bytes()
+            except OSError:
+                current = None
+            if current != template:
+                persistence.write(default_langpath, template)
         # load available translation names
-        for filepath in LANG_PATH.glob("*.json"):
-            self._langs.append(filepath.stem)
-        self._langs.sort()
-        if DEFAULT_LANG in self._langs:
-            self._langs.remove(DEFAULT_LANG)
-        self._langs.insert(0, DEFAULT_LANG)
+        langs = sorted(filepath.stem for filepath in lang_path.glob("*.json"))
+        if DEFAULT_LANG in langs:
+            langs.remove(DEFAULT_LANG)
+        langs.insert(0, DEFAULT_LANG)
+        self._langs = langs
+        return langs
 
     @property
     def languages(self) -> abc.Iterable[str]:
-        return iter(self._langs)
+        return iter(self._load_languages())
 
     @property
     def current(self) -> str:
         return self._translation["language_name"]
 
     def set_language(self, language: str):
-        if language not in self._langs:
-            raise ValueError("Unrecognized language")
-        elif self._translation["language_name"] == language:
+        if self._translation["language_name"] == language:
             # same language as loaded selected
             return
+        elif language not in self._load_languages():
+            raise ValueError("Unrecognized language")
         elif language == DEFAULT_LANG:
             # default language selected - use the memory value
             self._translation = default_translation.copy()
         else:
             self._translation = json_load(
-                LANG_PATH.joinpath(f"{language}.json"), default_translation
+                constants.LANG_PATH.joinpath(f"{language}.json"), default_translation
             )
             if "language_name" in self._translation:
                 raise ValueError("Translations cannot define 'language_name'")
@@ -5,18 +5,23 @@ import asyncio
 import logging
 import random
 import base64
-from time import time
+from time import perf_counter, time
 from copy import deepcopy
 from itertools import chain
 from functools import partial
 from collections import abc, deque, OrderedDict
 from datetime import datetime, timedelta, timezone
 from contextlib import suppress, asynccontextmanager
-from typing import Any, Literal, Final, NoReturn, overload, cast, TYPE_CHECKING
+from typing import Any, Literal, Final, NoReturn, TypeVar, overload, cast, TYPE_CHECKING
 
 import aiohttp
 from yarl import URL
 
+import codec
+import metrics
+import schemas
+import checkpoint
+import persistence
 from translate import _
 from channel import Channel
 from websocket import WebsocketPool
@@ -36,8 +41,10 @@ from utils import (
     CHARS_HEX_LOWER,
     chunk,
     timestamp,
+    rebase_url,
     create_nonce,
     task_wrapper,
+    Game,
     RateLimiter,
     AwaitableValue,
     ExponentialBackoff,
@@ -45,31 +52,30 @@ from utils import (
 from constants import (
     CALL,
     MAX_INT,
-    DUMP_PATH,
-    COOKIES_PATH,
-    RESPONSES_CACHE,
     MAX_CHANNELS,
     GQL_OPERATIONS,
     WATCH_INTERVAL,
     State,
     ClientType,
     PriorityMode,
+    AccountPaths,
     WebsocketTopic,
 )
+from shared_cache import SharedCache
 from response_cache import ResponseCache
 
 if TYPE_CHECKING:
-    from utils import Game
     from gui import GUIManager, LoginForm
     from headless import HeadlessGUI
     from channel import Stream
     from settings import Settings
     from inventory import TimedDrop
-    from constants import ClientInfo, JsonType, GQLOperation
-    from miner_service import MinerService
+    from constants import ClientInfo, JsonType, GQLOperation, URLType
+    from miner_service import Account
     from state_store import StateStore
 
 
+_S = TypeVar("_S", bound=schemas.GQLResponse)
 logger = logging.getLogger("TwitchDrops")
 gql_logger = logging.getLogger("TwitchDrops.gql")
 
@@ -430,7 +436,7 @@ class _AuthState:
         logger.info(f"Login successful, user ID: {self.user_id}")
         login_form.update(_("gui", "login", "logged_in"), self.user_id)
         jar.update_cookies(cookie, client_info.CLIENT_URL)
-        jar.save(COOKIES_PATH)
+        persistence.write(self._twitch.paths.COOKIES, jar.save)
         self._logged_in.set()
 
     def invalidate(self):
@@ -461,14 +467,23 @@ class Twitch:
         self,
         settings: Settings,
         *,
-        service: "MinerService | None" = None,
+        service: "Account | None" = None,
         state_store: "StateStore | None" = None,
+        paths: AccountPaths | None = None,
+        cache: SharedCache | None = None,
+        connector: aiohttp.BaseConnector | None = None,
     ):
         self.settings: Settings = settings
-        self._service: MinerService | None = service
+        self._service: Account | None = service
+        # the files of this account, see AccountPaths
+        self.paths: AccountPaths = paths or AccountPaths.default()
+        # shared with the other accounts hosted by the same process, if there are any
+        self.shared_cache: SharedCache = cache if cache is not None else SharedCache()
+        self._connector: aiohttp.BaseConnector | None = connector
         self.state_store: StateStore | None = state_store or getattr(service, "_state_store", None)
         # State management
         self._state: State = State.IDLE
+        self._state_since: float = perf_counter()
         self._state_change = asyncio.Event()
         if self.state_store is not None:
             self.state_store.set_state(self._state)
@@ -477,7 +492,7 @@ class Twitch:
         self._drops: dict[str, TimedDrop] = {}
         self._campaigns: dict[str, DropsCampaign] = {}
         self._mnt_triggers: deque[datetime] = deque()
-        self._inventory_cache = ResponseCache(RESPONSES_CACHE)
+        self._inventory_cache = ResponseCache(self.paths.RESPONSES_CACHE)
         self._inventory_refresh_pending: bool = False
         self._inventory_force: bool = False
         self._inventory_deadline: datetime = datetime.now(timezone.utc)
@@ -492,6 +507,8 @@ class Twitch:
         # Client type, session and auth
         self._client_type: ClientInfo = ClientType.ANDROID_APP
         self._session: aiohttp.ClientSession | None = None
+        # NOTE: Only used for offline testing against a stand-in server
+        self._base_url: URL | None = URL(settings.base_url) if settings.base_url else None
         self._auth_state: _AuthState = _AuthState(self)
         # GUI
         if settings.headless:
@@ -507,6 +524,9 @@ class Twitch:
         self.watching_channel: AwaitableValue[Channel] = AwaitableValue()
         self._watching_task: asyncio.Task[None] | None = None
         self._watching_restart = asyncio.Event()
+        # channel ID -> spade URL, kept for as long as the client lives, see Channel.send_watch
+        self.spade_urls: dict[int, URLType] = {}
+        self._checkpoint_saved: float = 0.0
         # Websocket
         self.websocket = WebsocketPool(self)
         # Maintenance task
@@ -519,9 +539,11 @@ class Twitch:
             return session
         # load in cookies
         cookie_jar = aiohttp.CookieJar()
+        # make sure the cookies saved by the previous session are on the disk
+        await asyncio.to_thread(persistence.flush)
         try:
-            if COOKIES_PATH.exists():
-                cookie_jar.load(COOKIES_PATH)
+            if self.paths.COOKIES.exists():
+                cookie_jar.load(self.paths.COOKIES)
         except Exception:
             # if loading in the cookies file ends up in an error, just ignore it
             # clear the jar, just in case
@@ -537,18 +559,26 @@ class Twitch:
             sock_connect=5*connection_quality,
             total=10*connection_quality,
         )
-        # create session, limited to 50 connections at maximum
-        connector = aiohttp.TCPConnector(limit=50)
+        if self._connector is not None:
+            # shared with the other accounts, and closed by whoever has created it
+            connector: aiohttp.BaseConnector = self._connector
+        else:
+            # create session, limited to 50 connections at maximum
+            connector = aiohttp.TCPConnector(limit=50)
         self._session = aiohttp.ClientSession(
             timeout=timeout,
             connector=connector,
+            connector_owner=self._connector is None,
             cookie_jar=cookie_jar,
             headers={"User-Agent": self._client_type.USER_AGENT},
+            json_serialize=codec.dumps_str,
         )
         return self._session
 
     async def shutdown(self) -> None:
         start_time = time()
+        # the next run, or the next process, resumes from here
+        self.save_checkpoint()
         self.stop_watching()
         if self._watching_task is not None:
             self._watching_task.cancel()
@@ -566,7 +596,7 @@ class Twitch:
             for cookie_key, cookie in list(cookie_jar._cookies.items()):
                 if not cookie:
                     del cookie_jar._cookies[cookie_key]
-            cookie_jar.save(COOKIES_PATH)
+            persistence.write(self.paths.COOKIES, cookie_jar.save)
             await self._session.close()
             self._session = None
         self._drops.clear()
@@ -579,12 +609,27 @@ class Twitch:
         # this allows aiohttp to safely close the session
         await asyncio.sleep(start_time + 0.5 - time())
 
+    def endpoint(self, url: URL | str) -> URL | str:
+        """
+        Returns the URL that should actually be requested for the given Twitch URL.
+
+        This is a no-op, unless a base URL override has been set,
+        in which case the request is redirected to the stand-in server.
+        """
+        if self._base_url is None:
+            return url
+        return rebase_url(url, self._base_url)
+
     def wait_until_login(self) -> abc.Coroutine[Any, Any, Literal[True]]:
         return self._auth_state._logged_in.wait()
 
     def change_state(self, state: State) -> None:
         if self._state is not State.EXIT:
             # prevent state changing once we switch to exit state
+            now = perf_counter()
+            metrics.STATE_SECONDS.labels(self._state.name).inc(now - self._state_since)
+            metrics.STATE_TRANSITIONS.labels(state.name).inc()
+            self._state_since = now
             self._state = state
         if self.state_store is not None:
             self.state_store.set_state(self._state)
@@ -649,6 +694,76 @@ class Twitch:
         self.gui.save(force=force)
         self.settings.save(force=force)
 
+    def save_checkpoint(self) -> None:
+        """
+        Saves what's needed to resume watching right away after a restart, see checkpoint.py.
+        """
+        if not self.settings.warm_restart or self.settings.dump or not self.channels:
+            # NOTE: With no channels tracked, there's nothing worth resuming,
+            # and the checkpoint saved earlier is kept instead
+            return
+        if not self._auth_state._hasattrs("user_id"):
+            return
+        watching_channel = self.watching_channel.get_with_default(None)
+        checkpoint.save(
+            self.paths.CHECKPOINT,
+            user_id=self._auth_state.user_id,
+            settings=self.settings,
+            wanted_games=[game.as_json() for game in self.wanted_games],
+            channels=[channel.to_checkpoint() for channel in self.channels.values()],
+            watching=watching_channel.id if watching_channel is not None else None,
+            topics=self.websocket.topics,
+        )
+        self._checkpoint_saved = time()
+
+    async def _resume_from_checkpoint(self, user_id: int) -> None:
+        """
+        Restores the wanted games and the channels from the checkpoint, and resumes watching
+        the channel that was being watched, before the inventory is even fetched.
+
+        The inventory fetch and the channels refresh that follow reconcile all of it
+        with the live data, the same way they do on every refresh.
+        """
+        if not self.settings.warm_restart or self.settings.dump:
+            return
+        # make sure the checkpoint saved by the previous run is on the disk
+        await asyncio.to_thread(persistence.flush)
+        data = checkpoint.load(self.paths.CHECKPOINT, user_id=user_id, settings=self.settings)
+        if data is None:
+            return
+        try:
+            wanted_games: list[Game] = [Game(game_data) for game_data in data["wanted_games"]]
+            restored: list[Channel] = [
+                Channel.from_checkpoint(self, channel_data)
+                for channel_data in data["channels"][:MAX_CHANNELS]
+            ]
+            topics: set[str] = set(data["topics"])
+            watching_id: int | None = data["watching"]
+        except (KeyError, TypeError, ValueError) as exc:
+            logger.warning(f"Failed to resume from the checkpoint: {exc!r}")
+            return
+        self.wanted_games.clear()
+        self.wanted_games.extend(wanted_games)
+        to_add_topics: list[WebsocketTopic] = []
+        for channel in restored:
+            self.channels[channel.id] = channel
+            channel.display(add=True)
+            to_add_topics.extend(
+                topic for topic in self._channel_topics(channel.id) if str(topic) in topics
+            )
+        self.websocket.add_topics(to_add_topics)
+        if self.state_store is not None:
+            self.state_store.set_channels(self.channels.values())
+        watching_channel: Channel | None = (
+            self.channels.get(watching_id) if watching_id is not None else None
+        )
+        if watching_channel is not None and watching_channel.online:
+            self.watch(watching_channel)
+        logger.info(
+            f"Resumed from the checkpoint: {len(restored)} channels, "
+            f"watching: {watching_channel.name if watching_channel is not None else 'none'}"
+        )
+
     def get_priority(self, channel: Channel) -> int:
         """
         Return a priority number for a given channel.
@@ -670,11 +785,22 @@ class Twitch:
             return viewers
         return -1
 
+    def _channel_topics(self, channel_id: int) -> list[WebsocketTopic]:
+        return [
+            WebsocketTopic(
+                "Channel", "StreamState", channel_id, self.process_stream_state,
+                schema=schemas.StreamState,
+            ),
+            WebsocketTopic(
+                "Channel", "StreamUpdate", channel_id, self.process_stream_update,
+                schema=schemas.StreamUpdate,
+            ),
+        ]
+
     async def run(self):
         if self.settings.dump:
-            with open(DUMP_PATH, 'w', encoding="utf8"):
-                # replace the existing file with an empty one
-                pass
+            # replace the existing file with an empty one
+            persistence.write(self.paths.DUMP, b'')
         while True:
             try:
                 await self._run()
@@ -704,11 +830,17 @@ class Twitch:
         self._watching_task = asyncio.create_task(self._watch_loop())
         # Add default topics
         self.websocket.add_topics([
-            WebsocketTopic("User", "Drops", auth_state.user_id, self.process_drops),
             WebsocketTopic(
-                "User", "Notifications", auth_state.user_id, self.process_notifications
+                "User", "Drops", auth_state.user_id, self.process_drops,
+                schema=schemas.DropEvent,
+            ),
+            WebsocketTopic(
+                "User", "Notifications", auth_state.user_id, self.process_notifications,
+                schema=schemas.NotificationEvent,
             ),
         ])
+        # resume watching right away, if the previous run has left a checkpoint
+        await self._resume_from_checkpoint(auth_state.user_id)
         full_cleanup: bool = False
         channels: Final[OrderedDict[int, Channel]] = self.channels
         self.change_state(State.INVENTORY_FETCH)
@@ -879,16 +1011,7 @@ class Twitch:
                 # subscribe to these channel's state updates
                 to_add_topics: list[WebsocketTopic] = []
                 for channel_id in channels:
-                    to_add_topics.append(
-                        WebsocketTopic(
-                            "Channel", "StreamState", channel_id, self.process_stream_state
-                        )
-                    )
-                    to_add_topics.append(
-                        WebsocketTopic(
-                            "Channel", "StreamUpdate", channel_id, self.process_stream_update
-                        )
-                    )
+                    to_add_topics.extend(self._channel_topics(channel_id))
                 self.websocket.add_topics(to_add_topics)
                 # relink watching channel after cleanup,
                 # or stop watching it if it no longer qualifies
@@ -912,6 +1035,7 @@ class Twitch:
                         ):
                             active_drop.display(countdown=False, subone=True)
                         break
+                self.save_checkpoint()
                 self.change_state(State.CHANNEL_SWITCH)
                 del (
                     no_acl,
@@ -950,6 +1074,7 @@ class Twitch:
                 if new_watching is not None:
                     # if we have a better switch target - do so
                     self.watch(new_watching)
+                    self.save_checkpoint()
                     # break the state change chain by clearing the flag
                     self._state_change.clear()
                 elif watching_channel is not None and self.can_watch(watching_channel):
@@ -991,6 +1116,9 @@ class Twitch:
             last_sent: float = time()
             if not succeeded:
                 logger.log(CALL, f"Watch requested failed for channel: {channel.name}")
+            if last_sent - self._checkpoint_saved >= checkpoint.SAVE_INTERVAL:
+                # keeps the last known stream states fresh
+                self.save_checkpoint()
             # wait ~20 seconds for a progress update
             await asyncio.sleep(20)
             if self.gui.progress.minute_almost_done():
@@ -1019,7 +1147,11 @@ class Twitch:
                         gql_drop.update_minutes(drop_data["currentMinutesWatched"])
                         if self.state_store is not None:
                             self.state_store.update_drop_progress(
-                                gql_drop.id, gql_drop.current_minutes, gql_drop.required_minutes
+                                gql_drop.id,
+                                gql_drop.current_minutes,
+                                gql_drop.required_minutes,
+                                channel_id=channel.id,
+                                source="gql",
                             )
                         drop_text: str = (
                             f"{gql_drop.name} ({gql_drop.campaign.game}, "
@@ -1037,6 +1169,14 @@ class Twitch:
                         drop_text = f"Unknown drop ({active_campaign.game})"
                         if (active_drop := active_campaign.first_drop) is not None:
                             active_drop.display()
+                            if self.state_store is not None:
+                                self.state_store.update_drop_progress(
+                                    active_drop.id,
+                                    active_drop.current_minutes,
+                                    active_drop.required_minutes,
+                                    channel_id=channel.id,
+                                    source="estimated",
+                                )
                             drop_text = (
                                 f"{active_drop.name} ({active_drop.campaign.game}, "
                                 f"{active_drop.current_minutes}/{active_drop.required_minutes})"
@@ -1136,8 +1276,8 @@ class Twitch:
         self._watching_restart.set()
 
     @task_wrapper
-    async def process_stream_state(self, channel_id: int, message: JsonType):
-        msg_type = message["type"]
+    async def process_stream_state(self, channel_id: int, message: schemas.StreamState):
+        msg_type = message.type
         channel = self.channels.get(channel_id)
         if channel is None:
             logger.error(f"Stream state change for a non-existing channel: {channel_id}")
@@ -1147,7 +1287,7 @@ class Twitch:
                 # if it's not online for some reason, set it so
                 channel.check_online()
             else:
-                viewers = message["viewers"]
+                viewers = message.viewers
                 channel.viewers = viewers
                 channel.display()
                 # logger.debug(f"{channel.name} viewers: {viewers}")
@@ -1162,7 +1302,7 @@ class Twitch:
             logger.warning(f"Unknown stream state: {msg_type}")
 
     @task_wrapper
-    async def process_stream_update(self, channel_id: int, message: JsonType):
+    async def process_stream_update(self, channel_id: int, message: schemas.StreamUpdate):
         # message = {
         #     "channel_id": "12345678",
         #     "type": "broadcast_settings_update",
@@ -1178,8 +1318,8 @@ class Twitch:
         if channel is None:
             logger.error(f"Broadcast settings update for a non-existing channel: {channel_id}")
             return
-        if message["old_game"] != message["game"]:
-            game_change = f", game changed: {message['old_game']} -> {message['game']}"
+        if message.old_game != message.game:
+            game_change = f", game changed: {message.old_game} -> {message.game}"
         else:
             game_change = ''
         logger.log(CALL, f"Channel update from websocket: {channel.name}{game_change}")
@@ -1250,24 +1390,29 @@ class Twitch:
             self.state_store.set_channels(self.channels.values())
 
     @task_wrapper
-    async def process_drops(self, user_id: int, message: JsonType):
+    async def process_drops(self, user_id: int, message: schemas.DropEvent):
         # Message examples:
         # {"type": "drop-progress", data: {"current_progress_min": 3, "required_progress_min": 10}}
         # {"type": "drop-claim", data: {"drop_instance_id": ...}}
-        msg_type: str = message["type"]
+        msg_type: str = message.type
         if msg_type not in ("drop-progress", "drop-claim"):
             return
-        drop_id: str = message["data"]["drop_id"]
+        data = message.data
+        if data is None or data.drop_id is None:
+            logger.error(f"Received a {msg_type} event without a drop ID")
+            return
+        drop_id: str = data.drop_id
         drop: TimedDrop | None = self._drops.get(drop_id)
         watching_channel: Channel | None = self.watching_channel.get_with_default(None)
         if msg_type == "drop-claim":
             if drop is None:
                 logger.error(
                     f"Received a drop claim ID for a non-existing drop: {drop_id}\n"
-                    f"Drop claim ID: {message['data']['drop_instance_id']}"
+                    f"Drop claim ID: {data.drop_instance_id}"
                 )
                 return
-            drop.update_claim(message["data"]["drop_instance_id"])
+            if data.drop_instance_id is not None:
+                drop.update_claim(data.drop_instance_id)
             campaign = drop.campaign
             await drop.claim()
             drop.display()
@@ -1297,25 +1442,31 @@ class Twitch:
         if drop is not None:
             drop_text = (
                 f"{drop.name} ({drop.campaign.game}, "
-                f"{message['data']['current_progress_min']}/"
-                f"{message['data']['required_progress_min']})"
+                f"{data.current_progress_min}/{data.required_progress_min})"
             )
         else:
             drop_text = "<Unknown>"
         logger.log(CALL, f"Drop update from websocket: {drop_text}")
-        if drop is not None and drop.can_earn(self.watching_channel.get_with_default(None)):
+        watching_channel = self.watching_channel.get_with_default(None)
+        if drop is not None and drop.can_earn(watching_channel):
             # the received payload is for the drop we expected
-            drop.update_minutes(message["data"]["current_progress_min"])
+            drop.update_minutes(data.current_progress_min)
             if self.state_store is not None:
                 self.state_store.update_drop_progress(
-                    drop.id, drop.current_minutes, drop.required_minutes
+                    drop.id,
+                    drop.current_minutes,
+                    drop.required_minutes,
+                    channel_id=watching_channel.id if watching_channel is not None else None,
+                    source="websocket",
                 )
 
     @task_wrapper
-    async def process_notifications(self, user_id: int, message: JsonType):
-        if message["type"] == "create-notification":
-            data: JsonType = message["data"]["notification"]
-            if data["type"] in (
+    async def process_notifications(self, user_id: int, message: schemas.NotificationEvent):
+        if message.type == "create-notification":
+            if message.data is None or message.data.notification is None:
+                return
+            notification = message.data.notification
+            if notification.type in (
                 "user_drop_reward_reminder_notification",  # drop confirmation
                 "quests_viewer_reward_campaign_earned_emote",  # emote confirmation
                 # badge confirmation?
@@ -1323,7 +1474,7 @@ class Twitch:
                 self.request_inventory_refresh(force=True)
                 await self.gql_request(
                     GQL_OPERATIONS["NotificationsDelete"].with_variables(
-                        {"input": {"id": data["id"]}}
+                        {"input": {"id": notification.id}}
                     )
                 )
 
@@ -1337,6 +1488,7 @@ class Twitch:
     ) -> abc.AsyncIterator[aiohttp.ClientResponse]:
         session = await self.get_session()
         method = method.upper()
+        url = self.endpoint(url)
         if self.settings.proxy and "proxy" not in kwargs:
             kwargs["proxy"] = self.settings.proxy
         logger.debug(f"Request: ({method=}, {url=}, {kwargs=})")
@@ -1388,23 +1540,61 @@ class Twitch:
     async def gql_request(self, ops: list[GQLOperation]) -> list[JsonType]:
         ...
 
+    @overload
+    async def gql_request(self, ops: GQLOperation, *, schema: type[_S]) -> _S:
+        ...
+
+    @overload
+    async def gql_request(self, ops: list[GQLOperation], *, schema: type[_S]) -> list[_S]:
+        ...
+
     async def gql_request(
-        self, ops: GQLOperation | list[GQLOperation]
-    ) -> JsonType | list[JsonType]:
+        self,
+        ops: GQLOperation | list[GQLOperation],
+        *,
+        schema: type[schemas.GQLResponse] | None = None,
+    ) -> Any:
+        """
+        Sends the GQL operation(s), handling retries and errors.
+
+        If a `schema` is passed, each response is decoded straight into it.
+        Responses that don't fit it, like ones carrying errors, take the generic path first,
+        and are converted to the schema at the end.
+        """
         gql_logger.debug(f"GQL Request: {ops}")
+        operation: str = ops["operationName"] if isinstance(ops, dict) else "batch"
+        op_latency = metrics.GQL_LATENCY.labels(operation)
+        response_schema: Any = None
+        if schema is not None:
+            response_schema = list[schema] if isinstance(ops, list) else schema  # type: ignore
         backoff = ExponentialBackoff(maximum=60)
         # Use a flag to retry the request a single time, if a specific set of errors is encountered
         single_retry: bool = True
         for delay in backoff:
+            wait_start = perf_counter()
             async with self._qgl_limiter:
+                metrics.GQL_RATE_LIMIT_WAIT.observe(perf_counter() - wait_start)
+                metrics.GQL_REQUESTS.labels(operation).inc()
                 auth_state = await self.get_auth()
-                async with self.request(
-                    "POST",
-                    "https://gql.twitch.tv/gql",
-                    json=ops,
-                    headers=auth_state.headers(user_agent=self._client_type.USER_AGENT, gql=True),
-                ) as response:
-                    response_json: JsonType | list[JsonType] = await response.json()
+                with op_latency.time():
+                    async with self.request(
+                        "POST",
+                        "https://gql.twitch.tv/gql",
+                        json=ops,
+                        headers=auth_state.headers(
+                            user_agent=self._client_type.USER_AGENT, gql=True
+                        ),
+                    ) as response:
+                        if response_schema is not None:
+                            with suppress(ValueError):
+                                typed_response = await response.json(
+                                    loads=partial(schemas.decode, type=response_schema)
+                                )
+                                gql_logger.debug(f"GQL Response: {typed_response}")
+                                return typed_response
+                        response_json: JsonType | list[JsonType] = await response.json(
+                            loads=codec.loads
+                        )
             gql_logger.debug(f"GQL Response: {response_json}")
             orig_response = response_json
             if isinstance(response_json, list):
@@ -1415,6 +1605,7 @@ class Twitch:
             for response_json in response_list:
                 # GQL error handling
                 if "errors" in response_json:
+                    metrics.GQL_ERRORS.labels(operation).inc()
                     for error_dict in response_json["errors"]:
                         if "message" in error_dict:
                             if (
@@ -1455,12 +1646,19 @@ class Twitch:
                         raise GQLException(response_json['errors'])
                 # Other error handling
                 elif "error" in response_json:
+                    metrics.GQL_ERRORS.labels(operation).inc()
                     raise GQLException(
                         f"{response_json['error']}: {response_json['message']}"
                     )
                 if force_retry:
+                    metrics.GQL_RETRIES.labels(operation).inc()
                     break
             else:
+                if response_schema is not None:
+                    # any remaining errors have been handled above
+                    for response_json in response_list:
+                        response_json.pop("errors", None)
+                    return schemas.convert(orig_response, response_schema)
                 return orig_response
             await asyncio.sleep(delay)
         raise RuntimeError("Retry loop was broken")
@@ -1490,13 +1688,16 @@ class Twitch:
     ) -> dict[str, JsonType]:
         campaign_ids: dict[str, JsonType] = dict(campaigns_chunk)
         auth_state = await self.get_auth()
-        response_list: list[JsonType] = await self.gql_request(
+        # the campaign definitions are shared, the user-specific parts are taken
+        # from the campaigns list and the inventory instead
+        response_list: list[JsonType] = await self.shared_cache.get_many(
             [
                 GQL_OPERATIONS["CampaignDetails"].with_variables(
                     {"channelLogin": str(auth_state.user_id), "dropID": cid}
                 )
                 for cid in campaign_ids
-            ]
+            ],
+            self.gql_request,
         )
         fetched_data: dict[str, JsonType] = {
             (campaign_data := response_json["data"]["user"]["dropCampaign"])["id"]: campaign_data
@@ -1505,6 +1706,7 @@ class Twitch:
         return self._merge_data(campaign_ids, fetched_data)
 
     async def fetch_inventory(self, *, force: bool = False) -> None:
+        fetch_start = perf_counter()
         status_update = self.gui.status.update
         now = datetime.now(timezone.utc)
         use_cache_only = not force and not self._inventory_force and now < self._inventory_deadline
@@ -1552,23 +1754,24 @@ class Twitch:
         self._inventory_force = False
 
         if self.settings.dump:
-            with open(DUMP_PATH, 'a', encoding="utf8") as file:
-                dump_data: JsonType = deepcopy(inventory_data)
-                for campaign_data in dump_data.values():
-                    if (
-                        campaign_data["allow"]
-                        and campaign_data["allow"].get("isEnabled", True)
-                        and campaign_data["allow"]["channels"]
-                    ):
-                        campaign_data["allow"]["channels"] = (
-                            f"{len(campaign_data['allow']['channels'])} channels"
-                        )
-                    for drop_data in campaign_data["timeBasedDrops"]:
-                        if "self" in drop_data and drop_data["self"]["dropInstanceID"]:
-                            drop_data["self"]["dropInstanceID"] = "..."
-                json.dump(dump_data, file, indent=4, sort_keys=True)
-                file.write("\n\n")
-                json.dump(game_event_drops, file, indent=4, sort_keys=True, default=str)
+            dump_data: JsonType = deepcopy(inventory_data)
+            for campaign_data in dump_data.values():
+                if (
+                    campaign_data["allow"]
+                    and campaign_data["allow"].get("isEnabled", True)
+                    and campaign_data["allow"]["channels"]
+                ):
+                    campaign_data["allow"]["channels"] = (
+                        f"{len(campaign_data['allow']['channels'])} channels"
+                    )
+                for drop_data in campaign_data["timeBasedDrops"]:
+                    if "self" in drop_data and drop_data["self"]["dropInstanceID"]:
+                        drop_data["self"]["dropInstanceID"] = "..."
+            dump_text = "\n\n".join((
+                json.dumps(dump_data, indent=4, sort_keys=True),
+                json.dumps(game_event_drops, indent=4, sort_keys=True, default=str),
+            ))
+            persistence.append(self.paths.DUMP, dump_text.encode("utf8"))
 
         campaigns: list[DropsCampaign] = [
             DropsCampaign(self, campaign_data, claimed_benefits)
@@ -1593,6 +1796,11 @@ class Twitch:
         if self.state_store is not None:
             self.state_store.set_campaigns(self.inventory)
             self.state_store.set_last_reload(fetched_at)
+        campaign_gauge = metrics.INVENTORY_CAMPAIGNS
+        campaign_gauge.labels("total").set(len(campaigns))
+        campaign_gauge.labels("active").set(sum(c.active for c in campaigns))
+        campaign_gauge.labels("upcoming").set(sum(c.upcoming for c in campaigns))
+        campaign_gauge.labels("eligible").set(sum(c.eligible for c in campaigns))
         status_update(
             _("gui", "status", "adding_campaigns").format(counter=f"(0/{len(campaigns)})")
         )
@@ -1621,6 +1829,7 @@ class Twitch:
         if self._mnt_task is not None and not self._mnt_task.done():
             self._mnt_task.cancel()
         self._mnt_task = asyncio.create_task(self._maintenance_task())
+        metrics.INVENTORY_FETCH.observe(perf_counter() - fetch_start)
 
     async def _pull_inventory_with_backoff(
         self, status_update: abc.Callable[[str], Any]
@@ -1696,7 +1905,7 @@ class Twitch:
         if drops_enabled:
             filters.append("DROPS_ENABLED")
         try:
-            response = await self.gql_request(
+            response = await self.shared_cache.get(
                 GQL_OPERATIONS["GameDirectory"].with_variables({
                     "limit": limit,
                     "slug": game.slug,
@@ -1704,7 +1913,8 @@ class Twitch:
                         "includeRestricted": ["SUB_ONLY_LIVE"],
                         "systemFilters": filters,
                     },
-                })
+                }),
+                self.gql_request,
             )
         except GQLException as exc:
             raise MinerException(f"Game: {game.slug}") from exc
@@ -1718,53 +1928,68 @@ class Twitch:
             ]
         return []
 
+    def get_stream_info(self, channel: Channel) -> abc.Awaitable[schemas.StreamInfoResponse]:
+        """
+        Returns the stream info of the channel, shared with the other accounts for a short while.
+        """
+        return self.shared_cache.get(
+            channel.stream_gql, self.gql_request, schema=schemas.StreamInfoResponse
+        )
+
     async def bulk_check_online(self, channels: abc.Iterable[Channel]):
         """
         Utilize batch GQL requests to check ONLINE status for a lot of channels at once.
         Also handles the drops_enabled check (if enabled).
         """
-        acl_streams_map: dict[int, JsonType] = {}
+        acl_streams_map: dict[int, schemas.ChannelInfo] = {}
         stream_gql_ops: list[GQLOperation] = [channel.stream_gql for channel in channels]
         if not stream_gql_ops:
             # shortcut for nothing to process
             # NOTE: Have to do this here, becase "channels" can be any iterable
             return
-        stream_gql_tasks: list[asyncio.Task[list[JsonType]]] = [
-            asyncio.create_task(self.gql_request(stream_gql_chunk))
+        stream_gql_tasks: list[asyncio.Task[list[schemas.StreamInfoResponse]]] = [
+            asyncio.create_task(
+                self.shared_cache.get_many(
+                    stream_gql_chunk, self.gql_request, schema=schemas.StreamInfoResponse
+                )
+            )
             for stream_gql_chunk in chunk(stream_gql_ops, 20)
         ]
         try:
             for coro in asyncio.as_completed(stream_gql_tasks):
-                response_list: list[JsonType] = await coro
-                for response_json in response_list:
-                    channel_data: JsonType = response_json["data"]["user"]
+                response_list: list[schemas.StreamInfoResponse] = await coro
+                for response in response_list:
+                    channel_data = response.data.user
                     if channel_data is not None:
-                        acl_streams_map[int(channel_data["id"])] = channel_data
+                        acl_streams_map[int(channel_data.id)] = channel_data
         except Exception:
             # asyncio.as_completed doesn't cancel tasks on errors
             for task in stream_gql_tasks:
                 task.cancel()
             raise
         # for all channels with an active stream, check the available drops as well
-        acl_available_drops_map: dict[int, list[JsonType]] = {}
+        acl_available_drops_map: dict[int, list[schemas.CampaignRef]] = {}
         if self.settings.available_drops_check:
             available_gql_ops: list[GQLOperation] = [
                 GQL_OPERATIONS["AvailableDrops"].with_variables({"channelID": str(channel_id)})
                 for channel_id, channel_data in acl_streams_map.items()
-                if channel_data["stream"] is not None  # only do this for ONLINE channels
+                if channel_data.stream is not None  # only do this for ONLINE channels
             ]
-            available_gql_tasks: list[asyncio.Task[list[JsonType]]] = [
-                asyncio.create_task(self.gql_request(available_gql_chunk))
+            available_gql_tasks: list[asyncio.Task[list[schemas.AvailableDropsResponse]]] = [
+                asyncio.create_task(
+                    self.gql_request(available_gql_chunk, schema=schemas.AvailableDropsResponse)
+                )
                 for available_gql_chunk in chunk(available_gql_ops, 20)
             ]
             try:
                 for coro in asyncio.as_completed(available_gql_tasks):
-                    response_list = await coro
-                    for response_json in response_list:
-                        available_info: JsonType = response_json["data"]["channel"]
-                        acl_available_drops_map[int(available_info["id"])] = (
-                            available_info["viewerDropCampaigns"] or []
-                        )
+                    available_list: list[schemas.AvailableDropsResponse] = await coro
+                    for available_response in available_list:
+                        available_info = available_response.data.channel
+                        if available_info is not None:
+                            acl_available_drops_map[int(available_info.id)] = (
+                                available_info.viewer_drop_campaigns or []
+                            )
             except Exception:
                 # asyncio.as_completed doesn't cancel tasks on errors
                 for task in available_gql_tasks:
@@ -1775,7 +2000,7 @@ class Twitch:
             if channel_id not in acl_streams_map:
                 continue
             channel_data = acl_streams_map[channel_id]
-            if channel_data["stream"] is None:
+            if channel_data.stream is None:
                 continue
-            available_drops: list[JsonType] = acl_available_drops_map.get(channel_id, [])
+            available_drops = acl_available_drops_map.get(channel_id, [])
             channel.external_update(channel_data, available_drops)
@@ -4,13 +4,11 @@ import io
 import os
 import re
 import sys
-import json
 import random
 import string
 import asyncio
 import logging
 import traceback
-import webbrowser
 from enum import Enum
 from pathlib import Path
 from functools import wraps
@@ -18,15 +16,21 @@ from contextlib import suppress
 from functools import cached_property
 from datetime import datetime, timezone
 from collections import abc, OrderedDict
-from typing import Any, Literal, Callable, Generic, Mapping, TypeVar, ParamSpec, cast
+from typing import (
+    Any, Literal, Callable, Generic, Mapping, TypeVar, ParamSpec, cast, TYPE_CHECKING
+)
 
 from yarl import URL
-from PIL import Image as Image_module
 
+import codec
+import persistence
 from exceptions import ExitRequest, ReloadRequest
 from constants import IS_PACKAGED, JsonType, PriorityMode
 from constants import _resource_path as resource_path  # noqa
 
+if TYPE_CHECKING:
+    from schemas import GameInfo
+
 
 _T = TypeVar("_T")  # type
 _D = TypeVar("_D")  # default
@@ -37,6 +41,7 @@ logger = logging.getLogger("TwitchDrops")
 
 def set_root_icon(root, image_path: Path | str) -> None:
     from tkinter import Tk  # type: ignore import
+    from PIL import Image as Image_module
     from PIL.ImageTk import PhotoImage
 
     if not isinstance(root, Tk):
@@ -100,7 +105,29 @@ def json_minify(data: JsonType | list[JsonType]) -> str:
     """
     Returns minified JSON for payload usage.
     """
-    return json.dumps(data, separators=(',', ':'))
+    return codec.dumps_str(data)
+
+
+def rebase_url(url: URL | str, base: URL) -> URL:
+    """
+    Redirects an absolute URL onto the `base` URL.
+
+    The original host becomes the first path segment, so that a single server
+    can stand in for every host the application talks to.
+    Websocket schemes are preserved, matching the security of the base URL.
+    """
+    url = URL(url)
+    scheme = base.scheme
+    if url.scheme in ("ws", "wss"):
+        scheme = "wss" if base.scheme == "https" else "ws"
+    return URL.build(
+        scheme=scheme,
+        host=base.raw_host or '',
+        port=base.explicit_port,
+        path=f"{base.raw_path.rstrip('/')}/{url.raw_host}{url.raw_path}",
+        query_string=url.raw_query_string,
+        encoded=True,
+    )
 
 
 def timestamp(string: str) -> datetime:
@@ -240,11 +267,28 @@ def merge_json(obj: JsonType, template: Mapping[Any, Any]) -> None:
             obj[k] = template[k]
 
 
+def json_encode(contents: Any, *, sort: bool = False, indent: bool = False) -> bytes:
+    if isinstance(contents, Mapping):
+        # NOTE: orjson encodes Enum members natively, bypassing _serialize.
+        # The only ones we store are the top-level settings, so tag them here.
+        contents = {
+            k: _serialize(v) if isinstance(v, Enum) else v for k, v in contents.items()
+        }
+    return codec.dumps(contents, default=_serialize, sort_keys=sort, indent=indent)
+
+
+def json_decode(data: bytes | str) -> Any:
+    decoded = codec.loads(data, object_hook=_deserialize)
+    if isinstance(decoded, dict):
+        _remove_missing(decoded)
+    return decoded
+
+
 def json_load(path: Path, defaults: _JSON_T, *, merge: bool = True) -> _JSON_T:
     defaults_dict: JsonType = dict(defaults)
     if path.exists():
-        with open(path, 'r', encoding="utf8") as file:
-            combined: JsonType = _remove_missing(json.load(file, object_hook=_deserialize))
+        with open(path, 'rb') as file:
+            combined: JsonType = json_decode(file.read())
         if merge:
             merge_json(combined, defaults_dict)
     else:
@@ -253,11 +297,13 @@ def json_load(path: Path, defaults: _JSON_T, *, merge: bool = True) -> _JSON_T:
 
 
 def json_save(path: Path, contents: Mapping[Any, Any], *, sort: bool = False) -> None:
-    with open(path, 'w', encoding="utf8") as file:
-        json.dump(contents, file, default=_serialize, sort_keys=sort, indent=4)
+    # encode right away, so that the contents can keep changing while the write is pending
+    persistence.write(path, json_encode(contents, sort=sort, indent=True))
 
 
 def webopen(url: URL | str):
+    import webbrowser
+
     url_str = str(url)
     if IS_PACKAGED and sys.platform == "linux":
         # https://pyinstaller.org/en/stable/
@@ -407,11 +453,17 @@ class AwaitableValue(Generic[_T]):
 class Game:
     SPECIAL_EVENTS_GAME_ID: int = 509663
 
-    def __init__(self, data: JsonType):
-        self.id: int = int(data["id"])
-        self.name: str = data.get("displayName") or data["name"]
-        if "slug" in data:
-            self.slug = data["slug"]
+    def __init__(self, data: JsonType | GameInfo):
+        if isinstance(data, dict):
+            self.id: int = int(data["id"])
+            self.name: str = data.get("displayName") or data["name"]
+            if "slug" in data:
+                self.slug = data["slug"]
+        else:
+            self.id = int(data.id)
+            self.name = data.display_name or data.name
+            if data.slug is not None:
+                self.slug = data.slug
 
     def __str__(self) -> str:
         return self.name
@@ -419,6 +471,12 @@ class Game:
     def __repr__(self) -> str:
         return f"Game({self.id}, {self.name})"
 
+    def as_json(self) -> JsonType:
+        """
+        Returns the game data, that can be passed back into the constructor.
+        """
+        return {"id": self.id, "name": self.name, "slug": self.slug}
+
     def __eq__(self, other: object) -> bool:
         if isinstance(other, self.__class__):
             return self.id == other.id
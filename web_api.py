@@ -2,18 +2,21 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import os
-import sys
 from pathlib import Path
 from typing import Any
 
 import aiohttp
-from aiohttp import web
+from aiohttp import ETag, hdrs, web
 
+import codec
+import metrics
+import profiler
 from constants import PriorityMode
 from utils import resource_path
 
 logger = logging.getLogger("TwitchDrops.api")
+# how often idle event streams get a keepalive comment, in seconds
+EVENTS_KEEPALIVE = 15.0
 
 
 def _parse_bind(bind: str) -> tuple[str, int]:
@@ -23,6 +26,57 @@ def _parse_bind(bind: str) -> tuple[str, int]:
     return host, int(port)
 
 
+def _sse_frame(event_id: str, event_type: str, body: bytes) -> bytes:
+    # encoded JSON never contains raw newlines, so it always fits on a single data line
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (
+        event_id.encode(), event_type.encode(), body
+    )
+
+
+def _parse_fields(request: web.Request) -> list[str] | None:
+    fields = request.query.get("fields")
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def _project(data: dict[str, Any], fields: list[str]) -> dict[str, Any]:
+    """
+    Picks the given fields out of a dict. Nested fields are selected with dots,
+    like "runtime.state". Raises KeyError for unknown fields.
+    """
+    result: dict[str, Any] = {}
+    for field in fields:
+        source: Any = data
+        target = result
+        *parents, name = field.split(".")
+        try:
+            for parent in parents:
+                source = source[parent]
+                target = target.setdefault(parent, {})
+            target[name] = source[name]
+        except (KeyError, TypeError):
+            raise KeyError(field) from None
+    return result
+
+
+def _page_args(request: web.Request) -> tuple[int | None, int]:
+    # raises ValueError on invalid values
+    query = request.query
+    before = int(query["cursor"]) if query.get("cursor") else None
+    limit = min(max(int(query.get("limit", 50)), 1), 500)
+    return before, limit
+
+
+def _json_response(
+    data: Any, *, status: int = 200, headers: dict[str, str] | None = None
+) -> web.Response:
+    # serialize straight to bytes, skipping the intermediate str `web.json_response` makes
+    return web.Response(
+        body=codec.dumps(data), status=status, headers=headers, content_type="application/json"
+    )
+
+
 class WebAPI:
     def __init__(
         self,
@@ -58,7 +112,7 @@ class WebAPI:
                 auth = request.headers.get("Authorization", "")
                 provided = auth[7:] if auth.startswith("Bearer ") else ""
                 if provided != token:
-                    return web.json_response(
+                    return _json_response(
                         {"error": "Unauthorized"},
                         status=401,
                         headers={"Access-Control-Allow-Origin": "*"},
@@ -70,21 +124,45 @@ class WebAPI:
             [
                 web.get("/api/health", self._health),
                 web.get("/api/snapshot", self._snapshot),
+                web.get("/api/events", self._events),
+                web.get("/api/accounts", self._accounts),
+                web.get("/api/accounts/{name}", self._account),
+                web.get("/api/accounts/{name}/snapshot", self._account_snapshot),
+                web.get("/api/campaigns", self._campaigns),
+                web.get("/api/campaigns/{id}", self._campaign),
+                web.get("/api/channels", self._channels),
+                web.get("/api/channels/{id}", self._channel),
+                web.get("/api/journal", self._journal),
+                web.get("/api/logs", self._logs),
                 web.get("/api/settings", self._settings_get),
                 web.put("/api/settings", self._settings_put),
                 web.get("/api/watchdog", self._watchdog),
+                web.get("/api/metrics", self._metrics),
+                web.get("/api/loop", self._loop_stats),
+                web.get("/api/profile", self._profile_status),
+                web.get("/api/profile/result", self._profile_result),
+                web.get("/api/claims", self._claims),
+                web.get("/api/claims/stats", self._claim_stats),
+                web.get("/api/progress", self._progress),
+                web.get("/api/progress/{drop_id}", self._drop_progress),
                 web.post("/api/actions/reload", self._action_reload),
                 web.post("/api/actions/start", self._action_start),
                 web.post("/api/actions/stop", self._action_stop),
                 web.post("/api/actions/switch-channel", self._action_switch_channel),
                 web.post("/api/actions/clear-journal", self._action_clear_journal),
                 web.post("/api/actions/restart", self._action_restart),
+                web.post("/api/actions/profile-start", self._action_profile_start),
+                web.post("/api/actions/profile-stop", self._action_profile_stop),
             ]
         )
         self._webui_path = resource_path("webui")
         self._register_webui()
         self._runner: web.AppRunner | None = None
         self._site: web.TCPSite | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # replaced with a new one every time it's set, to wake up all event streams at once
+        self._changed = asyncio.Event()
+        self._closing = False
 
     async def start(self, bind: str) -> None:
         host, port = _parse_bind(bind)
@@ -92,9 +170,16 @@ class WebAPI:
         await self._runner.setup()
         self._site = web.TCPSite(self._runner, host, port)
         await self._site.start()
+        self._loop = asyncio.get_running_loop()
+        self._closing = False
+        self._service.state_store.add_listener(self._on_state_change)
         logger.info(f"Web API running on http://{host}:{port}")
 
     async def stop(self) -> None:
+        self._service.state_store.remove_listener(self._on_state_change)
+        # let the event streams finish, instead of holding up the shutdown
+        self._closing = True
+        self._wake_event_streams()
         if self._site is not None:
             await self._site.stop()
             self._site = None
@@ -103,86 +188,325 @@ class WebAPI:
             self._runner = None
 
     async def _health(self, _: web.Request) -> web.Response:
-        return web.json_response({"status": "ok", "running": self._service.is_running})
+        return _json_response({"status": "ok", "running": self._service.is_running})
+
+    async def _snapshot(self, request: web.Request) -> web.Response:
+        snapshot = self._service.get_versioned_snapshot()
+        fields = _parse_fields(request)
+        etag = ETag(value=snapshot.etag, is_weak=True)
+        # the snapshot is cached by the state store, and only revalidated by the client
+        headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if_none_match = request.if_none_match
+        if if_none_match and any(tag.value in (etag.value, "*") for tag in if_none_match):
+            response = web.Response(status=304, headers=headers)
+            response.etag = etag
+            return response
+        if fields is not None:
+            # projections are cheap to build, and aren't worth caching
+            try:
+                body = codec.dumps(_project(snapshot.data, fields))
+            except KeyError as exc:
+                return _json_response({"error": f"Unknown field: {exc.args[0]}"}, status=400)
+        elif "gzip" in request.headers.get(hdrs.ACCEPT_ENCODING, ""):
+            body = snapshot.gzip_body
+            headers[hdrs.CONTENT_ENCODING] = "gzip"
+        else:
+            body = snapshot.body
+        response = web.Response(body=body, headers=headers, content_type="application/json")
+        response.etag = etag
+        return response
+
+    async def _accounts(self, _: web.Request) -> web.Response:
+        return _json_response(
+            [account.summary() for account in self._service.accounts.values()]
+        )
 
-    async def _snapshot(self, _: web.Request) -> web.Response:
-        return web.json_response(self._service.get_snapshot())
+    async def _account(self, request: web.Request) -> web.Response:
+        account = self._service.accounts.get(request.match_info["name"])
+        if account is None:
+            return _json_response({"error": "Account not found"}, status=404)
+        return _json_response(account.summary())
+
+    async def _account_snapshot(self, request: web.Request) -> web.Response:
+        account = self._service.accounts.get(request.match_info["name"])
+        if account is None:
+            return _json_response({"error": "Account not found"}, status=404)
+        data = account.get_snapshot()
+        fields = _parse_fields(request)
+        if fields is not None:
+            try:
+                data = _project(data, fields)
+            except KeyError as exc:
+                return _json_response({"error": f"Unknown field: {exc.args[0]}"}, status=400)
+        return _json_response(data)
+
+    def _on_state_change(self) -> None:
+        # called by the state store, possibly from another thread
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake_event_streams)
+
+    def _wake_event_streams(self) -> None:
+        changed = self._changed
+        self._changed = asyncio.Event()
+        changed.set()
+
+    async def _events(self, request: web.Request) -> web.StreamResponse:
+        # Server-Sent Events stream, starting with a full snapshot, followed by state deltas.
+        # Clients resume from the last event ID they've seen, see StateStore.get_events.
+        # Event IDs are "<run>-<version>", so that cursors from before a restart are ignored.
+        store = self._service.state_store
+        cursor: int | None = None
+        raw_cursor = request.headers.get("Last-Event-ID") or request.query.get("cursor", "")
+        run, _, version = raw_cursor.rpartition("-")
+        if run == store.run_id and version.isdigit():
+            cursor = int(version)
+        response = web.StreamResponse(
+            headers={
+                "Content-Type": "text/event-stream",
+                "Cache-Control": "no-cache",
+                # disable proxy buffering, for nginx and the likes
+                "X-Accel-Buffering": "no",
+            }
+        )
+        await response.prepare(request)
+        try:
+            while not self._closing:
+                changed = self._changed
+                events = store.get_events(cursor) if cursor is not None else None
+                if events is None:
+                    snapshot = self._service.get_versioned_snapshot()
+                    await response.write(_sse_frame(snapshot.etag, "snapshot", snapshot.body))
+                    cursor = snapshot.version
+                elif events:
+                    await response.write(
+                        b"".join(
+                            _sse_frame(f"{store.run_id}-{e.version}", e.type, e.body)
+                            for e in events
+                        )
+                    )
+                    cursor = events[-1].version
+                else:
+                    try:
+                        await asyncio.wait_for(changed.wait(), timeout=EVENTS_KEEPALIVE)
+                    except asyncio.TimeoutError:
+                        store.refresh_load()
+                        await response.write(b": keepalive\n\n")
+        except ConnectionResetError:
+            pass
+        return response
 
     async def _settings_get(self, _: web.Request) -> web.Response:
-        return web.json_response(self._service.get_snapshot().get("settings", {}))
+        return _json_response(self._service.get_snapshot().get("settings", {}))
 
     async def _settings_put(self, request: web.Request) -> web.Response:
         try:
-            payload = await request.json()
-        except aiohttp.ContentTypeError:
-            return web.json_response({"error": "Invalid JSON"}, status=400)
+            payload = await request.json(loads=codec.loads)
+        except (aiohttp.ContentTypeError, ValueError):
+            return _json_response({"error": "Invalid JSON"}, status=400)
         if not isinstance(payload, dict):
-            return web.json_response({"error": "Payload must be an object"}, status=400)
+            return _json_response({"error": "Payload must be an object"}, status=400)
         updated, errors = _apply_settings(self._service.settings, payload)
         if errors:
-            return web.json_response({"error": "; ".join(errors)}, status=400)
+            return _json_response({"error": "; ".join(errors)}, status=400)
         if updated:
             self._service.settings.save()
             self._service.state_store.update_settings(self._service.settings)
-        return web.json_response(self._service.get_snapshot().get("settings", {}))
+        return _json_response(self._service.get_snapshot().get("settings", {}))
+
+    async def _metrics(self, _: web.Request) -> web.Response:
+        return web.Response(
+            body=metrics.REGISTRY.render().encode("utf8"),
+            headers={hdrs.CONTENT_TYPE: metrics.CONTENT_TYPE},
+        )
+
+    async def _loop_stats(self, _: web.Request) -> web.Response:
+        return _json_response(self._service.loop_monitor.stats())
+
+    async def _profile_status(self, _: web.Request) -> web.Response:
+        return _json_response(self._service.profiler.status())
+
+    async def _profile_result(self, _: web.Request) -> web.Response:
+        summary = self._service.profiler.summary()
+        if summary is None:
+            return _json_response({"error": "No profile has been taken yet"}, status=404)
+        return web.Response(text=summary, content_type="text/plain")
 
     async def _watchdog(self, _: web.Request) -> web.Response:
-        return web.json_response(self._service.state_store.get_watchdog_log())
+        return _json_response(self._service.state_store.get_watchdog_log())
+
+    def _list_response(self, request: web.Request, items: list[dict[str, Any]]) -> web.Response:
+        fields = _parse_fields(request)
+        if fields is not None:
+            try:
+                items = [_project(item, fields) for item in items]
+            except KeyError as exc:
+                return _json_response({"error": f"Unknown field: {exc.args[0]}"}, status=400)
+        return _json_response(items)
+
+    async def _campaigns(self, request: web.Request) -> web.Response:
+        campaigns = self._service.state_store.get_campaigns(request.query.get("game") or None)
+        return self._list_response(request, campaigns)
+
+    async def _campaign(self, request: web.Request) -> web.Response:
+        campaign = self._service.state_store.get_campaign(request.match_info["id"])
+        if campaign is None:
+            return _json_response({"error": "Campaign not found"}, status=404)
+        return _json_response(campaign)
+
+    async def _channels(self, request: web.Request) -> web.Response:
+        channels = self._service.state_store.get_channels(request.query.get("status") or None)
+        return self._list_response(request, channels)
+
+    async def _channel(self, request: web.Request) -> web.Response:
+        try:
+            channel_id = int(request.match_info["id"])
+        except ValueError:
+            return _json_response({"error": "Channel ID must be an integer"}, status=400)
+        channel = self._service.state_store.get_channel(channel_id)
+        if channel is None:
+            return _json_response({"error": "Channel not found"}, status=404)
+        return _json_response(channel)
+
+    async def _journal(self, request: web.Request) -> web.Response:
+        try:
+            before, limit = _page_args(request)
+        except ValueError:
+            return _json_response({"error": "cursor and limit must be integers"}, status=400)
+        items, next_cursor = self._service.state_store.get_journal_page(before, limit)
+        return _json_response({"items": items, "next_cursor": next_cursor})
+
+    async def _logs(self, request: web.Request) -> web.Response:
+        query = request.query
+        try:
+            before, limit = _page_args(request)
+        except ValueError:
+            return _json_response({"error": "cursor and limit must be integers"}, status=400)
+        try:
+            items, next_cursor = self._service.log_buffer.search(
+                before,
+                limit,
+                query=query.get("q") or None,
+                regex=query.get("regex", "").lower() in ("1", "true", "yes"),
+                level=query.get("level") or None,
+                logger=query.get("logger") or None,
+            )
+        except ValueError as exc:
+            return _json_response({"error": str(exc)}, status=400)
+        return _json_response({"items": items, "next_cursor": next_cursor})
+
+    async def _claims(self, request: web.Request) -> web.Response:
+        query = request.query
+        try:
+            before, limit = _page_args(request)
+        except ValueError:
+            return _json_response({"error": "cursor and limit must be integers"}, status=400)
+        items, next_cursor = await asyncio.to_thread(
+            self._service.state_store.query_claims,
+            before,
+            limit,
+            game=query.get("game") or None,
+            campaign_id=query.get("campaign") or None,
+            drop_id=query.get("drop") or None,
+            since=query.get("since") or None,
+            until=query.get("until") or None,
+        )
+        return _json_response({"items": items, "next_cursor": next_cursor})
+
+    async def _claim_stats(self, request: web.Request) -> web.Response:
+        group = request.query.get("group", "game")
+        if group not in ("game", "campaign"):
+            return _json_response({"error": "group must be 'game' or 'campaign'"}, status=400)
+        stats = await asyncio.to_thread(self._service.state_store.get_claim_stats, group)
+        return _json_response(stats)
+
+    async def _progress(self, _: web.Request) -> web.Response:
+        return _json_response(self._service.state_store.get_progress())
+
+    async def _drop_progress(self, request: web.Request) -> web.Response:
+        progress = self._service.state_store.get_drop_progress(request.match_info["drop_id"])
+        if progress is None:
+            return _json_response({"error": "No progress recorded for this drop"}, status=404)
+        return _json_response(progress)
 
     async def _action_reload(self, _: web.Request) -> web.Response:
         try:
             started = await asyncio.wait_for(self._service.reload(), timeout=30.0)
         except asyncio.TimeoutError:
             logger.error("Reload timed out after 30s")
-            return web.json_response({"error": "Reload timed out"}, status=504)
+            return _json_response({"error": "Reload timed out"}, status=504)
         except Exception as exc:
             logger.exception("Reload failed")
-            return web.json_response({"error": str(exc)}, status=500)
+            return _json_response({"error": str(exc)}, status=500)
         if started:
             self._service.state_store.set_last_reload()
             status = "reloading"
         else:
             status = "already_reloading"
-        return web.json_response({"status": status})
+        return _json_response({"status": status})
 
     async def _action_start(self, _: web.Request) -> web.Response:
         was_started = await self._service.ensure_started()
         status = "started" if was_started else "already_running"
-        return web.json_response({"status": status})
+        return _json_response({"status": status})
 
     async def _action_stop(self, _: web.Request) -> web.Response:
         await self._service.stop()
-        return web.json_response({"status": "stopped"})
+        return _json_response({"status": "stopped"})
 
     async def _action_switch_channel(self, request: web.Request) -> web.Response:
         try:
-            payload = await request.json()
-        except aiohttp.ContentTypeError:
-            return web.json_response({"error": "Invalid JSON"}, status=400)
+            payload = await request.json(loads=codec.loads)
+        except (aiohttp.ContentTypeError, ValueError):
+            return _json_response({"error": "Invalid JSON"}, status=400)
         channel = payload.get("channel") if isinstance(payload, dict) else None
         if channel is not None and not isinstance(channel, (int, str)):
-            return web.json_response({"error": "Channel must be int, str, or null"}, status=400)
+            return _json_response({"error": "Channel must be int, str, or null"}, status=400)
         self._service.switch_channel(channel)
-        return web.json_response({"status": "queued", "channel": channel})
+        return _json_response({"status": "queued", "channel": channel})
 
     async def _action_clear_journal(self, _: web.Request) -> web.Response:
         self._service.state_store.clear_journal()
-        return web.json_response({"status": "cleared"})
+        return _json_response({"status": "cleared"})
 
     async def _action_restart(self, _: web.Request) -> web.Response:
         logger.info("Full service restart requested via API")
         self._service.state_store.record_restart_attempt("Service-Neustart über WebUI angefordert")
 
         async def _do_restart() -> None:
+            # let the response go out first
             await asyncio.sleep(0.5)
-            # NOTE: os.execv only works when running from source.
-            # In a PyInstaller-frozen build, sys.executable points to the bundle
-            # and sys.argv may not produce a valid restart command.
-            logger.info("Executing full process restart via os.execv")
-            os.execv(sys.executable, [sys.executable] + sys.argv)
+            # the accounts shut down as usual, and main.py restarts the process afterwards
+            self._service.request_restart()
 
         asyncio.create_task(_do_restart())
-        return web.json_response({"status": "restarting"})
+        return _json_response({"status": "restarting"})
+
+    async def _action_profile_start(self, request: web.Request) -> web.Response:
+        payload: Any = {}
+        if request.can_read_body:
+            try:
+                payload = await request.json(loads=codec.loads)
+            except (aiohttp.ContentTypeError, ValueError):
+                return _json_response({"error": "Invalid JSON"}, status=400)
+        if not isinstance(payload, dict):
+            return _json_response({"error": "Payload must be an object"}, status=400)
+        try:
+            duration = float(payload.get("duration", profiler.DEFAULT_DURATION))
+            interval_ms = float(payload.get("interval_ms", profiler.DEFAULT_INTERVAL * 1000))
+            status = self._service.profiler.start(
+                payload.get("mode", "sample"), duration=duration, interval=interval_ms / 1000
+            )
+        except (TypeError, ValueError) as exc:
+            return _json_response({"error": str(exc)}, status=400)
+        except profiler.ProfilerBusy as exc:
+            return _json_response({"error": str(exc)}, status=409)
+        return _json_response(status)
+
+    async def _action_profile_stop(self, _: web.Request) -> web.Response:
+        result = self._service.profiler.stop()
+        if result is None:
+            return _json_response({"error": "No profile is running"}, status=409)
+        return _json_response(result)
 
     def _register_webui(self) -> None:
         webui_dir = Path(self._webui_path)
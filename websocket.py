@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import asyncio
 import logging
 from time import time
@@ -9,6 +8,9 @@ from typing import Any, Literal, TYPE_CHECKING
 
 import aiohttp
 
+import codec
+import metrics
+import schemas
 from translate import _
 from exceptions import MinerException, WebsocketClosed
 from constants import PING_INTERVAL, PING_TIMEOUT, MAX_WEBSOCKETS, WS_TOPICS_LIMIT
@@ -102,6 +104,7 @@ class Websocket:
                     await asyncio.wait_for(self._handle_task, timeout=2)
                 self._handle_task = None
             if remove:
+                metrics.WEBSOCKET_TOPICS.dec(len(self.topics))
                 self.topics.clear()
                 self._topics_changed.set()
                 self._twitch.gui.websockets.remove(self._idx)
@@ -122,7 +125,9 @@ class Websocket:
             proxy = None
         for delay in backoff:
             try:
-                async with session.ws_connect(ws_url, proxy=proxy) as websocket:
+                async with session.ws_connect(
+                    self._twitch.endpoint(ws_url), proxy=proxy
+                ) as websocket:
                     yield websocket
                     backoff.reset()
             except (
@@ -154,6 +159,7 @@ class Websocket:
             "wss://pubsub-edge.twitch.tv/v1", maximum=3*60  # 3 minutes maximum backoff time
         ):
             self._ws.set(websocket)
+            metrics.WEBSOCKET_CONNECTIONS.inc()
             self._reconnect_requested.clear()
             # NOTE: _topics_changed doesn't start set,
             # because there's no initial topics we can sub to right away
@@ -167,6 +173,7 @@ class Websocket:
                         await self._handle_recv()
                 finally:
                     self._ws.clear()
+                    metrics.WEBSOCKET_CONNECTIONS.dec()
                     self._submitted.clear()
                     # set _topics_changed to let the next WS connection resub to the topics
                     self._topics_changed.set()
@@ -186,6 +193,7 @@ class Websocket:
                 ws_logger.exception(f"Exception in Websocket[{self._idx}]")
             self.set_status(_("gui", "websocket", "reconnecting"))
             ws_logger.warning(f"Websocket[{self._idx}] reconnecting...")
+            metrics.WEBSOCKET_RECONNECTS.inc()
 
     async def _handle_ping(self):
         now = time()
@@ -239,18 +247,28 @@ class Websocket:
                 )
             self._submitted.update(added)
 
-    async def _gather_recv(self, messages: list[JsonType], timeout: float = 0.5):
+    async def _gather_recv(self, messages: list[schemas.PubsubFrame], timeout: float = 0.5):
         """
         Gather incoming messages over the timeout specified.
         Note that there's no return value - this modifies `messages` in-place.
         """
         ws = self._ws.get_with_default(None)
         assert ws is not None
+        # the timeout bounds the whole gathering, so that steady traffic can't stall it
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
         while True:
-            raw_message: aiohttp.WSMessage = await ws.receive(timeout=timeout)
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            raw_message: aiohttp.WSMessage = await ws.receive(timeout=remaining)
             ws_logger.debug(f"Websocket[{self._idx}] received: {raw_message}")
             if raw_message.type is WSMsgType.TEXT:
-                message: JsonType = json.loads(raw_message.data)
+                try:
+                    message = schemas.decode(raw_message.data, schemas.PubsubFrame)
+                except ValueError as exc:
+                    ws_logger.error(f"Websocket[{self._idx}] invalid message: {exc}")
+                    continue
                 messages.append(message)
             elif raw_message.type is WSMsgType.CLOSE:
                 raise WebsocketClosed(received=True)
@@ -266,24 +284,36 @@ class Websocket:
             else:
                 ws_logger.error(f"Websocket[{self._idx}] error: Unknown message: {raw_message}")
 
-    def _handle_message(self, message):
+    def _handle_message(self, message: schemas.PubsubFrame):
+        if message.data is None:
+            return
         # request the assigned topic to process the response
-        topic = self.topics.get(message["data"]["topic"])
+        topic = self.topics.get(message.data.topic)
         if topic is not None:
+            metrics.WEBSOCKET_MESSAGES.labels(topic.name).inc()
+            # the body is only decoded now, straight into the type the topic expects
+            try:
+                if topic.schema is not None:
+                    body = schemas.decode(message.data.message, topic.schema)
+                else:
+                    body = codec.loads(message.data.message)
+            except ValueError as exc:
+                ws_logger.error(f"Websocket[{self._idx}] invalid {topic} message: {exc}")
+                return
             # use a task to not block the websocket
-            asyncio.create_task(topic(json.loads(message["data"]["message"])))
+            asyncio.create_task(topic(body))
 
     async def _handle_recv(self):
         """
         Handle receiving messages from the websocket.
         """
         # listen over 0.5s for incoming messages
-        messages: list[JsonType] = []
+        messages: list[schemas.PubsubFrame] = []
         with suppress(asyncio.TimeoutError):
             await self._gather_recv(messages, timeout=0.5)
         # process them
         for message in messages:
-            msg_type = message["type"]
+            msg_type = message.type
             if msg_type == "MESSAGE":
                 self._handle_message(message)
             elif msg_type == "PONG":
@@ -304,6 +334,7 @@ class Websocket:
         while topics_set and len(self.topics) < WS_TOPICS_LIMIT:
             topic = topics_set.pop()
             self.topics[str(topic)] = topic
+            metrics.WEBSOCKET_TOPICS.inc()
             changed = True
         if changed:
             self._topics_changed.set()
@@ -316,6 +347,7 @@ class Websocket:
         topics_set.difference_update(existing)
         for topic in existing:
             del self.topics[topic]
+        metrics.WEBSOCKET_TOPICS.dec(len(existing))
         self._topics_changed.set()
 
     async def send(self, message: JsonType):
@@ -337,6 +369,13 @@ class WebsocketPool:
     def running(self) -> bool:
         return self._running.is_set()
 
+    @property
+    def topics(self) -> list[str]:
+        """
+        The IDs of all of the topics subscribed to, across the websockets.
+        """
+        return [topic_id for ws in self.websockets for topic_id in ws.topics]
+
     def wait_until_connected(self) -> abc.Coroutine[Any, Any, Literal[True]]:
         return self._running.wait()
 
@@ -479,10 +479,12 @@ function renderCampaigns(runtime) {
 
 // ── renderClaimsList ──────────────────────────────────────────────────────────
 
-function renderClaimsList(claims) {
+function renderClaimsList(claims, total) {
   const list = el('claimsList');
   if (!list) return;
   list.innerHTML = '';
+  const totalEl = el('claimsTotal');
+  if (totalEl) totalEl.textContent = total ? `(${total} gesamt)` : '';
 
   if (!claims || !claims.length) {
     list.innerHTML = '<li class="timeline-empty">Noch keine Claims</li>';
@@ -502,15 +504,15 @@ function renderClaimsList(claims) {
 
 function renderSidePanel(runtime) {
   renderTimeline(runtime.journal || []);
-  renderClaimsList(runtime.claims || []);
+  renderClaimsList(runtime.claims || [], runtime.claims_total);
 }
 
 // ── fetchWatchdog ─────────────────────────────────────────────────────────────
 
 async function fetchWatchdog() {
   try {
-    const data = await apiCall('/api/watchdog');
-    renderWatchdogTimeline(data);
+    watchdogLog = await apiCall('/api/watchdog');
+    renderWatchdogTimeline(watchdogLog);
   } catch { /* silent */ }
 }
 
@@ -678,9 +680,20 @@ function applySettings(s) {
   if (f.autostart_tray)        f.autostart_tray.checked = s.autostart_tray;
 }
 
+let snapshotEtag = null;
+
 async function pollSnapshot() {
   try {
-    const data = await apiCall('/api/snapshot');
+    // revalidate against the last snapshot, unchanged state comes back as an empty 304
+    const headers = snapshotEtag ? { 'If-None-Match': snapshotEtag } : {};
+    const r = await fetch('/api/snapshot', { headers, cache: 'no-store' });
+    if (r.status === 304) {
+      updateConnectionStatus(true);
+      return;
+    }
+    if (!r.ok) throw new Error(`Error ${r.status}`);
+    const data = await r.json();
+    snapshotEtag = r.headers.get('ETag');
     updateConnectionStatus(true);
     if (data.settings) {
       lastSettings = data.settings;
@@ -695,21 +708,137 @@ async function pollSnapshot() {
   }
 }
 
+// ── Event stream ──────────────────────────────────────────────────────────────
+
+// state deltas pushed by /api/events, applied on top of the last snapshot
+const JOURNAL_LIMIT = 100;
+const CLAIMS_WINDOW = 20;
+const WATCHDOG_LIMIT = 20;
+
+let eventSource = null;
+let lastEventId = null;
+let watchdogLog = [];
+let pendingRenders = new Set();
+
+function scheduleRender(...parts) {
+  // coalesce bursts of events into a single render per frame
+  if (!pendingRenders.size) requestAnimationFrame(flushRenders);
+  parts.forEach(p => pendingRenders.add(p));
+}
+
+function flushRenders() {
+  const parts = pendingRenders;
+  pendingRenders = new Set();
+  if (!lastRuntime) return;
+  if (parts.has('mining'))    renderMiningCard(lastRuntime);
+  if (parts.has('journal'))   renderTimeline(lastRuntime.journal || []);
+  if (parts.has('claims'))    renderClaimsList(lastRuntime.claims || [], lastRuntime.claims_total);
+  if (parts.has('channels'))  renderChannelList(lastRuntime.channels || []);
+  if (parts.has('campaigns')) renderCampaigns(lastRuntime);
+  if (parts.has('watchdog') && currentTab === 'settings') renderWatchdogTimeline(watchdogLog);
+}
+
+const EVENT_HANDLERS = {
+  snapshot(data) {
+    lastSettings = data.settings;
+    applySettings(data.settings);
+    lastRuntime = data.runtime;
+    renderRuntime(data.runtime, data.settings);
+    fetchWatchdog();
+  },
+  runtime(data) {
+    Object.assign(lastRuntime, data);
+    scheduleRender('mining');
+  },
+  channels(data) {
+    lastRuntime.channels = data;
+    scheduleRender('channels');
+  },
+  channel(data) {
+    lastRuntime.channels = (lastRuntime.channels || []).map(ch => ch.id === data.id ? data : ch);
+    scheduleRender('channels');
+  },
+  campaigns(data) {
+    lastRuntime.campaigns = data;
+    scheduleRender('mining', 'campaigns');
+  },
+  campaign(data) {
+    lastRuntime.campaigns = (lastRuntime.campaigns || []).map(c => c.id === data.id ? data : c);
+    scheduleRender('mining', 'campaigns');
+  },
+  drop({ campaign_id, drop }) {
+    lastRuntime.campaigns = (lastRuntime.campaigns || []).map(c => c.id !== campaign_id ? c : {
+      ...c, drops: (c.drops || []).map(d => d.id === drop.id ? drop : d),
+    });
+    scheduleRender('mining', 'campaigns');
+  },
+  journal(entry) {
+    lastRuntime.journal = [entry, ...(lastRuntime.journal || [])].slice(0, JOURNAL_LIMIT);
+    scheduleRender('journal');
+  },
+  journal_cleared() {
+    lastRuntime.journal = [];
+    scheduleRender('journal');
+  },
+  claim({ claim, total }) {
+    lastRuntime.claims = [claim, ...(lastRuntime.claims || [])].slice(0, CLAIMS_WINDOW);
+    lastRuntime.claims_total = total;
+    scheduleRender('claims');
+  },
+  settings(data) {
+    lastSettings = data;
+    applySettings(data);
+  },
+  watchdog(entry) {
+    watchdogLog = [entry, ...watchdogLog].slice(0, WATCHDOG_LIMIT);
+    scheduleRender('watchdog');
+  },
+};
+
+function openEventStream() {
+  if (eventSource) return;
+  // the browser resumes its own reconnects, this covers reopening it after the tab was hidden
+  const query = lastEventId ? `?cursor=${encodeURIComponent(lastEventId)}` : '';
+  eventSource = new EventSource(`/api/events${query}`);
+  eventSource.onopen = () => updateConnectionStatus(true);
+  eventSource.onerror = () => updateConnectionStatus(false);
+  Object.entries(EVENT_HANDLERS).forEach(([type, handler]) => {
+    eventSource.addEventListener(type, e => {
+      lastEventId = e.lastEventId;
+      if (type !== 'snapshot' && !lastRuntime) return;
+      handler(JSON.parse(e.data));
+    });
+  });
+}
+
+function closeEventStream() {
+  if (!eventSource) return;
+  eventSource.close();
+  eventSource = null;
+}
+
 // ── Page Visibility API ───────────────────────────────────────────────────────
 
 let pollTimer = null;
 let uptimeTimer = null;
 let watchdogTimer = null;
+// polling is only used by browsers without EventSource support
+const USE_EVENTS = typeof EventSource !== 'undefined';
 
 function startPolling() {
+  if (!uptimeTimer) uptimeTimer = setInterval(updateUptime, 1000);
+  if (USE_EVENTS) {
+    openEventStream();
+    return;
+  }
   if (pollTimer) return;
   pollTimer = setInterval(pollSnapshot, REFRESH_MS);
-  uptimeTimer = setInterval(updateUptime, 1000);
   watchdogTimer = setInterval(() => { if (currentTab === 'settings') fetchWatchdog(); }, REFRESH_MS);
   pollSnapshot();
 }
 
 function stopPolling() {
+  closeEventStream();
   clearInterval(pollTimer);   pollTimer = null;
   clearInterval(uptimeTimer); uptimeTimer = null;
   clearInterval(watchdogTimer); watchdogTimer = null;